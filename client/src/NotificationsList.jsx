@@ -1,15 +1,35 @@
-import React, { useState, useEffect } from "react";
-import { apiGet, apiPatch } from "./services/apiService.js";
+import React, { useState, useEffect, useRef } from "react";
+import { apiGet, apiPatch, openEventStream } from "./services/apiService.js";
 
 export default function NotificationsList({ userRole, onNotificationRemoved }) {
   const [notifications, setNotifications] = useState([]);
   const [loading, setLoading] = useState(false);
   const [expandedId, setExpandedId] = useState(null);
+  const unreadCountRef = useRef(null);
 
   useEffect(() => {
     fetchNotifications();
-    const interval = setInterval(fetchNotifications, 10000); // Poll every 10s
-    return () => clearInterval(interval);
+    if (typeof EventSource === "undefined") {
+      // Poll the cheap unread count every 10s; only refetch the list when it changes
+      const interval = setInterval(async () => {
+        try {
+          const { unread } = await apiGet("/notifications/unread/count");
+          if (unread !== unreadCountRef.current) {
+            unreadCountRef.current = unread;
+            fetchNotifications();
+          }
+        } catch (err) {
+          console.error("Error fetching unread count:", err);
+        }
+      }, 10000);
+      return () => clearInterval(interval);
+    }
+
+    // New notifications are pushed by the server instead of polled
+    const source = openEventStream("/notifications/stream", "notification", (notif) => {
+      setNotifications(prev => prev.some(n => n.id === notif.id) ? prev : [notif, ...prev]);
+    });
+    return () => source.close();
   }, []);
 
   const fetchNotifications = async () => {
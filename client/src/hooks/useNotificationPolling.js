@@ -1,9 +1,10 @@
 import { useState, useEffect, useRef } from "react";
-import { apiGet } from "../services/apiService.js";
+import { apiGet, openEventStream } from "../services/apiService.js";
 
 /**
- * Custom hook for polling unread notifications
- * Uses /notifications/unread endpoint
+ * Custom hook for live notifications
+ * Subscribes to the /notifications/stream server-sent events feed and
+ * only falls back to polling /notifications/unread where EventSource is missing
  */
 
 export function useNotificationPolling(pollInterval = 10000) {
@@ -11,39 +12,46 @@ export function useNotificationPolling(pollInterval = 10000) {
   const seenIdsRef = useRef(new Set());
 
   useEffect(() => {
-    const poll = async () => {
-      try {
-        const data = await apiGet("/notifications/unread");
-        
-        if (!Array.isArray(data)) return;
-
-        const newNotifications = [];
-
-        // Check for new notification IDs we haven't displayed yet
-        data.forEach(notif => {
-          if (!seenIdsRef.current.has(notif.id)) {
-            seenIdsRef.current.add(notif.id);
-            
-            // Determine status from message content
-            let status = "pending";
-            if (notif.message.includes("APPROVED")) {
-              status = "approved";
-            } else if (notif.message.includes("REJECTED")) {
-              status = "rejected";
-            }
-
-            newNotifications.push({
-              id: notif.id,
-              message: notif.message,
-              status: status,
-              timestamp: new Date(notif.created_at),
-            });
+    const addNotifications = (data) => {
+      const newNotifications = [];
+
+      // Check for new notification IDs we haven't displayed yet
+      data.forEach(notif => {
+        if (!seenIdsRef.current.has(notif.id)) {
+          seenIdsRef.current.add(notif.id);
+          
+          // Determine status from message content
+          let status = "pending";
+          if (notif.message.includes("APPROVED")) {
+            status = "approved";
+          } else if (notif.message.includes("REJECTED")) {
+            status = "rejected";
           }
-        });
 
-        if (newNotifications.length > 0) {
-          newNotifications.forEach(n => setNotifications(prev => [...prev, n]));
+          newNotifications.push({
+            id: notif.id,
+            message: notif.message,
+            status: status,
+            timestamp: new Date(notif.created_at),
+          });
         }
+      });
+
+      if (newNotifications.length > 0) {
+        setNotifications(prev => [...prev, ...newNotifications]);
+      }
+    };
+
+    if (typeof EventSource !== "undefined") {
+      // The stream replays unread notifications on connect, then pushes new ones
+      const source = openEventStream("/notifications/stream", "notification", (notif) => addNotifications([notif]));
+      return () => source.close();
+    }
+
+    const poll = async () => {
+      try {
+        const data = await apiGet("/notifications/unread");
+        if (Array.isArray(data)) addNotifications(data);
       } catch (err) {
         console.error("Polling error:", err);
       }
@@ -13,16 +13,32 @@ const getAuthHeaders = () => {
   };
 };
 
+// Last ETag and body per token + endpoint, for conditional polling
+const conditionalCache = new Map();
+
 /**
  * GET request
+ * Endpoints that send an ETag are revalidated with If-None-Match; a 304
+ * returns the body we already have.
  */
 export const apiGet = async (endpoint) => {
   try {
+    const headers = getAuthHeaders();
+    const cacheKey = `${headers.Authorization || ""} ${endpoint}`;
+    const cached = conditionalCache.get(cacheKey);
+    if (cached) headers["If-None-Match"] = cached.etag;
+
     const response = await fetch(`${API_BASE_URL}${endpoint}`, {
       method: "GET",
-      headers: getAuthHeaders(),
+      headers,
     });
-    return await handleResponse(response);
+    if (response.status === 304 && cached) return cached.data;
+
+    const data = await handleResponse(response);
+    const etag = response.headers.get("ETag");
+    if (etag) conditionalCache.set(cacheKey, { etag, data });
+    else conditionalCache.delete(cacheKey);
+    return data;
   } catch (error) {
     throw new Error(`GET ${endpoint} failed: ${error.message}`);
   }
@@ -96,6 +112,21 @@ export const apiDelete = async (endpoint) => {
   }
 };
 
+/**
+ * Open a server-sent events stream.
+ * EventSource can't send headers, so the token goes in the query string.
+ * The browser reconnects on its own and resumes via Last-Event-ID.
+ */
+export const openEventStream = (endpoint, eventName, onEvent) => {
+  const token = localStorage.getItem("accessToken");
+  const url = new URL(`${API_BASE_URL}${endpoint}`);
+  if (token) url.searchParams.set("access_token", token);
+
+  const source = new EventSource(url);
+  source.addEventListener(eventName, (event) => onEvent(JSON.parse(event.data)));
+  return source;
+};
+
 /**
  * Handle response and throw error if not ok
  */
@@ -73,6 +73,8 @@ export const prepareEncryptedPayload = async (data, baseUrl, publicKey) => {
     return {
       encrypted_payload: encryptedPayload,
       encrypted_key: encryptedKey,
+      // jsencrypt always uses PKCS#1 v1.5; telling the server skips its OAEP attempt
+      key_padding: 'pkcs1v15',
     };
   } catch (error) {
     console.error('[Encryption] Error preparing encrypted payload:', error);
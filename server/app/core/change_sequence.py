@@ -0,0 +1,125 @@
+import hashlib
+import itertools
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from fastapi import Request, Response
+
+from app.core.config import settings
+from app.features.users.models import UserRole
+
+APPLICATIONS = "applications"
+NOTIFICATIONS = "notifications"
+
+_CACHE_CONTROL = "private, no-cache"
+
+
+class ChangeSequences:
+    """
+    Monotonic change counters for polled reads, per user and per role for
+    each feed (APPLICATIONS, NOTIFICATIONS).
+
+    Writers bump the scopes they changed after committing. Polled routes turn
+    the counters covering their response into an ETag before reading, and
+    answer a matching If-None-Match with 304 without a query. The tag has to
+    be taken before the read that builds the body, so a write landing in
+    between leaves an older tag on newer data (the next poll refetches), never
+    the other way round. A body shared between requests (single_flight) is
+    only correct if the sharing is keyed on the tag too: a flight that
+    started before a write must not be handed to a request tagged after it.
+
+    Counters live in this process. The ETag includes a per-process epoch, so
+    a validator from another worker never matches, and the current max_age
+    time bucket, so changes made by another process (the separate job
+    worker, other hosts) show up within max_age without bumping anything here.
+
+    At most `maxsize` user and `maxsize` role scopes are kept, least recently
+    used first out. An evicted scope would read as 0 again and could match a
+    tag handed out before its first change, so every eviction also starts a
+    new epoch: all outstanding tags stop matching and get one full response.
+    """
+
+    def __init__(self, max_age: float, maxsize: int):
+        self.max_age = max_age
+        self.maxsize = maxsize
+        self._epoch = self._new_epoch()
+        self._next = itertools.count(1)
+        self._feeds: dict[str, int] = {}
+        # (feed, user_id) / (feed, role) -> sequence, least recently used first
+        self._users: "OrderedDict[tuple[str, int], int]" = OrderedDict()
+        self._roles: "OrderedDict[tuple[str, UserRole], int]" = OrderedDict()
+        self.not_modified = 0
+        self.modified = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _new_epoch() -> str:
+        return f"{os.getpid()}.{time.time_ns()}"
+
+    def _bump(self, scopes: OrderedDict, key: tuple) -> None:
+        scopes[key] = next(self._next)
+        scopes.move_to_end(key)
+        if len(scopes) > self.maxsize:
+            scopes.popitem(last=False)
+            self._epoch = self._new_epoch()
+            self.evictions += 1
+
+    @staticmethod
+    def _sequence(scopes: OrderedDict, key: tuple) -> int:
+        sequence = scopes.get(key)
+        if sequence is None:
+            return 0
+        scopes.move_to_end(key)
+        return sequence
+
+    def user_changed(self, feed: str, user_id: int) -> None:
+        self._bump(self._users, (feed, user_id))
+
+    def role_changed(self, feed: str, role: UserRole) -> None:
+        self._bump(self._roles, (feed, role))
+
+    def feed_changed(self, feed: str) -> None:
+        """Something every reader of the feed sees changed (e.g. a loan product was renamed)."""
+        self._feeds[feed] = next(self._next)
+
+    def etag(self, request: Request, feed: str, user_id: Optional[int] = None, role: Optional[UserRole] = None) -> str:
+        """Validator for this URL (query string included) over the feed's user and/or role scope."""
+        bucket = int(time.time() // self.max_age) if self.max_age > 0 else 0
+        raw = "|".join(str(part) for part in (
+            self._epoch, bucket, request.url.path, request.url.query, feed, self._feeds.get(feed, 0),
+            user_id, self._sequence(self._users, (feed, user_id)), role, self._sequence(self._roles, (feed, role)),
+        ))
+        return f'W/"{hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()}"'
+
+    def not_modified_response(self, request: Request, etag: str) -> Optional[Response]:
+        """304 if the client's If-None-Match already has this tag, else None (and the route builds the body)."""
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and (if_none_match.strip() == "*" or etag in (tag.strip() for tag in if_none_match.split(","))):
+            self.not_modified += 1
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": _CACHE_CONTROL})
+        self.modified += 1
+        return None
+
+    @staticmethod
+    def tag(response: Response, etag: str) -> Response:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = _CACHE_CONTROL
+        return response
+
+    def stats(self) -> dict:
+        polls = self.not_modified + self.modified
+        return {
+            "not_modified": self.not_modified,
+            "modified": self.modified,
+            "not_modified_ratio": self.not_modified / polls if polls else 0.0,
+            "users": len(self._users),
+            "evictions": self.evictions,
+        }
+
+
+# Global instance
+change_sequences = ChangeSequences(
+    max_age=settings.CONDITIONAL_GET_MAX_AGE_SECONDS, maxsize=settings.CONDITIONAL_GET_MAX_SCOPES,
+)
@@ -1,89 +1,162 @@
 import json
 import base64
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Optional
 from cryptography.hazmat.primitives import serialization, hashes
 from cryptography.hazmat.primitives.asymmetric import rsa, padding
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.backends import default_backend
 
-KEY_DIR = Path(__file__).parent.parent.parent / "keys"
+from app.core.config import settings
+from app.core.filelock import FileLock
+from app.core.metrics import LatencyStats
+
+KEY_DIR = Path(settings.ENCRYPTION_KEY_DIR or Path(__file__).parent.parent.parent / "keys")
+
+# RSA paddings a client may announce for the wrapped AES key.
+# jsencrypt (used by the React client) only does PKCS#1 v1.5.
+KEY_PADDINGS = {
+    "oaep": padding.OAEP(
+        mgf=padding.MGF1(algorithm=hashes.SHA256()),
+        algorithm=hashes.SHA256(),
+        label=None
+    ),
+    "pkcs1v15": padding.PKCS1v15(),
+}
+
+def _write_atomic(path: Path, data: bytes, mode: int = 0o644) -> None:
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
 
 class EncryptionManager:
+    """
+    RSA key pair is loaded on first use and cached. If keys/ is empty, exactly one
+    process generates the pair (under a file lock) and every worker loads it.
+    """
+
     def __init__(self):
-        KEY_DIR.mkdir(exist_ok=True)
         self.private_key_path = KEY_DIR / "private_key.pem"
         self.public_key_path = KEY_DIR / "public_key.pem"
-        self._load_or_generate_keys()
-    
-    def _load_or_generate_keys(self):
-        """Load or generate RSA keys"""
-        if self.private_key_path.exists() and self.public_key_path.exists():
+        self._private_key = None
+        self._public_key = None
+        self._public_key_pem: Optional[str] = None
+        self._key_lock = threading.Lock()
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.rsa_time = LatencyStats()
+        self.aes_time = LatencyStats()
+        self.request_time = LatencyStats()
+        self.padding_fallbacks = 0
+        self.keys_generated = False
+
+    @property
+    def private_key(self):
+        if self._private_key is None:
+            self.load_keys()
+        return self._private_key
+
+    @property
+    def public_key(self):
+        if self._public_key is None:
+            self.load_keys()
+        return self._public_key
+
+    def load_keys(self) -> None:
+        """Load the key pair, generating it first if no process has yet."""
+        with self._key_lock:
+            if self._private_key is not None:
+                return
+            if not self._key_files_exist():
+                with FileLock(KEY_DIR / ".keys.lock"):
+                    # Another worker may have generated them while we waited
+                    if not self._key_files_exist():
+                        self._generate_keys()
             with open(self.private_key_path, "rb") as f:
-                self.private_key = serialization.load_pem_private_key(
+                private_key = serialization.load_pem_private_key(
                     f.read(), password=None, backend=default_backend()
                 )
             with open(self.public_key_path, "rb") as f:
-                self.public_key = serialization.load_pem_public_key(
+                self._public_key = serialization.load_pem_public_key(
                     f.read(), backend=default_backend()
                 )
-        else:
-            self._generate_keys()
-    
+            self._private_key = private_key
+
+    def _key_files_exist(self) -> bool:
+        return self.private_key_path.exists() and self.public_key_path.exists()
+
     def _generate_keys(self):
-        """Generate and save new RSA key pair"""
-        self.private_key = rsa.generate_private_key(
+        """Generate and save a new RSA key pair; each file appears whole or not at all."""
+        private_key = rsa.generate_private_key(
             public_exponent=65537, key_size=2048, backend=default_backend()
         )
-        self.public_key = self.private_key.public_key()
-        
-        # Save keys
-        with open(self.private_key_path, "wb") as f:
-            f.write(self.private_key.private_bytes(
-                encoding=serialization.Encoding.PEM,
-                format=serialization.PrivateFormat.PKCS8,
-                encryption_algorithm=serialization.NoEncryption()
-            ))
-        
-        with open(self.public_key_path, "wb") as f:
-            f.write(self.public_key.public_bytes(
-                encoding=serialization.Encoding.PEM,
-                format=serialization.PublicFormat.SubjectPublicKeyInfo
-            ))
+        KEY_DIR.mkdir(exist_ok=True)
+        _write_atomic(self.private_key_path, private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption()
+        ), mode=0o600)
+        _write_atomic(self.public_key_path, private_key.public_key().public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo
+        ))
+        self.keys_generated = True
     
     def get_public_key_pem(self) -> str:
         """Return public key in PEM format"""
-        return self.public_key.public_bytes(
-            encoding=serialization.Encoding.PEM,
-            format=serialization.PublicFormat.SubjectPublicKeyInfo
-        ).decode('utf-8')
+        if self._public_key_pem is None:
+            self._public_key_pem = self.public_key.public_bytes(
+                encoding=serialization.Encoding.PEM,
+                format=serialization.PublicFormat.SubjectPublicKeyInfo
+            ).decode('utf-8')
+        return self._public_key_pem
+
+    async def get_public_key_pem_async(self) -> str:
+        """Same as get_public_key_pem; a first call that has to read or generate the keys runs in a thread."""
+        if self._public_key_pem is None:
+            await asyncio.to_thread(self.load_keys)
+        return self.get_public_key_pem()
     
-    def decrypt_aes_key(self, encrypted_key: str) -> str:
-        """Decrypt AES key using RSA private key"""
+    def decrypt_aes_key(self, encrypted_key: str, key_padding: Optional[str] = None) -> str:
+        """
+        Decrypt AES key using RSA private key.
+
+        When the client says which padding it used (`key_padding`) only that
+        scheme is tried. Without it we keep the legacy behaviour: OAEP first,
+        then PKCS#1 v1.5, which costs legacy clients two RSA operations.
+        """
         try:
             encrypted_bytes = base64.b64decode(encrypted_key)
         except Exception as e:
             raise ValueError(f"Invalid base64 for encrypted AES key: {str(e)}")
 
+        if key_padding is not None:
+            if key_padding not in KEY_PADDINGS:
+                raise ValueError(f"Unsupported key padding: {key_padding}")
+            try:
+                return self.private_key.decrypt(encrypted_bytes, KEY_PADDINGS[key_padding]).decode('utf-8')
+            except Exception as e:
+                raise ValueError(f"Failed to decrypt AES key ({key_padding} error: {e})")
+
         # Try OAEP (preferred). If that fails, fall back to PKCS#1 v1.5
         last_exc = None
         try:
-            decrypted = self.private_key.decrypt(
-                encrypted_bytes,
-                padding.OAEP(
-                    mgf=padding.MGF1(algorithm=hashes.SHA256()),
-                    algorithm=hashes.SHA256(),
-                    label=None
-                )
-            )
+            decrypted = self.private_key.decrypt(encrypted_bytes, KEY_PADDINGS["oaep"])
             return decrypted.decode('utf-8')
         except Exception as e:
             last_exc = e
 
+        self.padding_fallbacks += 1
         try:
-            decrypted = self.private_key.decrypt(
-                encrypted_bytes,
-                padding.PKCS1v15()
-            )
+            decrypted = self.private_key.decrypt(encrypted_bytes, KEY_PADDINGS["pkcs1v15"])
             return decrypted.decode('utf-8')
         except Exception as e2:
             raise ValueError(f"Failed to decrypt AES key (OAEP error: {last_exc}; PKCS1v15 error: {e2})")
@@ -95,19 +168,12 @@ class EncryptionManager:
         try:
             # Convert Base64 AES key string back to bytes
             aes_key_bytes = base64.b64decode(aes_key_str)
-            
-            # Decrypt the payload using AES ECB mode with PKCS7 padding
-            cipher = Cipher(
-                algorithms.AES(aes_key_bytes),
-                modes.ECB(),
-                backend=default_backend()
-            )
-            decryptor = cipher.decryptor()
-            
             # Decode the Base64 encrypted payload
             encrypted_bytes = base64.b64decode(encrypted_payload)
-            
-            # Decrypt
+
+            # Decrypt the payload using AES ECB mode with PKCS7 padding.
+            # The key is per request, so the cipher can't be reused across calls.
+            decryptor = Cipher(algorithms.AES(aes_key_bytes), modes.ECB()).decryptor()
             decrypted_bytes = decryptor.update(encrypted_bytes) + decryptor.finalize()
             
             # Remove PKCS7 padding manually
@@ -115,10 +181,42 @@ class EncryptionManager:
             decrypted_bytes = decrypted_bytes[:-padding_length]
             
             # Decode JSON
-            json_str = decrypted_bytes.decode('utf-8')
-            return json.loads(json_str)
+            return json.loads(decrypted_bytes)
         except Exception as e:
             raise ValueError(f"Failed to decrypt payload: {str(e)}")
 
+    def decrypt_request(self, encrypted_key: str, encrypted_payload: str, key_padding: Optional[str] = None) -> dict:
+        """Decrypt the AES key and then the payload, recording per-step latency."""
+        with self.request_time.time():
+            with self.rsa_time.time():
+                aes_key = self.decrypt_aes_key(encrypted_key, key_padding)
+            with self.aes_time.time():
+                return self.decrypt_payload(encrypted_payload, aes_key)
+
+    async def decrypt_request_async(self, encrypted_key: str, encrypted_payload: str, key_padding: Optional[str] = None) -> dict:
+        """Same as decrypt_request, but runs on the crypto worker pool instead of the event loop."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.CRYPTO_WORKERS, thread_name_prefix="crypto"
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self.decrypt_request, encrypted_key, encrypted_payload, key_padding
+        )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "rsa_decrypt": self.rsa_time.snapshot(),
+            "aes_decrypt": self.aes_time.snapshot(),
+            "request": self.request_time.snapshot(),
+            "padding_fallbacks": self.padding_fallbacks,
+            "keys_loaded": self._private_key is not None,
+        }
+
 # Global instance
 encryption_manager = EncryptionManager()
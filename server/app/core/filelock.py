@@ -0,0 +1,78 @@
+import asyncio
+import os
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """
+    Exclusive lock on a file, shared by every process on the host (uvicorn /
+    gunicorn workers). Separate FileLock objects on the same path also exclude
+    each other within one process. Use `with` from sync code, `async with`
+    from the event loop (waits in a thread), or try_acquire() to take it only
+    if it is free.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._fd = None
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def acquire(self) -> None:
+        self._lock(blocking=True)
+
+    def try_acquire(self) -> bool:
+        """Take the lock if no one holds it; never waits."""
+        if self.held:
+            return True
+        try:
+            self._lock(blocking=False)
+        except (BlockingIOError, PermissionError):
+            # PermissionError: msvcrt's "already locked"
+            return False
+        return True
+
+    def _lock(self, blocking: bool) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+        except BaseException:
+            os.close(fd)
+            raise
+        self._fd = fd
+
+    def release(self) -> None:
+        fd, self._fd = self._fd, None
+        if fd is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        os.close(fd)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+    async def __aenter__(self):
+        await asyncio.to_thread(self.acquire)
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.release()
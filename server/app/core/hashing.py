@@ -0,0 +1,106 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.metrics import LatencyStats
+from app.core.security import get_password_hash, verify_password
+
+
+class PasswordHashingService:
+    """
+    Runs bcrypt hashing/verification on a bounded worker pool so login and
+    register bursts don't block the event loop for every other route.
+
+    At most `max_pending` operations may be queued or running at once; beyond
+    that callers get a 503 instead of piling up behind the pool.
+    """
+
+    def __init__(self, executor_kind: str, workers: int, max_pending: int):
+        self.executor_kind = executor_kind
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+        self.queue_wait = LatencyStats()
+        self.hash_time = LatencyStats()
+        self.verify_time = LatencyStats()
+        self._executor: Optional[Executor] = None
+
+    def _get_executor(self) -> Optional[Executor]:
+        if self.workers <= 0:
+            return None
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="password-hash"
+                )
+        return self._executor
+
+    async def _run(self, stats: LatencyStats, func, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service is busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+
+        self.pending += 1
+        submitted = time.perf_counter()
+        try:
+            executor = self._get_executor()
+            if executor is None:
+                self.queue_wait.observe(0.0)
+                with stats.time():
+                    return func(*args)
+            future = asyncio.get_running_loop().run_in_executor(executor, _timed, func, *args)
+            result, started, elapsed = await future
+            self.queue_wait.observe(max(0.0, started - submitted))
+            stats.observe(elapsed)
+            return result
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.hash_time, get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(self.verify_time, verify_password, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "executor": self.executor_kind if self.workers > 0 else "inline",
+            "workers": self.workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "rejected": self.rejected,
+            "queue_wait": self.queue_wait.snapshot(),
+            "hash": self.hash_time.snapshot(),
+            "verify": self.verify_time.snapshot(),
+        }
+
+
+def _timed(func, *args):
+    """Worker-side wrapper: returns the result plus when it started and how long it ran."""
+    started = time.perf_counter()
+    result = func(*args)
+    return result, started, time.perf_counter() - started
+
+
+# Global instance
+password_hasher = PasswordHashingService(
+    executor_kind=settings.PASSWORD_HASH_EXECUTOR,
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
@@ -0,0 +1,164 @@
+import asyncio
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.metrics import QUERY_COUNT_BUCKETS, registry
+
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total", "HTTP requests by route and status code.", ("method", "route", "status")
+)
+HTTP_LATENCY = registry.histogram(
+    "http_request_duration_seconds", "Time until the last byte of the response was sent.", ("method", "route")
+)
+HTTP_DB_QUERIES = registry.histogram(
+    "http_request_db_queries", "SQL statements issued while handling one request.", ("method", "route"),
+    buckets=QUERY_COUNT_BUCKETS,
+)
+HTTP_DB_TIME = registry.histogram(
+    "http_request_db_seconds", "Time spent in SQL statements while handling one request.", ("method", "route")
+)
+DB_QUERIES = registry.counter(
+    "db_queries_total", "SQL statements executed, by whether a request issued them.", ("source",)
+)
+DB_QUERY_TIME = registry.histogram("db_query_duration_seconds", "Duration of single SQL statements.")
+LOOP_LAG = registry.histogram("event_loop_lag_seconds", "How late the event loop ran a scheduled wake-up.")
+
+
+class RequestDbStats:
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+
+# Set by MetricsMiddleware for the duration of a request. Engine events run in the
+# request's context (SQLAlchemy's async greenlets carry it along), so they can add to it.
+_request_db: ContextVar[Optional[RequestDbStats]] = ContextVar("request_db", default=None)
+
+
+def instrument_engine(sync_engine) -> None:
+    """Time every statement and attribute it to the current request, if any."""
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        DB_QUERY_TIME.observe(elapsed)
+        stats = _request_db.get()
+        if stats is None:
+            DB_QUERIES.inc("background")
+        else:
+            DB_QUERIES.inc("request")
+            stats.queries += 1
+            stats.seconds += elapsed
+
+
+def register_pool_gauges(engine) -> None:
+    pool = engine.sync_engine.pool
+
+    def pool_state() -> dict:
+        state = {}
+        for name in ("size", "checkedin", "checkedout", "overflow"):
+            reader = getattr(pool, name, None)
+            if reader is not None:
+                state[(name,)] = reader()
+        return state
+
+    registry.gauge("db_pool_connections", "Connection pool state (QueuePool counters).", pool_state, ("state",))
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (so streaming responses and context variables pass
+    through untouched). Records latency, status and DB usage per route
+    template, e.g. /loans/applications/{application_id}.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        stats = RequestDbStats()
+        token = _request_db.set(stats)
+        status_code = 500
+        recorded = False
+
+        def record():
+            nonlocal recorded
+            if recorded:
+                return
+            recorded = True
+            route = scope.get("route")
+            labels = (scope["method"], getattr(route, "path", "unmatched"))
+            HTTP_REQUESTS.inc(*labels, str(status_code))
+            HTTP_LATENCY.observe(time.perf_counter() - start, *labels)
+            HTTP_DB_QUERIES.observe(stats.queries, *labels)
+            HTTP_DB_TIME.observe(stats.seconds, *labels)
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                # Response complete; background tasks that run afterwards are not counted
+                record()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            record()
+            _request_db.reset(token)
+
+
+class LoopLagMonitor:
+    """Sleeps `interval` seconds in a loop and records how much later than asked it woke up."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self.interval > 0:
+            self._task = asyncio.create_task(self._run(), name="loop-lag-monitor")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(time.perf_counter() - expected, 0.0)
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            LOOP_LAG.observe(lag)
+
+    def stats(self) -> dict:
+        return {"last_lag_ms": self.last_lag * 1000, "max_lag_ms": self.max_lag * 1000}
+
+
+# Global instance
+loop_lag_monitor = LoopLagMonitor(interval=settings.METRICS_LOOP_LAG_INTERVAL_SECONDS)
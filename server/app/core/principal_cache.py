@@ -0,0 +1,119 @@
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import settings
+from app.features.users.models import User
+
+# Columns copied out of the ORM row. Everything a route reads from `current_user`.
+_PRINCIPAL_FIELDS = ("id", "email", "name", "role")
+
+
+class PrincipalCache:
+    """
+    Bounded LRU cache of authenticated users, keyed by the JWT subject (email).
+
+    Entries expire after `ttl` seconds so out-of-band changes are picked up
+    eventually; changes made through the ORM invalidate the entry when they
+    are flushed and again when they are committed (see the events at the
+    bottom of this module), since a request authenticating in between still
+    reads the old row.
+
+    Fills are guarded by a generation counter that every invalidation bumps:
+    read `generation` before loading the user and pass it to put(), which
+    drops the fill if anything was invalidated while the load was running.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, subject: str) -> Optional[User]:
+        entry = self._entries.get(subject)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, values = entry
+        if expires_at < time.monotonic():
+            del self._entries[subject]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(subject)
+        self.hits += 1
+        # Hand out a fresh transient User so requests never share mutable state
+        return User(**values)
+
+    def put(self, subject: str, user: User, generation: int) -> None:
+        if self.maxsize <= 0 or generation != self.generation:
+            return
+        values = {field: getattr(user, field) for field in _PRINCIPAL_FIELDS}
+        self._entries[subject] = (time.monotonic() + self.ttl, values)
+        self._entries.move_to_end(subject)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, subject: str) -> None:
+        self.generation += 1
+        self._entries.pop(subject, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Global instance
+principal_cache = PrincipalCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+# session.info key for the subjects changed in the session's current transaction
+_CHANGED_SUBJECTS = "principal_cache_changed"
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_changed_user(mapper, connection, target: User):
+    """Drop the cached principal whenever a role or account change is flushed."""
+    # An email change leaves the old subject behind as well
+    subjects = {target.email, *(inspect(target).attrs.email.history.deleted or ())}
+    for subject in subjects:
+        principal_cache.invalidate(subject)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_CHANGED_SUBJECTS, set()).update(subjects)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session: Session):
+    """Drop them again once committed: until then other sessions read (and cache) the old row."""
+    for subject in session.info.pop(_CHANGED_SUBJECTS, ()):
+        principal_cache.invalidate(subject)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_users(session: Session):
+    """Nothing changed after all; the rows cached meanwhile are still current."""
+    session.info.pop(_CHANGED_SUBJECTS, None)
@@ -1,5 +1,5 @@
 from datetime import datetime, timedelta, timezone
-from typing import Annotated, List
+from typing import Annotated, List, Optional
 import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
@@ -10,27 +10,18 @@ from sqlalchemy import select
 from pwdlib import PasswordHash
 from pwdlib.hashers.bcrypt import BcryptHasher
 
-# from app.core.config import settings
+from app.core.config import settings
+from app.core.principal_cache import principal_cache
 from dependencies import get_db
+from database import AsyncSessionLocal
 from app.features.users.models import User, UserRole
 
-from pydantic_settings import BaseSettings
-
 # 2. Setup the new PasswordHash context
 pwd_context = PasswordHash((BcryptHasher(),))
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 
-
-class Settings(BaseSettings):
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
-    SECRET_KEY: str = "daslklkajldkjasfkdslkfkj"
-    ALGORITHM: str = "HS256"
-
-# Create an instance of the class
-settings = Settings()
-
-settings.ACCESS_TOKEN_EXPIRE_MINUTES
 # 3. The functions stay exactly the same!
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -45,14 +36,10 @@ def create_access_token(data: dict) -> str:
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-# 3. The "Lock" Dependency
-async def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)], 
-    db: AsyncSession = Depends(get_db)
-) -> User:
+async def authenticate_token(token: str, db: AsyncSession) -> User:
     """
-    This dependency reads the JWT from the request header, decodes it, 
-    finds the user in the database, and returns the User object.
+    Decodes the JWT, finds the user in the database, and returns the User object.
+    Recently seen users are served from the principal cache instead.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -68,6 +55,11 @@ async def get_current_user(
     except jwt.InvalidTokenError:
         raise credentials_exception
     
+    cached_user = principal_cache.get(email)
+    if cached_user is not None:
+        return cached_user
+    generation = principal_cache.generation
+
     # Fetch user from database
     stmt = select(User).where(User.email == email)
     result = await db.execute(stmt)
@@ -75,9 +67,42 @@ async def get_current_user(
     
     if user is None:
         raise credentials_exception
-        
+
+    principal_cache.put(email, user, generation)
     return user
 
+# 3. The "Lock" Dependency
+async def get_current_user(
+    token: Annotated[str, Depends(oauth2_scheme)], 
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    """
+    This dependency reads the JWT from the request header and returns the
+    authenticated User object.
+    """
+    return await authenticate_token(token, db)
+
+async def get_streaming_user(
+    token: Annotated[Optional[str], Depends(optional_oauth2_scheme)],
+    access_token: Optional[str] = None,
+) -> User:
+    """
+    Authentication for long-lived streams.
+
+    Browsers' EventSource can't send an Authorization header, so the token may
+    also come as `?access_token=`. The lookup uses its own short session so an
+    open stream never pins a pooled database connection.
+    """
+    token = token or access_token
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    async with AsyncSessionLocal() as db:
+        return await authenticate_token(token, db)
+
 class RoleChecker:
     def __init__(self, allowed_roles: List[UserRole]):
         self.allowed_roles = allowed_roles
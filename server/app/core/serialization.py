@@ -0,0 +1,29 @@
+from typing import Iterable, Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+class RowSerializer:
+    """
+    Validates and encodes plain row dicts in one pydantic-core pass.
+
+    List endpoints select only the columns they return and hand the rows
+    here, skipping ORM hydration, per-object model validation and FastAPI's
+    response_model round trip. The declared response_model still documents
+    the shape.
+    """
+
+    def __init__(self, row_type):
+        self._list = TypeAdapter(list[row_type])
+        self._item = TypeAdapter(row_type)
+
+    def dump(self, rows: list) -> bytes:
+        return self._list.dump_json(self._list.validate_python(rows))
+
+    def dump_lines(self, rows: list) -> bytes:
+        """Newline-delimited JSON, one row per line."""
+        return b"".join(self._item.dump_json(row) + b"\n" for row in self._list.validate_python(rows))
+
+    def response(self, rows: Iterable, headers: Optional[dict] = None) -> Response:
+        return Response(content=self.dump(list(rows)), media_type="application/json", headers=headers)
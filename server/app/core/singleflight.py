@@ -0,0 +1,76 @@
+import asyncio
+from collections import defaultdict
+from typing import Awaitable, Callable, Hashable
+
+from fastapi import Response
+
+from app.core.config import settings
+
+
+class SingleFlight:
+    """
+    Collapses concurrent identical reads into one execution.
+
+    The first request for a key starts the work as its own task; requests
+    for the same key that arrive while it runs wait for that task instead
+    of running the query again, and every caller gets its own Response
+    built from the shared body. Nothing is cached: once the flight lands,
+    the next request starts a new one. A request that joins a flight gets
+    whatever that query read, which can predate its own arrival by up to one
+    flight's duration; callers that must not see anything older than a known
+    version (see change_sequence) put that version in the key.
+
+    Keys are (name, scope, *params). Callers pass the auth scope they were
+    admitted with (the role RequireRole checked), so a result is only shared
+    between requests that passed the same check. The work runs in its own
+    task with its own session, so one caller disconnecting doesn't cancel
+    it for the rest.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._flights: dict[Hashable, asyncio.Task] = {}
+        # name -> counters
+        self._stats: dict[str, dict[str, int]] = defaultdict(
+            lambda: {"calls": 0, "executions": 0, "collapsed": 0, "errors": 0}
+        )
+
+    async def do(self, key: tuple, work: Callable[[], Awaitable]):
+        stats = self._stats[key[0]]
+        stats["calls"] += 1
+        if not self.enabled:
+            stats["executions"] += 1
+            return await work()
+        task = self._flights.get(key)
+        if task is None:
+            stats["executions"] += 1
+            task = asyncio.create_task(work())
+            self._flights[key] = task
+            task.add_done_callback(lambda done: self._landed(key, done))
+        else:
+            stats["collapsed"] += 1
+        return await asyncio.shield(task)
+
+    def _landed(self, key: tuple, task: asyncio.Task) -> None:
+        if self._flights.get(key) is task:
+            del self._flights[key]
+        # Retrieve the exception even if every caller went away
+        if not task.cancelled() and task.exception() is not None:
+            self._stats[key[0]]["errors"] += 1
+
+    async def response(self, key: tuple, work: Callable[[], Awaitable[Response]]) -> Response:
+        """do() for work that returns a Response; each caller gets a copy (middleware mutates headers)."""
+        shared = await self.do(key, work)
+        return Response(
+            content=shared.body,
+            status_code=shared.status_code,
+            headers={k: v for k, v in shared.headers.items() if k != "content-length"},
+            media_type=shared.media_type,
+        )
+
+    def stats(self) -> dict:
+        return {"in_flight": len(self._flights), **{name: dict(counts) for name, counts in self._stats.items()}}
+
+
+# Global instance
+single_flight = SingleFlight(enabled=settings.SINGLE_FLIGHT_ENABLED)
@@ -1,21 +1,24 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import Annotated, Optional
+from typing import Annotated, Literal, Optional
 from fastapi.security import OAuth2PasswordRequestForm
 from pydantic import BaseModel
 import json
 
 from app.features.users.models import User
 from app.features.users.schema import UserCreate,UserRead
-from app.core.security import get_password_hash, verify_password, create_access_token
-from app.core.encryption import encryption_manager
+from app.core.security import create_access_token
+from app.core.hashing import password_hasher
+from app.core.encryption import KEY_PADDINGS, encryption_manager
 from dependencies import get_db
 
 # Schema for encrypted requests
 class EncryptedRequest(BaseModel):
     encrypted_payload: str
     encrypted_key: str
+    # RSA padding the client used for encrypted_key. Omit for the legacy OAEP-then-PKCS#1 v1.5 probe.
+    key_padding: Optional[Literal["oaep", "pkcs1v15"]] = None
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -29,7 +32,7 @@ async def register_user(user_in:UserCreate , db:AsyncSession= Depends(get_db)):
     new_user = User(
         email=user_in.email,
         name=user_in.name,
-        password=get_password_hash(user_in.password),
+        password=await password_hasher.hash(user_in.password),
         role=user_in.role
     )
     db.add(new_user)
@@ -45,9 +48,8 @@ async def login_user(
     stmt = select(User).where(User.email == form_data.username)
     result = await db.execute(stmt)
     user = result.scalar_one_or_none()
-    print(user)
 
-    if not user or not verify_password(form_data.password, user.password):
+    if not user or not await password_hasher.verify(form_data.password, user.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -63,8 +65,8 @@ async def login_user(
 async def get_public_key():
     """Endpoint to fetch the server's RSA public key for client-side encryption"""
     try:
-        public_key_pem = encryption_manager.get_public_key_pem()
-        return {"public_key": public_key_pem}
+        public_key_pem = await encryption_manager.get_public_key_pem_async()
+        return {"public_key": public_key_pem, "key_paddings": list(KEY_PADDINGS)}
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -85,10 +87,10 @@ async def login_user_encrypted(
     # Encrypted login request received
     
     try:
-        # Decrypt the AES key
-        aes_key = encryption_manager.decrypt_aes_key(encrypted_req.encrypted_key)
-        # Decrypt the payload
-        decrypted_data = encryption_manager.decrypt_payload(encrypted_req.encrypted_payload, aes_key)
+        # Decrypt the AES key and the payload off the event loop
+        decrypted_data = await encryption_manager.decrypt_request_async(
+            encrypted_req.encrypted_key, encrypted_req.encrypted_payload, encrypted_req.key_padding
+        )
         # Extract email and password from decrypted data
         email = decrypted_data.get("username") or decrypted_data.get("email")
         password = decrypted_data.get("password")
@@ -104,7 +106,7 @@ async def login_user_encrypted(
         result = await db.execute(stmt)
         user = result.scalar_one_or_none()
         
-        if not user or not verify_password(password, user.password):
+        if not user or not await password_hasher.verify(password, user.password):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password",
@@ -142,11 +144,10 @@ async def register_user_encrypted(
     Expects encrypted JSON with 'email', 'name', 'password', and 'role' fields.
     """
     try:
-        # Decrypt the AES key
-        aes_key = encryption_manager.decrypt_aes_key(encrypted_req.encrypted_key)
-        
-        # Decrypt the payload
-        decrypted_data = encryption_manager.decrypt_payload(encrypted_req.encrypted_payload, aes_key)
+        # Decrypt the AES key and the payload off the event loop
+        decrypted_data = await encryption_manager.decrypt_request_async(
+            encrypted_req.encrypted_key, encrypted_req.encrypted_payload, encrypted_req.key_padding
+        )
         
         # Extract data from decrypted payload
         email = decrypted_data.get("email")
@@ -170,7 +171,7 @@ async def register_user_encrypted(
         new_user = User(
             email=email,
             name=name,
-            password=get_password_hash(password),
+            password=await password_hasher.hash(password),
             role=role
         )
         db.add(new_user)
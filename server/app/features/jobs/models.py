@@ -0,0 +1,33 @@
+import enum
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import JSON, DateTime, Index, String, Enum as SQLAEnum
+from sqlalchemy.orm import Mapped, mapped_column
+
+from database import Base, utcnow
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    # Out of attempts; kept for inspection. Finished jobs are deleted.
+    FAILED = "failed"
+
+class Job(Base):
+    """A unit of deferred work, inserted in the same transaction as the change that caused it."""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Claiming: due queued jobs in run_after order; expired leases of running ones
+        Index("ix_jobs_status_run_after", "status", "run_after"),
+        Index("ix_jobs_status_locked_until", "status", "locked_until"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    kind: Mapped[str] = mapped_column(String(100))
+    payload: Mapped[dict] = mapped_column(JSON, default=dict)
+    status: Mapped[JobStatus] = mapped_column(SQLAEnum(JobStatus), default=JobStatus.QUEUED)
+    attempts: Mapped[int] = mapped_column(default=0)
+    run_after: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
+    locked_until: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    last_error: Mapped[Optional[str]] = mapped_column(String(1000), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
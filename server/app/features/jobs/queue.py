@@ -0,0 +1,225 @@
+import asyncio
+import time
+from collections import deque
+from datetime import timedelta
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import AsyncSessionLocal, utcnow
+from app.core.config import settings
+from app.core.metrics import LatencyStats
+from app.features.jobs.models import Job, JobStatus
+
+THROUGHPUT_WINDOW = 60.0
+
+JobHandler = Callable[..., Awaitable]
+
+# Job kind (handler function name) -> handler; filled by @job_handler
+_handlers: dict[str, JobHandler] = {}
+
+
+def job_handler(func: JobHandler) -> JobHandler:
+    """Register a coroutine function as a job kind; its keyword arguments are the job payload."""
+    _handlers[func.__name__] = func
+    return func
+
+
+def enqueue(db: AsyncSession, handler: JobHandler, **payload) -> Job:
+    """
+    Add a job to the caller's session. It is written by the caller's commit,
+    so the job exists exactly when the change that caused it does.
+    """
+    if _handlers.get(handler.__name__) is not handler:
+        raise ValueError(f"{handler.__name__} is not a registered job handler")
+    job = Job(kind=handler.__name__, payload=payload)
+    db.add(job)
+    return job
+
+
+class JobWorkerPool:
+    """
+    Workers that run queued jobs from the jobs table.
+
+    Each worker claims up to `batch_size` due jobs with one UPDATE ...
+    RETURNING (FOR UPDATE SKIP LOCKED on PostgreSQL, SQLite's single
+    writer elsewhere), runs them concurrently, then records the outcomes in
+    one transaction: finished jobs are deleted, failed ones go back to the
+    queue after an exponential backoff until `max_attempts` is reached and
+    they are marked failed. A claim holds a `lease`; jobs of a worker that
+    died are claimed again once it expires.
+
+    The app runs the pool in its lifespan; `python -m app.features.jobs.worker`
+    runs it as a separate process instead.
+    """
+
+    def __init__(self, workers: int, batch_size: int, poll_interval: float, lease: float,
+                 max_attempts: int, backoff: float, backoff_max: float):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lease = timedelta(seconds=lease)
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self._tasks: list[asyncio.Task] = []
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self._next_lease_check = 0.0
+        # Completion times within the last THROUGHPUT_WINDOW seconds
+        self._completions: deque = deque()
+        self.job_time = LatencyStats()
+        self.in_flight = 0
+        self.completed = 0
+        self.retried = 0
+        self.failed = 0
+        self.database_errors = 0
+
+    async def start(self) -> None:
+        if self.workers <= 0:
+            return
+        self._stopping = False
+        # Fresh event so it binds to the loop that runs the workers
+        self._wake = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._work(), name=f"job-worker-{i}") for i in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Let every worker finish the batch it holds, then stop."""
+        if not self._tasks:
+            return
+        self._stopping = True
+        self._wake.set()
+        await asyncio.gather(*self._tasks)
+        self._tasks = []
+
+    def wake(self) -> None:
+        """New jobs were committed; don't wait for the next poll."""
+        self._wake.set()
+
+    async def _work(self) -> None:
+        while not self._stopping:
+            try:
+                jobs = await self.claim()
+                if jobs:
+                    await self.run_batch(jobs)
+                    continue
+            except Exception:
+                # Database busy or gone: wait one poll interval. Jobs whose outcome
+                # wasn't recorded run again once their lease expires.
+                self.database_errors += 1
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def claim(self) -> list:
+        """Mark up to batch_size due jobs as running and return (id, kind, payload, attempts) rows."""
+        now = utcnow()
+        async with AsyncSessionLocal() as db:
+            if time.monotonic() >= self._next_lease_check:
+                self._next_lease_check = time.monotonic() + self.lease.total_seconds() / 2
+                await db.execute(
+                    update(Job)
+                    .where(Job.status == JobStatus.RUNNING, Job.locked_until < now)
+                    .values(status=JobStatus.QUEUED)
+                )
+            due = (
+                select(Job.id)
+                .where(Job.status == JobStatus.QUEUED, Job.run_after <= now)
+                .order_by(Job.run_after)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            claimed = (await db.execute(
+                update(Job)
+                .where(Job.id.in_(due.scalar_subquery()))
+                .values(status=JobStatus.RUNNING, locked_until=now + self.lease, attempts=Job.attempts + 1)
+                .returning(Job.id, Job.kind, Job.payload, Job.attempts)
+                .execution_options(synchronize_session=False)
+            )).all()
+            await db.commit()
+        return claimed
+
+    async def _run(self, job) -> Optional[str]:
+        """Run one claimed job; returns the error message if it failed."""
+        handler = _handlers.get(job.kind)
+        if handler is None:
+            return f"no handler registered for {job.kind!r}"
+        start = time.perf_counter()
+        try:
+            await handler(**job.payload)
+        except Exception as e:
+            return f"{type(e).__name__}: {e}"[:1000]
+        finally:
+            self.job_time.observe(time.perf_counter() - start)
+        return None
+
+    async def run_batch(self, jobs: list) -> None:
+        self.in_flight += len(jobs)
+        try:
+            errors = await asyncio.gather(*(self._run(job) for job in jobs))
+        finally:
+            self.in_flight -= len(jobs)
+
+        done = [job.id for job, error in zip(jobs, errors) if error is None]
+        now = utcnow()
+        async with AsyncSessionLocal() as db:
+            if done:
+                await db.execute(delete(Job).where(Job.id.in_(done)))
+            for job, error in zip(jobs, errors):
+                if error is None:
+                    continue
+                if job.attempts >= self.max_attempts:
+                    values = {"status": JobStatus.FAILED, "locked_until": None, "last_error": error}
+                    self.failed += 1
+                else:
+                    delay = min(self.backoff * 2 ** (job.attempts - 1), self.backoff_max)
+                    values = {
+                        "status": JobStatus.QUEUED, "locked_until": None, "last_error": error,
+                        "run_after": now + timedelta(seconds=delay),
+                    }
+                    self.retried += 1
+                await db.execute(update(Job).where(Job.id == job.id).values(**values))
+            await db.commit()
+
+        self.completed += len(done)
+        self._completions.extend([time.monotonic()] * len(done))
+        self._trim_completions()
+
+    def _trim_completions(self) -> None:
+        since = time.monotonic() - THROUGHPUT_WINDOW
+        while self._completions and self._completions[0] < since:
+            self._completions.popleft()
+
+    def throughput(self) -> float:
+        """Jobs completed per second, averaged over the last THROUGHPUT_WINDOW seconds."""
+        self._trim_completions()
+        return len(self._completions) / THROUGHPUT_WINDOW
+
+    def stats(self) -> dict:
+        return {
+            "workers": len(self._tasks),
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "retried": self.retried,
+            "failed": self.failed,
+            "database_errors": self.database_errors,
+            "throughput_per_second": self.throughput(),
+            "job_latency": self.job_time.snapshot(),
+        }
+
+
+# Global instance
+job_workers = JobWorkerPool(
+    workers=settings.JOB_WORKERS,
+    batch_size=settings.JOB_BATCH_SIZE,
+    poll_interval=settings.JOB_POLL_INTERVAL_SECONDS,
+    lease=settings.JOB_LEASE_SECONDS,
+    max_attempts=settings.JOB_MAX_ATTEMPTS,
+    backoff=settings.JOB_RETRY_BACKOFF_SECONDS,
+    backoff_max=settings.JOB_RETRY_BACKOFF_MAX_SECONDS,
+)
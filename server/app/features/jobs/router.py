@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import utcnow
+from dependencies import get_db
+from app.core.security import RequireRole
+from app.features.jobs.models import Job, JobStatus
+from app.features.jobs.queue import job_workers
+from app.features.jobs.schema import JobQueueStats
+
+router = APIRouter(prefix="/jobs", dependencies=[Depends(RequireRole.manager)], tags=["Jobs"])
+
+@router.get("/stats", response_model=JobQueueStats)
+async def get_job_queue_stats(db: AsyncSession = Depends(get_db)):
+    """Queue depth from the jobs table, throughput from this process's workers."""
+    now = utcnow()
+    counts = dict((await db.execute(select(Job.status, func.count()).group_by(Job.status))).all())
+    due, oldest = (await db.execute(
+        select(func.count(), func.min(Job.run_after))
+        .where(Job.status == JobStatus.QUEUED, Job.run_after <= now)
+    )).one()
+    stats = job_workers.stats()
+    return JobQueueStats(
+        queued=counts.get(JobStatus.QUEUED, 0),
+        due=due,
+        running=counts.get(JobStatus.RUNNING, 0),
+        failed=counts.get(JobStatus.FAILED, 0),
+        oldest_due_seconds=(now - oldest).total_seconds() if oldest else None,
+        workers=stats["workers"],
+        completed=stats["completed"],
+        retried=stats["retried"],
+        throughput_per_second=stats["throughput_per_second"],
+    )
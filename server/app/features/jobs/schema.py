@@ -0,0 +1,16 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+class JobQueueStats(BaseModel):
+    queued: int
+    # Queued and past run_after, i.e. waiting only for a worker
+    due: int
+    running: int
+    failed: int
+    oldest_due_seconds: Optional[float] = None
+    # Workers of this process
+    workers: int
+    completed: int
+    retried: int
+    throughput_per_second: float
@@ -0,0 +1,58 @@
+"""
+Run the job workers as their own process, away from request handling:
+
+    python -m app.features.jobs.worker --workers 4
+
+Set JOB_WORKERS=0 for the API processes so only this pool claims jobs.
+Notifications written here reach the API's live streams through each API
+process's database tail (NOTIFICATION_STREAM_TAIL_SECONDS), so the worker
+refuses to start with the tail turned off.
+"""
+import argparse
+import asyncio
+import signal
+
+from bootstrap import schema_bootstrap
+from app.core.config import settings
+from app.features.jobs.queue import JobWorkerPool
+from app.features.notifications.sink import notification_sink
+# Registers the notification job handlers
+import app.features.notifications.tasks  # noqa: F401
+
+
+async def _main(workers: int) -> None:
+    if settings.NOTIFICATION_STREAM_TAIL_SECONDS <= 0:
+        raise SystemExit(
+            "NOTIFICATION_STREAM_TAIL_SECONDS is 0: the API would only stream notifications "
+            "it writes itself, and none written by this worker. Enable the tail or run the "
+            "job workers inside the API (JOB_WORKERS > 0)."
+        )
+    if settings.BOOTSTRAP_SCHEMA_ON_STARTUP:
+        await schema_bootstrap.run()
+    pool = JobWorkerPool(
+        workers=workers,
+        batch_size=settings.JOB_BATCH_SIZE,
+        poll_interval=settings.JOB_POLL_INTERVAL_SECONDS,
+        lease=settings.JOB_LEASE_SECONDS,
+        max_attempts=settings.JOB_MAX_ATTEMPTS,
+        backoff=settings.JOB_RETRY_BACKOFF_SECONDS,
+        backoff_max=settings.JOB_RETRY_BACKOFF_MAX_SECONDS,
+    )
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    await notification_sink.start()
+    await pool.start()
+    print(f"job worker pool running with {workers} workers; Ctrl+C to stop")
+    await stopping.wait()
+    await pool.stop()
+    await notification_sink.stop()
+    print(f"stopped after {pool.completed} jobs ({pool.retried} retried, {pool.failed} failed)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Durable job queue worker pool")
+    parser.add_argument("--workers", type=int, default=max(settings.JOB_WORKERS, 1))
+    asyncio.run(_main(parser.parse_args().workers))
@@ -0,0 +1,138 @@
+"""
+Vectorized amortization (fixed-rate, equal monthly instalments).
+
+All functions take NumPy arrays, so a whole chunk of applications is
+handled in a few array operations instead of a Python loop per loan. The
+balance after k payments has the closed form
+
+    B_k = P (1 + r)^k - EMI ((1 + r)^k - 1) / r,    r = annual rate / 12
+
+which is linear in the principal P. A portfolio projection therefore only
+needs the summed principal per distinct interest rate: the database does
+that GROUP BY, and memory is bounded by the number of rates however many
+applications there are.
+"""
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.features.loans.enums import LoanStatus
+from app.features.loans.models import BankLoan, UserLoanApplication
+from app.features.loans.schema import (
+    AmortizationRow, ApplicationSchedule, CashFlowMonth, PortfolioProjection,
+)
+
+
+def monthly_payment(principal, annual_rate_percent, term_months: int) -> np.ndarray:
+    """EMI for every (principal, annual rate in percent) pair."""
+    principal = np.asarray(principal, dtype=np.float64)
+    rate = np.asarray(annual_rate_percent, dtype=np.float64) / 1200
+    with np.errstate(divide="ignore", invalid="ignore"):
+        payment = principal * rate / -np.expm1(-term_months * np.log1p(rate))
+    return np.where(rate == 0, principal / term_months, payment)
+
+
+def balances(principal, annual_rate_percent, term_months: int) -> np.ndarray:
+    """Outstanding balance before payment 1..term and after the last: shape (loans, term + 1)."""
+    principal = np.atleast_1d(np.asarray(principal, dtype=np.float64))[:, None]
+    rate = np.atleast_1d(np.asarray(annual_rate_percent, dtype=np.float64) / 1200)[:, None]
+    payment = monthly_payment(principal, rate * 1200, term_months)
+    k = np.arange(term_months + 1, dtype=np.float64)[None, :]
+    growth = np.exp(k * np.log1p(rate))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        accrued = np.where(rate == 0, k, np.expm1(k * np.log1p(rate)) / rate)
+    return np.clip(principal * growth - payment * accrued, 0.0, None)
+
+
+def schedule_columns(principal, annual_rate_percent, term_months: int) -> dict[str, np.ndarray]:
+    """Per-month payment/interest/principal/balance of the (summed) loans, each of length term."""
+    balance = balances(principal, annual_rate_percent, term_months)
+    rate = np.atleast_1d(np.asarray(annual_rate_percent, dtype=np.float64) / 1200)[:, None]
+    interest = (balance[:, :-1] * rate).sum(axis=0)
+    principal_paid = (balance[:, :-1] - balance[:, 1:]).sum(axis=0)
+    return {
+        "payment": interest + principal_paid,
+        "interest": interest,
+        "principal": principal_paid,
+        "balance": balance[:, 1:].sum(axis=0),
+    }
+
+
+def application_schedule(
+    application_id: int, amount: float, annual_rate_percent: float, term_months: int
+) -> ApplicationSchedule:
+    columns = schedule_columns(amount, annual_rate_percent, term_months)
+    rows = np.column_stack([columns["payment"], columns["interest"], columns["principal"], columns["balance"]]).round(2)
+    return ApplicationSchedule(
+        application_id=application_id,
+        amount=amount,
+        interest_rate=annual_rate_percent,
+        term_months=term_months,
+        monthly_payment=round(float(monthly_payment(amount, annual_rate_percent, term_months)), 2),
+        total_interest=round(float(columns["interest"].sum()), 2),
+        schedule=[
+            AmortizationRow(month=month, payment=payment, interest=interest, principal=principal, balance=balance)
+            for month, (payment, interest, principal, balance) in enumerate(rows.tolist(), start=1)
+        ],
+    )
+
+
+class PortfolioAccumulator:
+    """Folds chunks of (amount, rate) arrays into principal-per-rate sums."""
+
+    def __init__(self, term_months: int):
+        self.term_months = term_months
+        self.applications = 0
+        self._rates = np.empty(0)
+        self._principal = np.empty(0)
+
+    def add(self, amounts: np.ndarray, rates: np.ndarray, applications: int = None) -> None:
+        """Fold in principals and their rates; pass `applications` when amounts are already sums."""
+        if not len(amounts):
+            return
+        self.applications += len(amounts) if applications is None else applications
+        unique_rates, inverse = np.unique(np.concatenate([self._rates, rates]), return_inverse=True)
+        weights = np.concatenate([self._principal, amounts])
+        self._rates = unique_rates
+        self._principal = np.bincount(inverse, weights=weights, minlength=len(unique_rates))
+
+    def result(self) -> PortfolioProjection:
+        if not len(self._rates):
+            months = []
+            total_interest = monthly = 0.0
+        else:
+            columns = schedule_columns(self._principal, self._rates, self.term_months)
+            outstanding = np.concatenate([[self._principal.sum()], columns["balance"][:-1]])
+            rows = np.column_stack([
+                columns["payment"], columns["interest"], columns["principal"], outstanding,
+            ]).round(2)
+            months = [
+                CashFlowMonth(month=month, inflow=payment, interest=interest, principal=principal, outstanding=balance)
+                for month, (payment, interest, principal, balance) in enumerate(rows.tolist(), start=1)
+            ]
+            total_interest = float(columns["interest"].sum())
+            monthly = float(monthly_payment(self._principal, self._rates, self.term_months).sum())
+        return PortfolioProjection(
+            term_months=self.term_months,
+            applications=self.applications,
+            principal=round(float(self._principal.sum()), 2),
+            monthly_inflow=round(monthly, 2),
+            total_interest=round(total_interest, 2),
+            months=months,
+        )
+
+
+async def project_portfolio(db: AsyncSession, term_months: int) -> PortfolioProjection:
+    """Projected monthly inflows of every approved application, assuming all start this month."""
+    stmt = (
+        select(BankLoan.interest_rate, func.sum(UserLoanApplication.amount), func.count())
+        .join(UserLoanApplication.loan)
+        .where(UserLoanApplication.status == LoanStatus.APPROVED)
+        .group_by(BankLoan.interest_rate)
+    )
+    accumulator = PortfolioAccumulator(term_months)
+    rows = (await db.execute(stmt)).all()
+    if rows:
+        rates, principal, counts = np.array(rows, dtype=np.float64).T
+        accumulator.add(principal, rates, applications=int(counts.sum()))
+    return accumulator.result()
@@ -0,0 +1,87 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+
+from database import AsyncSessionLocal
+from app.core.config import settings
+from app.features.loans.models import BankLoan
+from app.features.loans.schema import BankLoanRead
+
+_listing_adapter = TypeAdapter(list[BankLoanRead])
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """Immutable view of the active loan products at one version."""
+    version: int
+    loans: dict[int, BankLoanRead]
+    # GET /loans/ body, serialized once per version
+    payload: bytes
+    built_at: float
+
+
+class LoanCatalog:
+    """
+    In-memory snapshot of the active loan catalog.
+
+    The catalog only changes through the manager CRUD routes, which call
+    reload() after committing. Readers grab the current snapshot reference, so
+    a reload swaps it atomically and never exposes a half-built state.
+    LOAN_CATALOG_MAX_AGE_SECONDS bounds staleness when another worker process
+    made the change.
+    """
+
+    def __init__(self, max_age: float):
+        self.max_age = max_age
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._version = 0
+        self._lock = asyncio.Lock()
+        self.reloads = 0
+
+    async def get(self) -> CatalogSnapshot:
+        snapshot = self._snapshot
+        if snapshot is None or time.monotonic() - snapshot.built_at > self.max_age:
+            async with self._lock:
+                # Someone else may have rebuilt it while we waited
+                if self._snapshot is snapshot:
+                    await self._build()
+            snapshot = self._snapshot
+        return snapshot
+
+    async def reload(self) -> CatalogSnapshot:
+        """Rebuild from the database. Call after committing a catalog change."""
+        async with self._lock:
+            await self._build()
+        return self._snapshot
+
+    async def _build(self) -> None:
+        # Own session: a reload must see the caller's committed write, not its transaction
+        async with AsyncSessionLocal() as db:
+            stmt = select(BankLoan).where(BankLoan.is_active == True).order_by(BankLoan.id)
+            rows = (await db.execute(stmt)).scalars().all()
+            loans = [BankLoanRead.model_validate(loan) for loan in rows]
+
+        self._version += 1
+        self.reloads += 1
+        self._snapshot = CatalogSnapshot(
+            version=self._version,
+            loans={loan.id: loan for loan in loans},
+            payload=_listing_adapter.dump_json(loans),
+            built_at=time.monotonic(),
+        )
+
+    def stats(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version if snapshot else 0,
+            "active_loans": len(snapshot.loans) if snapshot else 0,
+            "reloads": self.reloads,
+        }
+
+
+# Global instance
+loan_catalog = LoanCatalog(max_age=settings.LOAN_CATALOG_MAX_AGE_SECONDS)
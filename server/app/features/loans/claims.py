@@ -0,0 +1,93 @@
+"""
+Review claims: leases on pending applications so concurrent managers work
+different rows.
+
+A manager claims the next N unclaimed pending applications (riskiest
+first, like the review queue) for REVIEW_CLAIM_LEASE_SECONDS. Deciding an
+application, or releasing the claims, ends the lease; an abandoned one
+simply expires and the rows go back to the pool. Decisions themselves are
+compare-and-swap on UserLoanApplication.version (see the manager PUT route),
+so a claim is about not wasting work, not about correctness.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import Select, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import utcnow
+from app.features.loans.enums import LoanStatus
+from app.features.loans.models import BankLoan, UserLoanApplication
+
+
+def unclaimed(now: datetime):
+    """Rows nobody holds a live claim on."""
+    return or_(UserLoanApplication.claim_expires_at.is_(None), UserLoanApplication.claim_expires_at < now)
+
+
+def claimable_stmt(count: int, now: datetime) -> Select:
+    """Ids of the next `count` unclaimed pending applications; rows another claimer has locked are skipped."""
+    return (
+        select(UserLoanApplication.id)
+        .where(UserLoanApplication.status == LoanStatus.PENDING, unclaimed(now))
+        .order_by(UserLoanApplication.risk_score.desc(), UserLoanApplication.id.desc())
+        .limit(count)
+        .with_for_update(skip_locked=True)
+    )
+
+
+def claimed_rows_stmt(application_ids: list[int]) -> Select:
+    return (
+        select(
+            UserLoanApplication.id,
+            UserLoanApplication.amount,
+            UserLoanApplication.status,
+            BankLoan.name,
+            BankLoan.interest_rate,
+            UserLoanApplication.risk_score,
+            UserLoanApplication.version,
+            UserLoanApplication.claim_expires_at,
+        )
+        .join(UserLoanApplication.loan)
+        .where(UserLoanApplication.id.in_(application_ids))
+        .order_by(UserLoanApplication.risk_score.desc(), UserLoanApplication.id.desc())
+    )
+
+
+async def claim_applications(db: AsyncSession, manager_id: int, count: int, lease_seconds: float) -> list[dict]:
+    """
+    Lease up to `count` pending applications to the manager with one
+    UPDATE ... RETURNING, then commit. Returns them as ClaimedApplicationRow
+    dicts, riskiest first, with the version to send back with the decision.
+    """
+    now = utcnow()
+    claimed = (await db.execute(
+        update(UserLoanApplication)
+        .where(UserLoanApplication.id.in_(claimable_stmt(count, now).scalar_subquery()), unclaimed(now))
+        .values(claimed_by=manager_id, claim_expires_at=now + timedelta(seconds=lease_seconds))
+        .returning(UserLoanApplication.id)
+        .execution_options(synchronize_session=False)
+    )).scalars().all()
+    await db.commit()
+    if not claimed:
+        return []
+    return [
+        {
+            "id": id, "amount": amount, "status": status, "risk_score": risk_score,
+            "version": version, "claim_expires_at": claim_expires_at,
+            "loan": {"name": name, "interest_rate": interest_rate},
+        }
+        for id, amount, status, name, interest_rate, risk_score, version, claim_expires_at
+        in await db.execute(claimed_rows_stmt(claimed))
+    ]
+
+
+async def release_claims(db: AsyncSession, manager_id: int) -> int:
+    """Hand back every application the manager still holds; returns how many."""
+    released = await db.execute(
+        update(UserLoanApplication)
+        .where(UserLoanApplication.claimed_by == manager_id, UserLoanApplication.status == LoanStatus.PENDING)
+        .values(claimed_by=None, claim_expires_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return released.rowcount
@@ -0,0 +1,152 @@
+from collections import defaultdict
+
+from sqlalchemy import insert, or_, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import utcnow
+from app.features.loans.claims import unclaimed
+from app.features.loans.enums import LoanStatus
+from app.features.loans.models import UserLoanApplication
+from app.features.loans.schema import LoanApplicationDecision, LoanApplicationDecisionResult
+from app.features.loans.pagination import applications_changed
+from app.features.loans.stats import record_status_changes
+from app.features.notifications.hub import notification_hub
+from app.features.notifications.models import Notification
+from app.features.notifications.tasks import status_update_message
+from app.features.notifications.unread import unread_counters
+from app.features.users.models import UserRole
+
+# Keeps every IN (...) list (two parameters per row for (id, version)) under SQLite's bound-parameter limit
+CHUNK_SIZE = 400
+
+# Results for applications that exist but were left alone
+SKIPPED_RESULTS = ("unchanged", "claimed", "conflict")
+
+
+def _chunks(items: list) -> list:
+    return [items[i:i + CHUNK_SIZE] for i in range(0, len(items), CHUNK_SIZE)]
+
+
+async def apply_decisions(
+    db: AsyncSession, decisions: list[LoanApplicationDecision], manager_id: int,
+) -> list[LoanApplicationDecisionResult]:
+    """
+    Apply many status changes in one transaction with set-based statements.
+
+    One UPDATE ... RETURNING per target status (per chunk) changes the
+    applications, one upsert moves the portfolio stats, one UPDATE marks the
+    related manager broadcasts read, and the user notifications go in as a
+    single bulk INSERT. The first decision for an application wins; repeats
+    are reported as duplicates. Commits, then publishes the new
+    notifications to connected streams.
+
+    The same rules as the single PUT apply per application: one that
+    already has the decided status is a no-op ("unchanged"), one another
+    manager holds a live review claim on is skipped ("claimed"), and the
+    UPDATE is a compare-and-swap on the version that was read, repeating the
+    claim and status checks, so a row changed in between is left alone
+    ("conflict"). Stats and notifications follow only the rows the UPDATE
+    returned, so racing decisions can't move the same application out of
+    its old status bucket twice.
+    """
+    first_decisions: dict[int, LoanStatus] = {}
+    for decision in decisions:
+        first_decisions.setdefault(decision.application_id, decision.status)
+
+    now = utcnow()
+    # application id -> (version, loan id, amount, status) as read
+    read: dict[int, tuple] = {}
+    skipped: dict[int, str] = {}
+    for chunk in _chunks(list(first_decisions)):
+        stmt = select(
+            UserLoanApplication.id, UserLoanApplication.version,
+            UserLoanApplication.loanId, UserLoanApplication.amount, UserLoanApplication.status,
+            UserLoanApplication.claimed_by, UserLoanApplication.claim_expires_at,
+        ).where(UserLoanApplication.id.in_(chunk))
+        for application_id, version, loan_id, amount, old_status, claimed_by, claim_expires_at in await db.execute(stmt):
+            read[application_id] = (version, loan_id, amount, old_status)
+            if old_status == first_decisions[application_id]:
+                skipped[application_id] = "unchanged"
+            elif claimed_by not in (None, manager_id) and claim_expires_at > now:
+                skipped[application_id] = "claimed"
+
+    by_status: dict[LoanStatus, list[int]] = defaultdict(list)
+    for application_id in read:
+        if application_id not in skipped:
+            by_status[first_decisions[application_id]].append(application_id)
+
+    owners: dict[int, int] = {}
+    stat_changes = []
+    for new_status, application_ids in by_status.items():
+        for chunk in _chunks(application_ids):
+            changed = await db.execute(
+                update(UserLoanApplication)
+                .where(
+                    tuple_(UserLoanApplication.id, UserLoanApplication.version).in_(
+                        [(application_id, read[application_id][0]) for application_id in chunk]
+                    ),
+                    UserLoanApplication.status != new_status,
+                    or_(UserLoanApplication.claimed_by.is_(None), UserLoanApplication.claimed_by == manager_id, unclaimed(now)),
+                )
+                # Same bookkeeping as a single decision: invalidates versions held by others, ends claims
+                .values(status=new_status, version=UserLoanApplication.version + 1, claimed_by=None, claim_expires_at=None)
+                .returning(UserLoanApplication.id, UserLoanApplication.userId)
+                .execution_options(synchronize_session=False)
+            )
+            for application_id, user_id in changed:
+                owners[application_id] = user_id
+                _, loan_id, amount, old_status = read[application_id]
+                stat_changes.append((loan_id, amount, old_status, new_status))
+
+    await record_status_changes(db, stat_changes)
+
+    for chunk in _chunks([f"loan_app_{application_id}" for application_id in owners]):
+        await db.execute(
+            update(Notification)
+            .where(Notification.reference_id.in_(chunk))
+            .values(is_read=True, read_at=now)
+            .execution_options(synchronize_session=False)
+        )
+
+    created = []
+    if owners:
+        created = (await db.execute(
+            insert(Notification).returning(
+                Notification.id, Notification.user_id, Notification.message, Notification.created_at
+            ),
+            [
+                {"user_id": owners[application_id], "message": status_update_message(first_decisions[application_id])}
+                for application_id in owners
+            ],
+        )).all()
+
+    await db.commit()
+
+    if owners:
+        applications_changed(owners.values())
+        unread_counters.forget_role(UserRole.MANAGER)
+    for notification in created:
+        unread_counters.published(user_id=notification.user_id)
+        notification_hub.publish(
+            notification.id, notification.message, notification.created_at, user_id=notification.user_id
+        )
+
+    results = []
+    reported = set()
+    for decision in decisions:
+        application_id = decision.application_id
+        if application_id in reported:
+            results.append(LoanApplicationDecisionResult(application_id=application_id, result="duplicate"))
+            continue
+        reported.add(application_id)
+        if application_id in owners:
+            results.append(LoanApplicationDecisionResult(
+                application_id=application_id, status=first_decisions[application_id], result="updated"
+            ))
+        elif application_id in read:
+            results.append(LoanApplicationDecisionResult(
+                application_id=application_id, result=skipped.get(application_id, "conflict")
+            ))
+        else:
+            results.append(LoanApplicationDecisionResult(application_id=application_id, result="not_found"))
+    return results
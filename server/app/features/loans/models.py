@@ -1,9 +1,9 @@
 import enum
 from datetime import datetime
 from typing import List, Optional
-from database import Base
+from database import Base, utcnow
 from sqlalchemy.orm import Mapped,mapped_column,relationship
-from sqlalchemy import String, Float,Boolean, Enum as SQLAEnum, ForeignKey, DateTime
+from sqlalchemy import String, Float,Boolean, Enum as SQLAEnum, ForeignKey, DateTime, Index, Integer
 from app.features.loans.enums import LoanStatus
 
 class BankLoan(Base):
@@ -22,6 +22,25 @@ class BankLoan(Base):
 
 class UserLoanApplication(Base):
     __tablename__ = "user_loan_applications"
+    __table_args__ = (
+        # One application per user and loan; also serves "applications of user X".
+        # A unique index rather than a table constraint so it can be added to existing databases.
+        Index("uq_user_loan_applications_user_loan", "userId", "loanId", unique=True),
+        # Keyset pages (ORDER BY id) of one user's applications, all of them or by status
+        Index("ix_user_loan_applications_user_id", "userId", "id"),
+        Index("ix_user_loan_applications_user_status_id", "userId", "status", "id"),
+        # Keyset pages of the manager queue for one status
+        Index("ix_user_loan_applications_status_id", "status", "id"),
+        # Cascading deletes of a loan product
+        Index("ix_user_loan_applications_loan_id", "loanId"),
+        # Review queue: one status in score order (keyset on score, id); also finds unscored rows
+        Index("ix_user_loan_applications_status_risk_id", "status", "risk_score", "id"),
+        # A manager's live claims
+        Index("ix_user_loan_applications_claimed_by", "claimed_by"),
+        # Search filters (app/features/loans/search.py): submission date and amount ranges
+        Index("ix_user_loan_applications_created_at", "created_at"),
+        Index("ix_user_loan_applications_amount", "amount"),
+    )
 
     id:Mapped[int]=mapped_column(primary_key=True,index=True)
     userId:Mapped[int]=mapped_column(ForeignKey("users.id",ondelete="CASCADE"))
@@ -29,7 +48,32 @@ class UserLoanApplication(Base):
 
     amount:Mapped[int]=mapped_column(Float)
     status:Mapped[LoanStatus]=mapped_column(SQLAEnum(LoanStatus),default=LoanStatus.PENDING)
+    # 0..1, higher is riskier; set by app/features/loans/risk.py, NULL until first scored
+    risk_score:Mapped[Optional[float]]=mapped_column(Float,nullable=True)
+    # Bumped by every status change; PUT updates are compare-and-swap on it
+    version:Mapped[int]=mapped_column(Integer,default=0,server_default="0")
+    # Review lease (app/features/loans/claims.py): the manager's user id and when it runs out.
+    # No foreign key, so the column can be added to existing databases with ALTER TABLE.
+    claimed_by:Mapped[Optional[int]]=mapped_column(Integer,nullable=True)
+    claim_expires_at:Mapped[Optional[datetime]]=mapped_column(DateTime,nullable=True)
+    # Submission time (UTC); NULL for applications made before the column existed
+    created_at:Mapped[Optional[datetime]]=mapped_column(DateTime,nullable=True,default=utcnow)
 
     user: Mapped["User"] = relationship("User", back_populates="loan_applications")
     loan: Mapped["BankLoan"] = relationship("BankLoan", back_populates="applicant_links")
 
+
+class LoanApplicationStats(Base):
+    """
+    Running totals of applications per loan product and status.
+
+    Maintained in the same transaction as every application insert and
+    status change (see app/features/loans/stats.py), so manager analytics
+    read one row per product and status instead of scanning applications.
+    """
+    __tablename__ = "loan_application_stats"
+
+    loan_id:Mapped[int]=mapped_column(ForeignKey("bank_loans.id",ondelete="CASCADE"),primary_key=True)
+    status:Mapped[LoanStatus]=mapped_column(SQLAEnum(LoanStatus),primary_key=True)
+    application_count:Mapped[int]=mapped_column(default=0)
+    total_amount:Mapped[float]=mapped_column(Float,default=0.0)
@@ -0,0 +1,183 @@
+import base64
+import binascii
+import json
+from typing import AsyncIterator, Iterable, Literal, Optional
+
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import AsyncSessionLocal
+from app.core.change_sequence import APPLICATIONS, change_sequences
+from app.core.serialization import RowSerializer
+from app.features.loans.models import BankLoan, UserLoanApplication
+from app.features.loans.enums import LoanStatus
+from app.features.loans.schema import ReviewQueueRow, UserLoanApplicationRow
+from app.features.users.models import UserRole
+
+MAX_PAGE_SIZE = 500
+STREAM_CHUNK_SIZE = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+ListFormat = Literal["json", "ndjson"]
+
+_application_rows = RowSerializer(UserLoanApplicationRow)
+_review_queue_rows = RowSerializer(ReviewQueueRow)
+
+
+def application_rows_stmt() -> Select:
+    """Just the listed columns, with the loan joined in instead of loaded per application."""
+    return select(
+        UserLoanApplication.id,
+        UserLoanApplication.amount,
+        UserLoanApplication.status,
+        BankLoan.name,
+        BankLoan.interest_rate,
+    ).join(UserLoanApplication.loan)
+
+
+def applications_changed(user_ids: Iterable[int]) -> None:
+    """Call after committing a change to these applicants' applications: their listings and the managers' are stale."""
+    for user_id in set(user_ids):
+        change_sequences.user_changed(APPLICATIONS, user_id)
+    change_sequences.role_changed(APPLICATIONS, UserRole.MANAGER)
+
+
+def _as_dicts(rows) -> list[dict]:
+    return [
+        {"id": id, "amount": amount, "status": status, "loan": {"name": name, "interest_rate": interest_rate}}
+        for id, amount, status, name, interest_rate in rows
+    ]
+
+
+def encode_cursor(last_id: int) -> str:
+    """Opaque keyset cursor: the id of the last row the client has seen."""
+    raw = json.dumps({"id": last_id}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded))["id"]
+        if not isinstance(last_id, int):
+            raise ValueError
+        return last_id
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def encode_score_cursor(last_score: float, last_id: int) -> str:
+    """Keyset cursor for the review queue: score and id of the last row seen."""
+    raw = json.dumps({"score": last_score, "id": last_id}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_score_cursor(cursor: str) -> tuple[float, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded))
+        last_score, last_id = raw["score"], raw["id"]
+        if not isinstance(last_score, (int, float)) or not isinstance(last_id, int):
+            raise ValueError
+        return float(last_score), last_id
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+async def _stream_ndjson(stmt: Select) -> AsyncIterator[bytes]:
+    """
+    Yield one JSON object per line from a server-side result stream.
+
+    Uses its own session so the connection lives exactly as long as the
+    stream, and only STREAM_CHUNK_SIZE rows are held in memory at a time.
+    """
+    stmt = stmt.execution_options(yield_per=STREAM_CHUNK_SIZE)
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(stmt)
+        async for partition in result.partitions():
+            yield _application_rows.dump_lines(_as_dicts(partition))
+
+
+async def list_applications(
+    db: AsyncSession,
+    stmt: Select,
+    limit: Optional[int],
+    cursor: Optional[str],
+    list_format: ListFormat,
+):
+    """
+    Shared listing logic for the user and manager application routes; `stmt`
+    is application_rows_stmt() plus the route's filters.
+
+    Rows are returned in id order and serialized straight to JSON bytes. With `limit`, one extra row is fetched to
+    find out whether another page exists; if so its cursor is sent back in
+    the X-Next-Cursor header. Without `limit` every matching row is returned,
+    as before.
+    """
+    stmt = stmt.order_by(UserLoanApplication.id)
+    if cursor:
+        stmt = stmt.where(UserLoanApplication.id > decode_cursor(cursor))
+
+    if list_format == "ndjson":
+        if limit:
+            stmt = stmt.limit(limit)
+        return StreamingResponse(_stream_ndjson(stmt), media_type="application/x-ndjson")
+
+    if limit:
+        stmt = stmt.limit(limit + 1)
+    rows = (await db.execute(stmt)).all()
+
+    headers = {}
+    if limit and len(rows) > limit:
+        rows = rows[:limit]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].id)
+    return _application_rows.response(_as_dicts(rows), headers=headers)
+
+
+def review_queue_stmt(riskiest_first: bool, after: Optional[tuple[float, int]] = None) -> Select:
+    """
+    Scored pending applications ordered by (risk_score, id), resuming after
+    the `after` key. The filter and order match the (status, risk_score, id)
+    index, so any page is an index range scan; applications not scored yet
+    are left out until the scorer gets to them.
+    """
+    key = tuple_(UserLoanApplication.risk_score, UserLoanApplication.id)
+    stmt = (
+        select(
+            UserLoanApplication.id,
+            UserLoanApplication.amount,
+            UserLoanApplication.status,
+            BankLoan.name,
+            BankLoan.interest_rate,
+            UserLoanApplication.risk_score,
+        )
+        .join(UserLoanApplication.loan)
+        .where(UserLoanApplication.status == LoanStatus.PENDING, UserLoanApplication.risk_score.is_not(None))
+    )
+    if riskiest_first:
+        stmt = stmt.order_by(UserLoanApplication.risk_score.desc(), UserLoanApplication.id.desc())
+    else:
+        stmt = stmt.order_by(UserLoanApplication.risk_score, UserLoanApplication.id)
+    if after:
+        stmt = stmt.where(key < tuple_(*after) if riskiest_first else key > tuple_(*after))
+    return stmt
+
+
+async def list_review_queue(db: AsyncSession, limit: int, cursor: Optional[str], riskiest_first: bool):
+    """One page of the review queue; the next page's cursor goes in the X-Next-Cursor header."""
+    stmt = review_queue_stmt(riskiest_first, decode_score_cursor(cursor) if cursor else None)
+    rows = (await db.execute(stmt.limit(limit + 1))).all()
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers[NEXT_CURSOR_HEADER] = encode_score_cursor(rows[-1].risk_score, rows[-1].id)
+    items = [
+        {
+            "id": id, "amount": amount, "status": status, "risk_score": risk_score,
+            "loan": {"name": name, "interest_rate": interest_rate},
+        }
+        for id, amount, status, name, interest_rate, risk_score in rows
+    ]
+    return _review_queue_rows.response(items, headers=headers)
@@ -0,0 +1,314 @@
+"""
+Risk scores for pending loan applications, computed in NumPy batches.
+
+    score = sigmoid(sum of WEIGHTS[feature] * feature)
+
+with the features centred so an application with no history and an average
+request scores 0.5:
+
+    amount            log(amount / the product's average requested amount)
+    interest_rate     (product interest rate - 10) / 10
+    product_rejected  the product's smoothed rejection rate - 0.5
+    user_rejected     the applicant's smoothed rejection rate on other applications - 0.5
+    user_pending      log1p(the applicant's other pending applications)
+
+Smoothed rate = (rejected + 1) / (decided + 2). The weights are set by hand
+until there are repayment outcomes to fit them on.
+
+Product figures come from loan_application_stats; applicant history is
+one GROUP BY. New applications are scored shortly after they arrive and
+every pending application is re-scored periodically, since histories move
+as other applications are decided:
+
+    python -m app.features.loans.risk --rescore
+"""
+import argparse
+import asyncio
+import time
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import AsyncSessionLocal
+from app.core.config import settings
+from app.core.encryption import KEY_DIR
+from app.core.filelock import FileLock
+from app.core.metrics import LatencyStats
+from app.features.loans.enums import LoanStatus
+from app.features.loans.models import BankLoan, LoanApplicationStats, UserLoanApplication
+
+WEIGHTS = {
+    "amount": 0.8,
+    "interest_rate": 0.5,
+    "product_rejected": 1.5,
+    "user_rejected": 2.5,
+    "user_pending": 0.4,
+}
+
+# Core executemany; the ORM's bulk UPDATE by primary key does per-row bookkeeping
+# that costs more than the statement itself
+_set_score = (
+    update(UserLoanApplication.__table__)
+    .where(UserLoanApplication.__table__.c.id == bindparam("row_id"))
+    .values(risk_score=bindparam("score"))
+)
+
+# Keeps every IN (...) list well under SQLite's bound-parameter limit
+_IN_CHUNK = 500
+
+
+def _smoothed_rejection(rejected: np.ndarray, approved: np.ndarray) -> np.ndarray:
+    return (rejected + 1) / (rejected + approved + 2)
+
+
+def risk_scores(
+    amount: np.ndarray,
+    interest_rate: np.ndarray,
+    product_avg_amount: np.ndarray,
+    product_rejected: np.ndarray,
+    user_rejected: np.ndarray,
+    user_pending: np.ndarray,
+) -> np.ndarray:
+    """Scores in (0, 1) for arrays of per-application features (rates already smoothed)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        amount_ratio = np.log(np.maximum(amount, 1.0) / product_avg_amount)
+    z = (
+        WEIGHTS["amount"] * np.nan_to_num(amount_ratio, nan=0.0, posinf=0.0, neginf=0.0)
+        + WEIGHTS["interest_rate"] * (interest_rate - 10) / 10
+        + WEIGHTS["product_rejected"] * (product_rejected - 0.5)
+        + WEIGHTS["user_rejected"] * (user_rejected - 0.5)
+        + WEIGHTS["user_pending"] * np.log1p(user_pending)
+    )
+    return 1 / (1 + np.exp(-z))
+
+
+async def product_features(db: AsyncSession) -> dict[str, np.ndarray]:
+    """interest_rate, avg_amount and rejection rate per loan product, indexed by loan id."""
+    loans = (await db.execute(select(BankLoan.id, BankLoan.interest_rate))).all()
+    size = max((loan_id for loan_id, _ in loans), default=0) + 1
+    interest_rate = np.zeros(size)
+    for loan_id, rate in loans:
+        interest_rate[loan_id] = rate or 0.0
+
+    counts = {status: np.zeros(size) for status in LoanStatus}
+    amounts = np.zeros(size)
+    stats = select(
+        LoanApplicationStats.loan_id, LoanApplicationStats.status,
+        LoanApplicationStats.application_count, LoanApplicationStats.total_amount,
+    )
+    for loan_id, status, count, total in await db.execute(stats):
+        if loan_id < size:
+            counts[status][loan_id] = count
+            amounts[loan_id] += total
+
+    applications = sum(counts.values())
+    # No figures at all: NaN makes the amount feature neutral in risk_scores()
+    overall_avg = amounts.sum() / applications.sum() if applications.sum() else np.nan
+    with np.errstate(divide="ignore", invalid="ignore"):
+        avg_amount = np.where(applications > 0, amounts / applications, overall_avg)
+    return {
+        "interest_rate": interest_rate,
+        "avg_amount": avg_amount,
+        "rejected": _smoothed_rejection(counts[LoanStatus.REJECTED], counts[LoanStatus.APPROVED]),
+    }
+
+
+async def applicant_history(db: AsyncSession, user_ids: Optional[np.ndarray] = None) -> dict[LoanStatus, np.ndarray]:
+    """Application counts per status, indexed by user id; every applicant, or just `user_ids`."""
+    base = select(UserLoanApplication.userId, UserLoanApplication.status, func.count()).group_by(
+        UserLoanApplication.userId, UserLoanApplication.status
+    )
+    if user_ids is None:
+        rows = (await db.execute(base)).all()
+    else:
+        rows = []
+        for start in range(0, len(user_ids), _IN_CHUNK):
+            chunk = [int(user_id) for user_id in user_ids[start:start + _IN_CHUNK]]
+            rows += (await db.execute(base.where(UserLoanApplication.userId.in_(chunk)))).all()
+
+    size = max((user_id for user_id, _, _ in rows), default=0) + 1
+    history = {status: np.zeros(size) for status in LoanStatus}
+    for user_id, status, count in rows:
+        history[status][user_id] = count
+    return history
+
+
+def score_rows(rows, products: dict[str, np.ndarray], history: dict[LoanStatus, np.ndarray]) -> np.ndarray:
+    """Scores for (id, userId, loanId, amount) rows of pending applications."""
+    _, user_ids, loan_ids, amounts = (np.asarray(column) for column in zip(*rows))
+    user_ids = user_ids.astype(np.int64)
+    loan_ids = loan_ids.astype(np.int64)
+    # Products created after `products` was loaded have no figures yet
+    known = loan_ids < len(products["interest_rate"])
+    loan_ids = np.where(known, loan_ids, 0)
+    # Likewise applicants who first applied after `history` was loaded: no history
+    known_user = user_ids < len(history[LoanStatus.PENDING])
+    user_ids = np.where(known_user, user_ids, 0)
+    rejected, approved, pending = (
+        np.where(known_user, history[status][user_ids], 0.0)
+        for status in (LoanStatus.REJECTED, LoanStatus.APPROVED, LoanStatus.PENDING)
+    )
+    return risk_scores(
+        amount=amounts.astype(np.float64),
+        interest_rate=np.where(known, products["interest_rate"][loan_ids], 10.0),
+        product_avg_amount=np.where(known, products["avg_amount"][loan_ids], np.nan),
+        product_rejected=np.where(known, products["rejected"][loan_ids], 0.5),
+        user_rejected=_smoothed_rejection(rejected, approved),
+        # The application itself is one of the applicant's pending ones
+        user_pending=np.maximum(pending - 1, 0),
+    )
+
+
+async def score_pending(db: AsyncSession, chunk_size: int, unscored_only: bool = False) -> int:
+    """
+    (Re-)score pending applications in id order, chunk_size per transaction.
+    Returns how many were scored.
+    """
+    products = await product_features(db)
+    history = None if unscored_only else await applicant_history(db)
+    scored, last_id = 0, 0
+    while True:
+        stmt = (
+            select(UserLoanApplication.id, UserLoanApplication.userId, UserLoanApplication.loanId, UserLoanApplication.amount)
+            .where(UserLoanApplication.status == LoanStatus.PENDING, UserLoanApplication.id > last_id)
+            .order_by(UserLoanApplication.id)
+            .limit(chunk_size)
+        )
+        if unscored_only:
+            stmt = stmt.where(UserLoanApplication.risk_score.is_(None))
+        rows = (await db.execute(stmt)).all()
+        if not rows:
+            break
+        if unscored_only:
+            history = await applicant_history(db, np.unique([row.userId for row in rows]))
+        scores = score_rows(rows, products, history)
+        await db.execute(
+            _set_score,
+            [{"row_id": row.id, "score": score} for row, score in zip(rows, scores.tolist())],
+        )
+        await db.commit()
+        scored += len(rows)
+        last_id = rows[-1].id
+        if len(rows) < chunk_size:
+            break
+    return scored
+
+
+class RiskScoring:
+    """
+    Background scorer. Every `interval` seconds (or right after wake()) it
+    scores pending applications that have no score yet; every
+    `rescore_interval` seconds it re-scores all pending ones. Started and
+    stopped by the app lifespan.
+
+    Every API worker starts the scorer, but only the one holding the
+    `.risk-scoring.lock` file lock scores; the others retry the lock each
+    interval and take over when the leader exits. So wake() only speeds
+    things up in the leader: an application submitted through another
+    worker is scored on the leader's next interval.
+    """
+
+    def __init__(self, interval: float, rescore_interval: float, chunk_size: int):
+        self.interval = interval
+        self.rescore_interval = rescore_interval
+        self.chunk_size = chunk_size
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self._last_rescore = 0.0
+        self.leader_lock = FileLock(KEY_DIR / ".risk-scoring.lock")
+        self.scoring_time = LatencyStats()
+        self.rescore_time = LatencyStats()
+        self.scored_new = 0
+        self.rescored = 0
+        self.failed_runs = 0
+
+    async def start(self) -> None:
+        if self.interval <= 0:
+            return
+        self._stopping = False
+        # Fresh event so it binds to the loop that runs the job
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="risk-scoring")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wake.set()
+        await self._task
+        self._task = None
+
+    def wake(self) -> None:
+        """A new application was committed; score it without waiting for the next interval."""
+        self._wake.set()
+
+    async def _run(self) -> None:
+        try:
+            while not self._stopping:
+                if self.leader_lock.try_acquire():
+                    try:
+                        await self.run_once()
+                    except Exception:
+                        # Keep the schedule; the next run picks up whatever is left
+                        self.failed_runs += 1
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+        finally:
+            self.leader_lock.release()
+
+    async def run_once(self) -> None:
+        async with AsyncSessionLocal() as db:
+            if self.rescore_interval > 0 and time.monotonic() - self._last_rescore >= self.rescore_interval:
+                try:
+                    with self.rescore_time.time():
+                        self.rescored += await score_pending(db, self.chunk_size)
+                finally:
+                    # Also after a failure: retrying every interval would keep
+                    # new applications waiting behind a full rescore
+                    self._last_rescore = time.monotonic()
+            else:
+                with self.scoring_time.time():
+                    self.scored_new += await score_pending(db, self.chunk_size, unscored_only=True)
+
+    def stats(self) -> dict:
+        return {
+            "leader": self.leader_lock.held,
+            "scored_new": self.scored_new,
+            "rescored": self.rescored,
+            "failed_runs": self.failed_runs,
+            "scoring_latency": self.scoring_time.snapshot(),
+            "rescore_latency": self.rescore_time.snapshot(),
+        }
+
+
+# Global instance
+risk_scoring = RiskScoring(
+    interval=settings.RISK_SCORING_INTERVAL_SECONDS,
+    rescore_interval=settings.RISK_RESCORE_INTERVAL_SECONDS,
+    chunk_size=settings.RISK_SCORING_CHUNK_SIZE,
+)
+
+
+async def _main() -> None:
+    from bootstrap import schema_bootstrap
+
+    await schema_bootstrap.run()
+    async with AsyncSessionLocal() as db:
+        start = time.perf_counter()
+        scored = await score_pending(db, settings.RISK_SCORING_CHUNK_SIZE)
+    print(f"re-scored {scored} pending applications in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Loan application risk scoring")
+    parser.add_argument("--rescore", action="store_true", help="re-score every pending application now")
+    if parser.parse_args().rescore:
+        asyncio.run(_main())
+    else:
+        parser.print_help()
@@ -1,27 +1,61 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
+from sqlalchemy import or_, select, update
 from sqlalchemy.orm import selectinload
-from typing import Annotated
+from datetime import datetime
+from typing import Annotated, Literal, Optional
 from fastapi.security import OAuth2PasswordRequestForm
 
-from app.features.users.models import User
+from app.features.users.models import User, UserRole
 from app.features.users.schema import UserCreate,UserRead
 from app.features.loans.models import UserLoanApplication,BankLoan
 from app.features.loans.schema import BankLoanCreate,BankLoanRead, UserLoanApplicationResponse,UserLoanApplicationUpdate
+from app.features.loans.schema import LoanApplicationDecisionBatch, LoanApplicationDecisionBatchResponse, BankLoanRow, LoanPortfolioStats
+from app.features.loans.schema import ApplicationSchedule, PortfolioProjection, ReviewQueueItem
+from app.features.loans.schema import ClaimedApplication, ClaimedApplicationRow, ReviewClaimRelease, ApplicationSearchResult
+from app.features.loans.amortization import application_schedule, project_portfolio
+from app.features.loans.enums import LoanStatus
+from app.features.loans.export import (
+    APPLICATION_SCHEMA, LOAN_SCHEMA, ExportFormat, application_export_stmt, export_response, loan_export_stmt,
+)
+from app.features.loans.decisions import SKIPPED_RESULTS, apply_decisions
+from app.features.loans.claims import claim_applications, release_claims, unclaimed
+from app.features.loans.search import search_applications
+from app.features.loans.pagination import (
+    MAX_PAGE_SIZE, ListFormat, application_rows_stmt, applications_changed, list_applications, list_review_queue,
+)
+from app.features.loans.catalog import loan_catalog
+from app.features.loans.stats import forget_loan, portfolio_stats, record_status_changes
+from app.core.change_sequence import APPLICATIONS, change_sequences
+from app.core.config import settings
 from app.core.security import get_current_user,RequireRole
+from app.core.serialization import RowSerializer
 from dependencies import get_db
+from database import AsyncSessionLocal, utcnow
+from app.core.singleflight import single_flight
 from app.features.notifications.models import Notification
 from app.features.notifications.tasks import notify_user_of_update
+from app.features.jobs.queue import enqueue, job_workers
+from app.features.notifications.unread import unread_counters
+
+_loan_rows = RowSerializer(BankLoanRow)
+_claimed_rows = RowSerializer(ClaimedApplicationRow)
 
 router = APIRouter(prefix="/manager/loans",dependencies=[Depends(RequireRole.manager)], tags=["Manager Loans"])
 
 # Manager routes for managing loans (CRUD operations for loans, viewing all applications, updating application status, etc.)
 @router.get("/",response_model=list[BankLoanRead],status_code=status.HTTP_200_OK)
-async def get_all_loans(db: AsyncSession = Depends(get_db)):
-    stmt = select(BankLoan)
-    result = await db.execute(stmt)
-    return result.scalars().all()
+async def get_all_loans(db: AsyncSession = Depends(get_db), current_user: User = Depends(RequireRole.manager)):
+    # Auth may have checked out a connection on this session; hand it back before waiting on a shared query
+    await db.close()
+
+    async def load():
+        async with AsyncSessionLocal() as db:
+            stmt = select(BankLoan.name, BankLoan.interest_rate, BankLoan.id, BankLoan.is_active)
+            result = await db.execute(stmt)
+            return _loan_rows.response(row._asdict() for row in result)
+    # Dashboards poll this; concurrent polls share one query
+    return await single_flight.response(("manager_loans", current_user.role), load)
 
 @router.post("/",response_model=BankLoanRead,status_code=status.HTTP_201_CREATED)
 async def create_loan(loan_data: BankLoanCreate, db: AsyncSession = Depends(get_db)):
@@ -29,6 +63,7 @@ async def create_loan(loan_data: BankLoanCreate, db: AsyncSession = Depends(get_
     db.add(loan)
     await db.commit()
     await db.refresh(loan)
+    await loan_catalog.reload()
     return loan
 
 @router.put("/{loan_id}",response_model=BankLoanRead,status_code=status.HTTP_200_OK)
@@ -41,7 +76,10 @@ async def update_loan(loan_id: int, loan_data: BankLoanCreate, db: AsyncSession
     loan.name = loan_data.name
     loan.interest_rate = loan_data.interest_rate
     await db.commit()
+    # Every application listing shows the product's name and rate
+    change_sequences.feed_changed(APPLICATIONS)
     await db.refresh(loan)
+    await loan_catalog.reload()
     return loan
 
 @router.delete("/{loan_id}",status_code=status.HTTP_204_NO_CONTENT)
@@ -52,43 +90,191 @@ async def delete_loan(loan_id: int, db: AsyncSession = Depends(get_db)):
     if not loan:
         raise HTTPException(status_code=404, detail="Loan not found")
     await db.delete(loan)
+    await forget_loan(db, loan_id)
     await db.commit()
+    change_sequences.feed_changed(APPLICATIONS)
+    await loan_catalog.reload()
+
+@router.get("/export",status_code=status.HTTP_200_OK)
+async def export_loans(export_format: ExportFormat = Query("csv", alias="format")):
+    return export_response(loan_export_stmt(), LOAN_SCHEMA, export_format, "loans")
+
+@router.get("/stats",response_model=LoanPortfolioStats,status_code=status.HTTP_200_OK)
+async def get_portfolio_stats(db: AsyncSession = Depends(get_db)):
+    """Counts and amounts per loan product and status, from the maintained summary table."""
+    return await portfolio_stats(db)
+
+@router.get("/projections",response_model=PortfolioProjection,status_code=status.HTTP_200_OK)
+async def get_cash_flow_projection(
+    term_months: int = Query(settings.LOAN_DEFAULT_TERM_MONTHS, ge=1, le=settings.LOAN_MAX_TERM_MONTHS),
+    db: AsyncSession = Depends(get_db),
+):
+    """Expected monthly repayments of all approved applications, assuming each starts now."""
+    return await project_portfolio(db, term_months)
+
+@router.get("/applications/export",status_code=status.HTTP_200_OK)
+async def export_loan_applications(
+    export_format: ExportFormat = Query("csv", alias="format"),
+    status: Optional[LoanStatus] = None,
+    loan_id: Optional[int] = None,
+):
+    """Every matching application with its loan product and applicant, streamed as CSV or Parquet."""
+    stmt = application_export_stmt(status, loan_id)
+    return export_response(stmt, APPLICATION_SCHEMA, export_format, "loan-applications")
+
+@router.get("/applications/review-queue",response_model=list[ReviewQueueItem],status_code=status.HTTP_200_OK)
+async def get_review_queue(
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    order: Literal["desc", "asc"] = "desc",
+    db: AsyncSession = Depends(get_db),
+):
+    """Pending applications by risk score, riskiest first unless order=asc; paged with the X-Next-Cursor header."""
+    return await list_review_queue(db, limit, cursor, riskiest_first=order == "desc")
+
+@router.get("/applications/search",response_model=list[ApplicationSearchResult],status_code=status.HTTP_200_OK)
+async def search_loan_applications(
+    q: Optional[str] = Query(None, max_length=200, description="Words matched against applicant name/email and loan name"),
+    status: Optional[LoanStatus] = None,
+    loan_id: Optional[int] = None,
+    min_amount: Optional[float] = Query(None, ge=0),
+    max_amount: Optional[float] = Query(None, ge=0),
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """Applications matching every given filter, newest first; paged with the X-Next-Cursor header."""
+    return await search_applications(
+        db, limit, cursor, q=q, status=status, loan_id=loan_id, min_amount=min_amount,
+        max_amount=max_amount, created_from=created_from, created_to=created_to,
+    )
+
+@router.get("/applications/{application_id}/schedule",response_model=ApplicationSchedule,status_code=status.HTTP_200_OK)
+async def get_application_schedule(
+    application_id: int,
+    term_months: int = Query(settings.LOAN_DEFAULT_TERM_MONTHS, ge=1, le=settings.LOAN_MAX_TERM_MONTHS),
+    db: AsyncSession = Depends(get_db),
+):
+    stmt = (
+        select(UserLoanApplication.amount, BankLoan.interest_rate)
+        .join(UserLoanApplication.loan)
+        .where(UserLoanApplication.id == application_id)
+    )
+    row = (await db.execute(stmt)).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Loan application not found")
+    return application_schedule(application_id, row.amount, row.interest_rate, term_months)
 
 @router.get("/applications",response_model=list[UserLoanApplicationResponse],status_code=status.HTTP_200_OK)
-async def get_all_loan_applications(status: str = None, db: AsyncSession = Depends(get_db)):
-    stmt = select(UserLoanApplication).options(selectinload(UserLoanApplication.loan))
+async def get_all_loan_applications(
+    request: Request,
+    status: str = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    list_format: ListFormat = Query("json", alias="format"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(RequireRole.manager),
+):
+    # Checked before any query: an unchanged poll costs no database work at all
+    etag = change_sequences.etag(request, APPLICATIONS, role=current_user.role)
+    if (not_modified := change_sequences.not_modified_response(request, etag)) is not None:
+        return not_modified
+
+    stmt = application_rows_stmt()
     if status:
         stmt = stmt.where(UserLoanApplication.status == status)
-    result = await db.execute(stmt)
-    return result.scalars().all()
+    if list_format == "ndjson":
+        return change_sequences.tag(await list_applications(db, stmt, limit, cursor, list_format), etag)
+    await db.close()
+
+    async def load():
+        async with AsyncSessionLocal() as flight_db:
+            return await list_applications(flight_db, stmt, limit, cursor, list_format)
+    # Dashboards poll the pending list; identical concurrent pages share one query.
+    # The ETag is part of the key so a flight started before a write isn't shared with requests tagged after it
+    key = ("manager_applications", current_user.role, status, limit, cursor, etag)
+    return change_sequences.tag(await single_flight.response(key, load), etag)
+
+@router.post("/applications/claim", response_model=list[ClaimedApplication], status_code=status.HTTP_200_OK)
+async def claim_loan_applications(
+    count: int = Query(10, ge=1, le=settings.REVIEW_CLAIM_MAX_COUNT),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Lease the next `count` unclaimed pending applications to this manager, riskiest first."""
+    rows = await claim_applications(db, current_user.id, count, settings.REVIEW_CLAIM_LEASE_SECONDS)
+    return _claimed_rows.response(rows)
+
+@router.delete("/applications/claim", response_model=ReviewClaimRelease, status_code=status.HTTP_200_OK)
+async def release_loan_application_claims(db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Hand back the applications this manager claimed but hasn't decided."""
+    return ReviewClaimRelease(released=await release_claims(db, current_user.id))
 
 @router.put("/applications/{application_id}", response_model=UserLoanApplicationResponse, status_code=status.HTTP_200_OK)
 async def update_loan_application_status(
     application_id: int, 
     application_data: UserLoanApplicationUpdate, 
-    background_tasks: BackgroundTasks,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
 ):
     stmt = select(UserLoanApplication).options(selectinload(UserLoanApplication.loan)).where(UserLoanApplication.id == application_id)
     application = (await db.execute(stmt)).scalar_one_or_none()
     
     if not application:
         raise HTTPException(status_code=404, detail="Loan application not found")
-        
-    application.status = application_data.status
+    if application_data.version is not None and application_data.version != application.version:
+        raise HTTPException(status_code=409, detail="Loan application was changed by someone else")
+    now = utcnow()
+    if application.claimed_by not in (None, current_user.id) and application.claim_expires_at > now:
+        raise HTTPException(status_code=409, detail="Loan application is claimed by another manager")
+    if application.status == application_data.status:
+        # Nothing changes, so the applicant isn't notified again
+        return application
+
+    # Compare-and-swap: only one of several concurrent decisions on the same version wins
+    changed = await db.execute(
+        update(UserLoanApplication)
+        .where(
+            UserLoanApplication.id == application_id,
+            UserLoanApplication.version == application.version,
+            or_(UserLoanApplication.claimed_by.is_(None), UserLoanApplication.claimed_by == current_user.id, unclaimed(now)),
+        )
+        .values(status=application_data.status, version=UserLoanApplication.version + 1, claimed_by=None, claim_expires_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    if not changed.rowcount:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Loan application was changed by someone else")
+
+    await record_status_changes(db, [(application.loanId, application.amount, application.status, application_data.status)])
 
     notification_stmt = update(Notification).where(
         Notification.reference_id == f"loan_app_{application_id}" 
-    ).values(is_read=True)
+    ).values(is_read=True, read_at=now)
     await db.execute(notification_stmt)
+    enqueue(db, notify_user_of_update, user_id=application.userId, status=application_data.status)
 
     await db.commit()
+    applications_changed([application.userId])
+    # The "new application" broadcast is resolved for every manager
+    unread_counters.forget_role(UserRole.MANAGER)
+    job_workers.wake()
     await db.refresh(application)
 
-    background_tasks.add_task(
-        notify_user_of_update, 
-        user_id=application.userId, 
-        status=application_data.status
-    )
-
     return application
+
+@router.post("/applications/decisions", response_model=LoanApplicationDecisionBatchResponse, status_code=status.HTTP_200_OK)
+async def decide_loan_applications(
+    batch: LoanApplicationDecisionBatch,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Approve/reject many applications in one transaction; reports the outcome per item."""
+    results = await apply_decisions(db, batch.decisions, current_user.id)
+    return LoanApplicationDecisionBatchResponse(
+        updated=sum(result.result == "updated" for result in results),
+        skipped=[result.application_id for result in results if result.result in SKIPPED_RESULTS],
+        results=results,
+    )
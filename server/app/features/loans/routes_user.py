@@ -1,33 +1,52 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from sqlalchemy import select
-from typing import Annotated
+from sqlalchemy.exc import IntegrityError
+from typing import Annotated, Optional
 from fastapi.security import OAuth2PasswordRequestForm
 
 from app.features.users.models import User
 from app.features.users.schema import UserCreate,UserRead
+from app.core.change_sequence import APPLICATIONS, change_sequences
 from app.core.security import get_current_user
 from dependencies import get_db
 from app.features.loans.models import UserLoanApplication,BankLoan
 from app.features.loans.schema import BankLoanBase, UserLoanApplicationCreate,UserLoanApplicationResponse,BankLoanRead
+from app.features.loans.pagination import MAX_PAGE_SIZE, ListFormat, application_rows_stmt, applications_changed, list_applications
+from app.features.loans.catalog import loan_catalog
+from app.features.loans.stats import record_new_application
+from app.features.loans.risk import risk_scoring
 from app.features.notifications.tasks import notify_managers_of_new_loan
+from app.features.jobs.queue import enqueue, job_workers
 
 router = APIRouter(prefix="/loans",tags=["Loans"])
 
 @router.get("/",response_model=list[BankLoanRead],status_code=status.HTTP_200_OK)
-async def get_user_loans(db: AsyncSession = Depends(get_db)):
-    stmt = select(BankLoan).where(BankLoan.is_active == True)
-    result = await db.execute(stmt)
-    return result.scalars().all()
+async def get_user_loans():
+    # Served from the in-memory catalog; the body is serialized once per catalog version
+    snapshot = await loan_catalog.get()
+    return Response(content=snapshot.payload, media_type="application/json")
 
 @router.get("/applications",response_model=list[UserLoanApplicationResponse],status_code=status.HTTP_200_OK)
-async def get_user_loan_applications(status: str = None, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
-    stmt = select(UserLoanApplication).options(selectinload(UserLoanApplication.loan)).where(UserLoanApplication.userId == current_user.id)
+async def get_user_loan_applications(
+    request: Request,
+    status: str = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    list_format: ListFormat = Query("json", alias="format"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    # Polled by the dashboard: answered with 304 until one of the user's applications changes
+    etag = change_sequences.etag(request, APPLICATIONS, user_id=current_user.id)
+    if (not_modified := change_sequences.not_modified_response(request, etag)) is not None:
+        return not_modified
+
+    stmt = application_rows_stmt().where(UserLoanApplication.userId == current_user.id)
     if status:
         stmt = stmt.where(UserLoanApplication.status == status)
-    result = await db.execute(stmt)
-    return result.scalars().all()
+    return change_sequences.tag(await list_applications(db, stmt, limit, cursor, list_format), etag)
 
 @router.get("/applications/{application_id}",response_model=UserLoanApplicationResponse,status_code=status.HTTP_200_OK)
 async def get_user_loan_application(application_id: int, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
@@ -41,40 +60,38 @@ async def get_user_loan_application(application_id: int, db: AsyncSession = Depe
 @router.post("/apply", response_model=UserLoanApplicationResponse, status_code=status.HTTP_201_CREATED)
 async def apply_for_loan(
     application_data: UserLoanApplicationCreate, 
-    background_tasks: BackgroundTasks, 
     db: AsyncSession = Depends(get_db), 
     current_user: User = Depends(get_current_user)
 ):
     loan_id = application_data.loan_id
     
-    stmt = select(BankLoan).where(BankLoan.id == loan_id, BankLoan.is_active == True)
-    loan = (await db.execute(stmt)).scalar_one_or_none()
+    loan = (await loan_catalog.get()).loans.get(loan_id)
     if not loan:
         raise HTTPException(status_code=404, detail="Loan not found or not active")
     
-    existing_stmt = select(UserLoanApplication).where(
-        UserLoanApplication.userId == current_user.id, 
-        UserLoanApplication.loanId == loan_id
-    )
-    if (await db.execute(existing_stmt)).scalar_one_or_none():
-        raise HTTPException(status_code=400, detail="You have already applied for this loan")
-
+    # The unique (userId, loanId) constraint rejects duplicates, even concurrent ones
     application = UserLoanApplication(
         userId=current_user.id,
         loanId=loan_id,
-        amount=application_data.amount
+        amount=application_data.amount,
     )
     db.add(application)
-    await db.commit()
-    await db.refresh(application)
+    try:
+        await db.flush()
+        await record_new_application(db, loan_id, application_data.amount)
+        # Committed with the application, so the managers' notification can't be lost
+        enqueue(db, notify_managers_of_new_loan, user_email=current_user.email, application_id=application.id)
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="You have already applied for this loan")
+    applications_changed([current_user.id])
+    job_workers.wake()
+    risk_scoring.wake()
 
-    background_tasks.add_task(
-        notify_managers_of_new_loan, 
-        user_email=current_user.email, 
-        application_id=application.id
+    return UserLoanApplicationResponse(
+        id=application.id,
+        amount=application.amount,
+        status=application.status,
+        loan=loan,
     )
-    
-    stmt_final = select(UserLoanApplication).options(selectinload(UserLoanApplication.loan)).where(UserLoanApplication.id == application.id)
-    full_application = (await db.execute(stmt_final)).scalar_one()
-    
-    return full_application
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+from datetime import datetime
 from pydantic import BaseModel,Field,ConfigDict
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Literal, Optional
+from typing_extensions import TypedDict
 import enum
 
 from app.features.loans.enums import LoanStatus
@@ -35,6 +37,28 @@ class UserLoanApplicationCreate(UserLoanApplicationBase):
 
 class UserLoanApplicationUpdate(BaseModel):
     status: LoanStatus
+    # The version the decision was made on (from a claim); a newer one is a 409
+    version: Optional[int] = None
+
+class LoanApplicationDecision(BaseModel):
+    application_id: int
+    status: LoanStatus
+
+class LoanApplicationDecisionBatch(BaseModel):
+    decisions: list[LoanApplicationDecision] = Field(..., min_length=1, max_length=10_000)
+
+class LoanApplicationDecisionResult(BaseModel):
+    application_id: int
+    status: Optional[LoanStatus] = None
+    # unchanged: already had that status (no-op, like the PUT); claimed: another manager holds
+    # a live review claim; conflict: another decision changed it between the read and the update
+    result: Literal["updated", "unchanged", "claimed", "conflict", "not_found", "duplicate"]
+
+class LoanApplicationDecisionBatchResponse(BaseModel):
+    updated: int
+    # Found but left alone: unchanged, claimed or conflict
+    skipped: list[int] = []
+    results: list[LoanApplicationDecisionResult]
 
 class UserLoanApplicationResponse(BaseModel):
     id: int
@@ -45,5 +69,113 @@ class UserLoanApplicationResponse(BaseModel):
     
     model_config = ConfigDict(from_attributes=True)
 
+class LoanStatusStats(BaseModel):
+    count: int = 0
+    total_amount: float = 0.0
+
+class LoanProductStats(BaseModel):
+    loan_id: int
+    name: str
+    is_active: bool
+    applications: int
+    total_amount: float
+    # approved / (approved + rejected); None until something was decided
+    approval_rate: Optional[float] = None
+    by_status: dict[LoanStatus, LoanStatusStats]
+
+class LoanPortfolioStats(BaseModel):
+    applications: int
+    total_amount: float
+    approval_rate: Optional[float] = None
+    by_status: dict[LoanStatus, LoanStatusStats]
+    loans: list[LoanProductStats]
+
+class ReviewQueueItem(UserLoanApplicationResponse):
+    risk_score: float
+
+class ClaimedApplication(UserLoanApplicationResponse):
+    risk_score: Optional[float] = None
+    version: int
+    claim_expires_at: datetime
+
+class ReviewClaimRelease(BaseModel):
+    released: int
+
+class ApplicantSummary(BaseModel):
+    name: str
+    email: str
+
+class ApplicationSearchResult(UserLoanApplicationResponse):
+    # None for applications made before submission times were recorded
+    created_at: Optional[datetime] = None
+    applicant: ApplicantSummary
+
+class AmortizationRow(BaseModel):
+    month: int
+    payment: float
+    interest: float
+    principal: float
+    # Outstanding after this month's payment
+    balance: float
+
+class ApplicationSchedule(BaseModel):
+    application_id: int
+    amount: float
+    interest_rate: float
+    term_months: int
+    monthly_payment: float
+    total_interest: float
+    schedule: list[AmortizationRow]
+
+class CashFlowMonth(BaseModel):
+    month: int
+    inflow: float
+    interest: float
+    principal: float
+    # Outstanding at the start of the month
+    outstanding: float
+
+class PortfolioProjection(BaseModel):
+    term_months: int
+    applications: int
+    principal: float
+    monthly_inflow: float
+    total_interest: float
+    months: list[CashFlowMonth]
+
+# Row shapes for the column-based list endpoints: same JSON as the models above,
+# but validated as plain dicts, which is about twice as fast as building models
+class BankLoanRow(TypedDict):
+    name: str
+    interest_rate: float
+    id: int
+    is_active: bool
+
+class LoanSummaryRow(TypedDict):
+    name: str
+    interest_rate: float
+
+class UserLoanApplicationRow(TypedDict):
+    id: int
+    amount: float
+    status: LoanStatus
+    loan: LoanSummaryRow
+
+class ReviewQueueRow(UserLoanApplicationRow):
+    risk_score: float
+
+class ClaimedApplicationRow(UserLoanApplicationRow):
+    risk_score: Optional[float]
+    version: int
+    claim_expires_at: datetime
+
+class ApplicantSummaryRow(TypedDict):
+    name: str
+    email: str
+
+class ApplicationSearchRow(UserLoanApplicationRow):
+    created_at: Optional[datetime]
+    applicant: ApplicantSummaryRow
+
 class managerLoanApplicationResponse(UserLoanApplicationResponse):
     user: "UserRead"
\ No newline at end of file
@@ -0,0 +1,204 @@
+"""
+Manager search over loan applications: composable filters (status, loan
+product, amount and submission-date ranges) plus text search over the
+applicant's name and email and the loan product's name.
+
+On SQLite the text goes through application_search, an FTS5 table whose
+rowid is the application id. Triggers keep it in sync when applications are
+inserted, deleted or moved to another applicant or product, and when an
+applicant or product is renamed, so writers don't have to know it exists.
+Other backends fall back to case-insensitive substring matching (ILIKE).
+
+Results are newest first, paged with the listings' id cursor.
+"""
+import re
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import Select, column, inspect, literal_column, or_, select, table
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.serialization import RowSerializer
+from app.features.loans.enums import LoanStatus
+from app.features.loans.models import BankLoan, UserLoanApplication
+from app.features.loans.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from app.features.loans.schema import ApplicationSearchRow
+from app.features.users.models import User
+
+SEARCH_TABLE = "application_search"
+
+_search_table = table(SEARCH_TABLE, column("rowid"))
+
+_INDEXED_TEXT = f"""
+    SELECT a.id, u.name, u.email, l.name
+    FROM user_loan_applications AS a
+    JOIN users AS u ON u.id = a."userId"
+    JOIN bank_loans AS l ON l.id = a."loanId"
+"""
+
+# Recreated by bootstrap whenever the schema fingerprint (which hashes these) changes
+SEARCH_TRIGGERS = {
+    "application_search_insert": f"""
+        AFTER INSERT ON user_loan_applications BEGIN
+            INSERT INTO {SEARCH_TABLE} (rowid, applicant_name, applicant_email, loan_name)
+            SELECT new.id, u.name, u.email, l.name FROM users AS u, bank_loans AS l
+            WHERE u.id = new."userId" AND l.id = new."loanId";
+        END""",
+    "application_search_delete": f"""
+        AFTER DELETE ON user_loan_applications BEGIN
+            DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id;
+        END""",
+    "application_search_move": f"""
+        AFTER UPDATE OF "userId", "loanId" ON user_loan_applications BEGIN
+            UPDATE {SEARCH_TABLE}
+            SET applicant_name = (SELECT name FROM users WHERE id = new."userId"),
+                applicant_email = (SELECT email FROM users WHERE id = new."userId"),
+                loan_name = (SELECT name FROM bank_loans WHERE id = new."loanId")
+            WHERE rowid = new.id;
+        END""",
+    "application_search_applicant": f"""
+        AFTER UPDATE OF name, email ON users BEGIN
+            UPDATE {SEARCH_TABLE} SET applicant_name = new.name, applicant_email = new.email
+            WHERE rowid IN (SELECT id FROM user_loan_applications WHERE "userId" = new.id);
+        END""",
+    "application_search_loan": f"""
+        AFTER UPDATE OF name ON bank_loans BEGIN
+            UPDATE {SEARCH_TABLE} SET loan_name = new.name
+            WHERE rowid IN (SELECT id FROM user_loan_applications WHERE "loanId" = new.id);
+        END""",
+}
+
+# Prefix indexes for unfinished words of up to 6 characters (see match_query)
+SEARCH_TABLE_DDL = (
+    f"CREATE VIRTUAL TABLE {SEARCH_TABLE} "
+    f"USING fts5(applicant_name, applicant_email, loan_name, prefix='2 3 4 5 6')"
+)
+
+_search_rows = RowSerializer(ApplicationSearchRow)
+
+
+def create_search_index(sync_conn) -> None:
+    """
+    Bootstrap step (SQLite only): create and backfill application_search if
+    it's missing, and (re)create its triggers.
+    """
+    if sync_conn.dialect.name != "sqlite":
+        return
+    if not inspect(sync_conn).has_table(SEARCH_TABLE):
+        sync_conn.exec_driver_sql(SEARCH_TABLE_DDL)
+        sync_conn.exec_driver_sql(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, applicant_name, applicant_email, loan_name) {_INDEXED_TEXT}"
+        )
+    for name, body in SEARCH_TRIGGERS.items():
+        sync_conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {name}")
+        sync_conn.exec_driver_sql(f"CREATE TRIGGER {name} {body}")
+
+
+def match_query(text: str) -> Optional[str]:
+    """
+    User input as an FTS5 query, search-as-you-type style: every word must
+    match a token and the last one may be unfinished ('maria pat' ->
+    "maria" "pat"*). Only the last word is a prefix: a prefix the table has
+    no prefix index for (longer than 6 characters) is expanded into one
+    in-memory list of every row it matches, which for a common word is most
+    of the table, while whole words are seeked through their doclists.
+    """
+    words = re.findall(r"\w+", text)
+    if not words:
+        return None
+    return " ".join([f'"{word}"' for word in words[:-1]] + [f'"{words[-1]}"*'])
+
+
+def _naive_utc(value: datetime) -> datetime:
+    """Stored timestamps are naive UTC."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def search_stmt(
+    dialect_name: str,
+    q: Optional[str] = None,
+    status: Optional[LoanStatus] = None,
+    loan_id: Optional[int] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    before_id: Optional[int] = None,
+) -> Select:
+    """
+    Matching applications older than before_id with their product and
+    applicant, newest first. Every filter is optional and they combine with
+    AND; each one is served by an index (status, loanId, amount, created_at).
+
+    With text on SQLite the FTS table drives the query: FTS5 hands back
+    matches in descending rowid (= application id) order and stops at the
+    LIMIT, so a word that matches half the book costs no more than a rare one.
+    """
+    stmt = (
+        select(
+            UserLoanApplication.id, UserLoanApplication.amount, UserLoanApplication.status,
+            BankLoan.name, BankLoan.interest_rate,
+            UserLoanApplication.created_at, User.name, User.email,
+        )
+        .join(UserLoanApplication.loan)
+        .join(UserLoanApplication.user)
+    )
+    if status is not None:
+        stmt = stmt.where(UserLoanApplication.status == status)
+    if loan_id is not None:
+        stmt = stmt.where(UserLoanApplication.loanId == loan_id)
+    if min_amount is not None:
+        stmt = stmt.where(UserLoanApplication.amount >= min_amount)
+    if max_amount is not None:
+        stmt = stmt.where(UserLoanApplication.amount <= max_amount)
+    if created_from is not None:
+        stmt = stmt.where(UserLoanApplication.created_at >= _naive_utc(created_from))
+    if created_to is not None:
+        stmt = stmt.where(UserLoanApplication.created_at < _naive_utc(created_to))
+
+    key = UserLoanApplication.id
+    if q and q.strip():
+        if dialect_name == "sqlite":
+            query = match_query(q)
+            if query is None:
+                # Nothing searchable (only punctuation): nothing can match
+                return stmt.where(False)
+            key = _search_table.c.rowid
+            stmt = stmt.join(_search_table, key == UserLoanApplication.id).where(
+                literal_column(SEARCH_TABLE).match(query)
+            )
+        else:
+            for word in q.split():
+                stmt = stmt.where(or_(
+                    User.name.icontains(word, autoescape=True),
+                    User.email.icontains(word, autoescape=True),
+                    BankLoan.name.icontains(word, autoescape=True),
+                ))
+    if before_id is not None:
+        stmt = stmt.where(key < before_id)
+    return stmt.order_by(key.desc())
+
+
+async def search_applications(db: AsyncSession, limit: int, cursor: Optional[str], **filters):
+    """One page of search_stmt(**filters); X-Next-Cursor is set if there are more (older) matches."""
+    before_id = decode_cursor(cursor) if cursor else None
+    stmt = search_stmt(db.bind.dialect.name, before_id=before_id, **filters)
+    rows = (await db.execute(stmt.limit(limit + 1))).all()
+
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].id)
+    return _search_rows.response(
+        (
+            {
+                "id": id, "amount": amount, "status": status, "created_at": created_at,
+                "loan": {"name": loan_name, "interest_rate": interest_rate},
+                "applicant": {"name": applicant_name, "email": applicant_email},
+            }
+            for id, amount, status, loan_name, interest_rate, created_at, applicant_name, applicant_email in rows
+        ),
+        headers=headers,
+    )
@@ -0,0 +1,158 @@
+"""
+Incrementally maintained loan portfolio statistics.
+
+Every write path that creates an application or changes its status adds its
+delta to loan_application_stats inside its own transaction. Reads are one
+row per (loan product, status). rebuild() recomputes the table from
+user_loan_applications with a single GROUP BY; run it after bulk imports
+or to repair drift:
+
+    python -m app.features.loans.stats --rebuild
+"""
+import argparse
+import asyncio
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import AsyncSessionLocal, Base, engine
+from app.features.loans.enums import LoanStatus
+from app.features.loans.models import BankLoan, LoanApplicationStats, UserLoanApplication
+from app.features.loans.schema import LoanPortfolioStats, LoanProductStats, LoanStatusStats
+
+_DIALECT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+async def _add(db: AsyncSession, deltas: dict[tuple[int, LoanStatus], list]) -> None:
+    """Upsert {(loan_id, status): [count delta, amount delta]} into the summary table."""
+    rows = [
+        {"loan_id": loan_id, "status": status, "application_count": count, "total_amount": amount}
+        for (loan_id, status), (count, amount) in deltas.items()
+        if count or amount
+    ]
+    if not rows:
+        return
+    dialect_insert = _DIALECT_INSERTS[db.bind.dialect.name]
+    stmt = dialect_insert(LoanApplicationStats).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[LoanApplicationStats.loan_id, LoanApplicationStats.status],
+        set_={
+            "application_count": LoanApplicationStats.application_count + stmt.excluded.application_count,
+            "total_amount": LoanApplicationStats.total_amount + stmt.excluded.total_amount,
+        },
+    )
+    await db.execute(stmt)
+
+
+async def record_new_application(db: AsyncSession, loan_id: int, amount: float) -> None:
+    """Count a freshly submitted (pending) application. Call before committing it."""
+    await _add(db, {(loan_id, LoanStatus.PENDING): [1, amount]})
+
+
+async def record_status_changes(
+    db: AsyncSession, changes: Iterable[tuple[int, float, LoanStatus, LoanStatus]]
+) -> None:
+    """Move applications between statuses: (loan_id, amount, old status, new status) each."""
+    deltas: dict[tuple[int, LoanStatus], list] = defaultdict(lambda: [0, 0.0])
+    for loan_id, amount, old_status, new_status in changes:
+        if old_status == new_status:
+            continue
+        deltas[(loan_id, old_status)][0] -= 1
+        deltas[(loan_id, old_status)][1] -= amount
+        deltas[(loan_id, new_status)][0] += 1
+        deltas[(loan_id, new_status)][1] += amount
+    await _add(db, deltas)
+
+
+async def forget_loan(db: AsyncSession, loan_id: int) -> None:
+    """Drop a deleted loan product's rows (SQLite doesn't enforce the FK cascade)."""
+    await db.execute(delete(LoanApplicationStats).where(LoanApplicationStats.loan_id == loan_id))
+
+
+async def rebuild(db: AsyncSession) -> None:
+    """Recompute the whole table from user_loan_applications in one GROUP BY."""
+    totals = select(
+        UserLoanApplication.loanId,
+        UserLoanApplication.status,
+        func.count(),
+        func.coalesce(func.sum(UserLoanApplication.amount), 0.0),
+    ).group_by(UserLoanApplication.loanId, UserLoanApplication.status)
+    await db.execute(delete(LoanApplicationStats))
+    await db.execute(insert(LoanApplicationStats).from_select(
+        ["loan_id", "status", "application_count", "total_amount"], totals
+    ))
+    await db.commit()
+
+
+async def rebuild_if_empty(db: AsyncSession) -> bool:
+    """First start after the table was added: backfill it once from existing applications."""
+    has_stats = (await db.execute(select(LoanApplicationStats.loan_id).limit(1))).first()
+    has_applications = (await db.execute(select(UserLoanApplication.id).limit(1))).first()
+    if has_stats or not has_applications:
+        return False
+    await rebuild(db)
+    return True
+
+
+def _approval_rate(by_status: dict[LoanStatus, LoanStatusStats]) -> Optional[float]:
+    decided = by_status[LoanStatus.APPROVED].count + by_status[LoanStatus.REJECTED].count
+    return by_status[LoanStatus.APPROVED].count / decided if decided else None
+
+
+async def portfolio_stats(db: AsyncSession) -> LoanPortfolioStats:
+    """Per-product and overall figures; reads O(products x statuses) summary rows."""
+    stmt = select(
+        BankLoan.id, BankLoan.name, BankLoan.is_active,
+        LoanApplicationStats.status, LoanApplicationStats.application_count, LoanApplicationStats.total_amount,
+    ).outerjoin(LoanApplicationStats, LoanApplicationStats.loan_id == BankLoan.id).order_by(BankLoan.id)
+
+    products: dict[int, dict] = {}
+    overall = {status: LoanStatusStats() for status in LoanStatus}
+    for loan_id, name, is_active, status, count, amount in await db.execute(stmt):
+        product = products.setdefault(loan_id, {
+            "loan_id": loan_id, "name": name, "is_active": is_active,
+            "by_status": {status: LoanStatusStats() for status in LoanStatus},
+        })
+        if status is not None:
+            product["by_status"][status] = LoanStatusStats(count=count, total_amount=amount)
+            overall[status] = LoanStatusStats(
+                count=overall[status].count + count, total_amount=overall[status].total_amount + amount
+            )
+
+    loans = []
+    for product in products.values():
+        by_status = product["by_status"]
+        loans.append(LoanProductStats(
+            **product,
+            applications=sum(stats.count for stats in by_status.values()),
+            total_amount=sum(stats.total_amount for stats in by_status.values()),
+            approval_rate=_approval_rate(by_status),
+        ))
+    return LoanPortfolioStats(
+        applications=sum(stats.count for stats in overall.values()),
+        total_amount=sum(stats.total_amount for stats in overall.values()),
+        by_status=overall,
+        approval_rate=_approval_rate(overall),
+        loans=loans,
+    )
+
+
+async def _main() -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as db:
+        await rebuild(db)
+        stats = await portfolio_stats(db)
+    print(f"rebuilt loan_application_stats: {stats.applications} applications over {len(stats.loans)} loan products")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Loan portfolio statistics maintenance")
+    parser.add_argument("--rebuild", action="store_true", help="recompute loan_application_stats from scratch")
+    if parser.parse_args().rebuild:
+        asyncio.run(_main())
+    else:
+        parser.print_help()
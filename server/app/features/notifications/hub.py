@@ -0,0 +1,122 @@
+import asyncio
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator, Optional
+
+from app.core.config import settings
+from app.features.users.models import UserRole
+
+
+class Subscription:
+    """One connected stream. Events are queued here until the SSE response writes them."""
+
+    def __init__(self, user_id: int, role: UserRole, queue_size: int):
+        self.user_id = user_id
+        self.role = role
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        # Set when the client fell too far behind; the stream ends and the
+        # browser reconnects with Last-Event-ID to replay from the database.
+        self.overflowed = False
+
+
+class NotificationHub:
+    """
+    In-process pub/sub for notifications.
+
+    Publishers hand over a saved Notification; the hub fans it out to every
+    stream of the target user or role. Idle subscribers cost one queue each.
+
+    The same notification can be published twice in one process (by the sink
+    that wrote it, then by the database tail), so the hub remembers the ids
+    within `window` of the highest it has published and drops repeats.
+    """
+
+    def __init__(self, queue_size: int, window: int):
+        self.queue_size = queue_size
+        self.window = window
+        self._by_user: dict[int, set[Subscription]] = defaultdict(set)
+        self._by_role: dict[UserRole, set[Subscription]] = defaultdict(set)
+        self._recent: set[int] = set()
+        self._highest = 0
+        self.published = 0
+        self.repeats = 0
+        self.delivered = 0
+        self.overflows = 0
+
+    @contextmanager
+    def subscribe(self, user_id: int, role: UserRole) -> Iterator[Subscription]:
+        subscription = Subscription(user_id, role, self.queue_size)
+        self._by_user[user_id].add(subscription)
+        self._by_role[role].add(subscription)
+        try:
+            yield subscription
+        finally:
+            self._discard(self._by_user, user_id, subscription)
+            self._discard(self._by_role, role, subscription)
+
+    @staticmethod
+    def _discard(index: dict, key, subscription: Subscription) -> None:
+        subscribers = index.get(key)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del index[key]
+
+    def publish(
+        self,
+        notification_id: int,
+        message: str,
+        created_at: datetime,
+        user_id: Optional[int] = None,
+        target_role: Optional[UserRole] = None,
+    ) -> None:
+        event = {"id": notification_id, "message": message, "created_at": created_at}
+        if user_id is not None:
+            targets = self._by_user.get(user_id, ())
+        elif target_role is not None:
+            targets = self._by_role.get(target_role, ())
+        else:
+            return
+        if notification_id in self._recent:
+            self.repeats += 1
+            return
+        self._remember(notification_id)
+
+        self.published += 1
+        for subscription in tuple(targets):
+            if subscription.overflowed:
+                continue
+            try:
+                subscription.queue.put_nowait(event)
+                self.delivered += 1
+            except asyncio.QueueFull:
+                subscription.overflowed = True
+                self.overflows += 1
+
+    def clear(self) -> None:
+        """Forget the published ids (e.g. the database was replaced)."""
+        self._recent.clear()
+        self._highest = 0
+
+    def _remember(self, notification_id: int) -> None:
+        self._recent.add(notification_id)
+        self._highest = max(self._highest, notification_id)
+        if len(self._recent) > 2 * self.window:
+            floor = self._highest - self.window
+            self._recent = {seen for seen in self._recent if seen > floor}
+
+    def stats(self) -> dict:
+        return {
+            "connections": sum(len(subscribers) for subscribers in self._by_user.values()),
+            "published": self.published,
+            "repeats": self.repeats,
+            "delivered": self.delivered,
+            "overflows": self.overflows,
+        }
+
+
+# Global instance
+notification_hub = NotificationHub(
+    queue_size=settings.NOTIFICATION_STREAM_QUEUE_SIZE, window=settings.NOTIFICATION_STREAM_TAIL_LOOKBACK,
+)
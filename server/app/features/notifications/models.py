@@ -1,13 +1,21 @@
-from sqlalchemy import String, ForeignKey, DateTime, Boolean, Enum as SQLAEnum
+from sqlalchemy import String, ForeignKey, DateTime, Boolean, Index, Enum as SQLAEnum
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from datetime import datetime, timezone
+from datetime import datetime
 from typing import Optional
 
-from database import Base
+from database import Base, utcnow
 from app.features.users.models import UserRole
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # Unread rows of one user / one role in id order: each half of the unread query is a range scan
+        Index("ix_notifications_user_unread_id", "user_id", "is_read", "id"),
+        Index("ix_notifications_role_unread_id", "target_role", "is_read", "id"),
+        # Retention job: rows read longer ago than the grace period, and anything past max age
+        Index("ix_notifications_read_read_at", "is_read", "read_at"),
+        Index("ix_notifications_created_at", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     
@@ -18,4 +26,34 @@ class Notification(Base):
     
     message: Mapped[str] = mapped_column(String(500))
     is_read: Mapped[bool] = mapped_column(Boolean, default=False, index=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc))
\ No newline at end of file
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
+    # Set with is_read (marked read, or a broadcast resolved); receipts keep their own
+    read_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+class NotificationReceipt(Base):
+    """
+    One user's read mark on a role broadcast.
+
+    A broadcast row is shared by everyone in the role, so its is_read only
+    means "resolved for the whole team" (the application was decided).
+    Individual reads are recorded here instead.
+    """
+    __tablename__ = "notification_receipts"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    notification_id: Mapped[int] = mapped_column(ForeignKey("notifications.id", ondelete="CASCADE"), primary_key=True)
+    read_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
+
+class NotificationArchive(Base):
+    """Notifications moved out of the hot table by the retention job; same columns plus archived_at."""
+    __tablename__ = "notifications_archive"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    user_id: Mapped[Optional[int]] = mapped_column(nullable=True, index=True)
+    target_role: Mapped[Optional[UserRole]] = mapped_column(SQLAEnum(UserRole), nullable=True)
+    reference_id: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    message: Mapped[str] = mapped_column(String(500))
+    is_read: Mapped[bool] = mapped_column(Boolean, default=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime)
+    read_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    archived_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
@@ -0,0 +1,153 @@
+import asyncio
+import time
+from datetime import timedelta
+from typing import Optional
+
+from sqlalchemy import delete, insert, literal, select, update
+
+from database import AsyncSessionLocal, utcnow
+from app.core.config import settings
+from app.core.encryption import KEY_DIR
+from app.core.filelock import FileLock
+from app.core.metrics import LatencyStats
+from app.features.notifications.models import Notification, NotificationArchive, NotificationReceipt
+from app.features.notifications.unread import unread_counters
+
+_ARCHIVED_COLUMNS = [
+    "id", "user_id", "target_role", "reference_id", "message", "is_read", "created_at", "read_at", "archived_at",
+]
+
+
+def backfill_read_at(sync_conn) -> None:
+    """
+    Bootstrap step: rows read before read_at existed count as read when they
+    were created. Also drops the (is_read, created_at) index read_at replaced.
+    """
+    sync_conn.exec_driver_sql("DROP INDEX IF EXISTS ix_notifications_read_created_at")
+    sync_conn.execute(
+        update(Notification)
+        .where(Notification.is_read == True, Notification.read_at.is_(None))
+        .values(read_at=Notification.created_at)
+    )
+
+
+class NotificationRetention:
+    """
+    Background job that keeps the notifications table down to live rows.
+
+    Each run moves notifications that were read more than `read_after` ago,
+    and any notification older than `max_age`, into notifications_archive.
+    Rows move in batches of `batch_size`, one short transaction per batch
+    (copy, delete receipts, delete), so a backlog never holds a long write
+    lock. Started and stopped by the app lifespan.
+
+    Every API worker starts the job, but only the one holding the
+    `.notification-retention.lock` file lock runs it; the others retry the
+    lock each interval and take over when the leader exits.
+    """
+
+    def __init__(self, interval: float, read_after: timedelta, max_age: timedelta, batch_size: int):
+        self.interval = interval
+        self.read_after = read_after
+        self.max_age = max_age
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+        self.leader_lock = FileLock(KEY_DIR / ".notification-retention.lock")
+        self.run_time = LatencyStats()
+        self.runs = 0
+        self.last_run_moved = 0
+        self.moved_total = 0
+        self.failed_runs = 0
+
+    async def start(self) -> None:
+        if self.interval <= 0:
+            return
+        # Fresh event so it binds to the loop that runs the job
+        self._stopping = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="notification-retention")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping.set()
+        await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        try:
+            while not self._stopping.is_set():
+                if self.leader_lock.try_acquire():
+                    try:
+                        await self.run_once()
+                    except Exception:
+                        # Keep the schedule; the next run retries whatever was left
+                        self.failed_runs += 1
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self.leader_lock.release()
+
+    async def run_once(self) -> int:
+        """Archive everything currently due. Returns the number of rows moved."""
+        start = time.perf_counter()
+        now = utcnow()
+        read_due = select(Notification.id).where(
+            Notification.is_read == True,
+            Notification.read_at < now - self.read_after,
+        )
+        age_due = select(Notification.id).where(Notification.created_at < now - self.max_age)
+
+        moved = await self._move(read_due)
+        expired = await self._move(age_due)
+        if expired:
+            # Unread notifications may have expired; recount on next access
+            unread_counters.clear()
+
+        self.runs += 1
+        self.last_run_moved = moved + expired
+        self.moved_total += moved + expired
+        self.run_time.observe(time.perf_counter() - start)
+        return moved + expired
+
+    async def _move(self, due_stmt) -> int:
+        moved = 0
+        while not self._stopping.is_set():
+            async with AsyncSessionLocal() as db:
+                ids = (await db.execute(due_stmt.limit(self.batch_size))).scalars().all()
+                if not ids:
+                    break
+                copied = select(
+                    Notification.id, Notification.user_id, Notification.target_role, Notification.reference_id,
+                    Notification.message, Notification.is_read, Notification.created_at, Notification.read_at,
+                    literal(utcnow(), NotificationArchive.archived_at.type),
+                ).where(Notification.id.in_(ids))
+                await db.execute(insert(NotificationArchive).from_select(_ARCHIVED_COLUMNS, copied))
+                await db.execute(delete(NotificationReceipt).where(NotificationReceipt.notification_id.in_(ids)))
+                await db.execute(delete(Notification).where(Notification.id.in_(ids)))
+                await db.commit()
+            moved += len(ids)
+            if len(ids) < self.batch_size:
+                break
+        return moved
+
+    def stats(self) -> dict:
+        return {
+            "leader": self.leader_lock.held,
+            "runs": self.runs,
+            "failed_runs": self.failed_runs,
+            "last_run_moved": self.last_run_moved,
+            "moved_total": self.moved_total,
+            "run_latency": self.run_time.snapshot(),
+        }
+
+
+# Global instance
+notification_retention = NotificationRetention(
+    interval=settings.NOTIFICATION_RETENTION_INTERVAL_SECONDS,
+    read_after=timedelta(hours=settings.NOTIFICATION_RETENTION_READ_AFTER_HOURS),
+    max_age=timedelta(days=settings.NOTIFICATION_RETENTION_MAX_AGE_DAYS),
+    batch_size=settings.NOTIFICATION_RETENTION_BATCH_SIZE,
+)
@@ -1,33 +1,115 @@
-from fastapi import APIRouter, Depends
+import asyncio
+from fastapi import APIRouter, Depends, Header, Query, Request
+from fastapi.responses import StreamingResponse
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, or_
-from typing import List
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from typing import AsyncIterator, List, Optional
 from pydantic import BaseModel
 
 from dependencies import get_db
-from app.core.security import RequireRole, get_current_user
+from database import AsyncSessionLocal, utcnow
+from app.core.change_sequence import NOTIFICATIONS, change_sequences
+from app.core.config import settings
+from app.core.serialization import RowSerializer
+from app.core.security import RequireRole, get_current_user, get_streaming_user
 from app.features.users.models import User
-from app.features.notifications.models import Notification
-from app.features.notifications.schema import NotificationResponse
+from app.features.notifications.hub import Subscription, notification_hub
+from app.features.notifications.models import Notification, NotificationReceipt
+from app.features.notifications.schema import NotificationResponse, NotificationRow, UnreadCountResponse
+from app.features.notifications.unread import unread_counters, unread_notifications_stmt
 
 router = APIRouter(prefix="/notifications", tags=["Notifications"])
 
+_notification_rows = RowSerializer(NotificationRow)
+
 @router.get("/unread", response_model=List[NotificationResponse])
 async def get_unread_notifications(
+    request: Request,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    stmt = select(Notification).where(
-        or_(
-            Notification.user_id == current_user.id,
-            Notification.target_role == current_user.role
-        ),
-        Notification.is_read == False
-    ).order_by(Notification.created_at.desc())
+    """Conditional: polls with a current If-None-Match get 304 without a query."""
+    etag = change_sequences.etag(request, NOTIFICATIONS, user_id=current_user.id, role=current_user.role)
+    if (not_modified := change_sequences.not_modified_response(request, etag)) is not None:
+        return not_modified
+
+    stmt = unread_notifications_stmt(current_user).order_by(Notification.created_at.desc())
     
     result = await db.execute(stmt)
-    return result.scalars().all()
+    return change_sequences.tag(_notification_rows.response(row._asdict() for row in result), etag)
+
+@router.get("/unread/count", response_model=UnreadCountResponse)
+async def get_unread_count(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Cheap badge/poll endpoint: served from maintained counters."""
+    return UnreadCountResponse(unread=await unread_counters.get(db, current_user))
+
+def _sse_event(notification_id: int, message: str, created_at: datetime) -> str:
+    data = NotificationResponse(id=notification_id, message=message, created_at=created_at).model_dump_json()
+    return f"id: {notification_id}\nevent: notification\ndata: {data}\n\n"
+
+async def _notification_events(user: User, subscription: Subscription, last_seen_id: int) -> AsyncIterator[str]:
+    """
+    Replay unread notifications newer than last_seen_id, then follow the hub
+    with heartbeats. Live events are not filtered by id: one committed out of
+    id order (or written by another process and found by the tail) can be
+    older than the newest already sent, and is still new to this client.
+    """
+    yield "retry: 3000\n\n"
+
+    # Subscribed before replaying, so anything published meanwhile is queued, not lost
+    async with AsyncSessionLocal() as db:
+        stmt = unread_notifications_stmt(user, after_id=last_seen_id).order_by(
+            Notification.id
+        ).limit(settings.NOTIFICATION_STREAM_REPLAY_LIMIT)
+        missed = (await db.execute(stmt)).all()
+    replayed = set()
+    for notification in missed:
+        replayed.add(notification.id)
+        yield _sse_event(notification.id, notification.message, notification.created_at)
+
+    while True:
+        if subscription.overflowed and subscription.queue.empty():
+            # Too far behind: end the stream; EventSource reconnects with Last-Event-ID
+            return
+        try:
+            event = await asyncio.wait_for(
+                subscription.queue.get(), timeout=settings.NOTIFICATION_STREAM_HEARTBEAT_SECONDS
+            )
+        except asyncio.TimeoutError:
+            yield ": ping\n\n"
+            continue
+        if event["id"] not in replayed:
+            yield _sse_event(event["id"], event["message"], event["created_at"])
+
+@router.get("/stream")
+async def stream_notifications(
+    last_event_id: Optional[int] = Query(None, description="Resume after this notification id"),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+    current_user: User = Depends(get_streaming_user),
+):
+    """
+    Server-sent events feed of new notifications for the current user and role.
+    Replaces polling /notifications/unread.
+    """
+    last_seen_id = last_event_id or 0
+    if last_event_id_header and last_event_id_header.isdigit():
+        last_seen_id = max(last_seen_id, int(last_event_id_header))
+
+    async def events():
+        with notification_hub.subscribe(current_user.id, current_user.role) as subscription:
+            async for event in _notification_events(current_user, subscription, last_seen_id):
+                yield event
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @router.patch("/{notification_id}/read")
 async def mark_as_read(
@@ -37,9 +119,28 @@ async def mark_as_read(
 ):
     stmt = update(Notification).where(
         Notification.id == notification_id,
-        Notification.user_id == current_user.id
-    ).values(is_read=True)
+        Notification.user_id == current_user.id,
+        Notification.is_read == False
+    ).values(is_read=True, read_at=utcnow())
     
-    await db.execute(stmt)
-    await db.commit()
+    changed = (await db.execute(stmt)).rowcount
+    if not changed:
+        # Role broadcasts are shared rows: record this user's read as a receipt
+        broadcast_stmt = select(Notification.id).where(
+            Notification.id == notification_id,
+            Notification.target_role == current_user.role,
+            Notification.is_read == False
+        )
+        if (await db.execute(broadcast_stmt)).scalar_one_or_none() is not None:
+            db.add(NotificationReceipt(user_id=current_user.id, notification_id=notification_id))
+            changed = 1
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Already read (e.g. from another tab)
+        await db.rollback()
+        changed = 0
+
+    if changed:
+        unread_counters.read(current_user.id)
     return {"status": "success"}
\ No newline at end of file
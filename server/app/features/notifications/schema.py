@@ -1,9 +1,19 @@
 from pydantic import BaseModel,Field,ConfigDict
 from datetime import datetime
+from typing_extensions import TypedDict
 
 class NotificationResponse(BaseModel):
     id: int
     message: str
     created_at: datetime
     
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class NotificationRow(TypedDict):
+    """NotificationResponse's JSON shape for the column-based list endpoint."""
+    id: int
+    message: str
+    created_at: datetime
+
+class UnreadCountResponse(BaseModel):
+    unread: int
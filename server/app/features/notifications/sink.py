@@ -0,0 +1,140 @@
+import asyncio
+import time
+from typing import Optional
+
+from sqlalchemy import insert
+
+from database import AsyncSessionLocal
+from app.core.config import settings
+from app.core.metrics import LatencyStats
+from app.features.notifications.hub import notification_hub
+from app.features.notifications.models import Notification
+from app.features.notifications.unread import unread_counters
+
+# Every row of a multi-row INSERT needs the same keys
+_EMPTY_ROW = {"user_id": None, "target_role": None, "reference_id": None}
+
+
+class NotificationSink:
+    """
+    Coalescing writer for notification inserts.
+
+    Callers submit() a notification and wait until it is committed. A
+    background task writes whatever has queued up as one multi-row INSERT
+    when `max_batch` rows are waiting or `max_delay` seconds after the first
+    one arrived, so a burst costs one transaction instead of one per event.
+    Saved notifications are then counted as unread and published to the
+    stream hub.
+    """
+
+    def __init__(self, max_batch: int, max_delay: float):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._pending: list[tuple[dict, asyncio.Future]] = []
+        self._has_items = asyncio.Event()
+        self._full = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.flush_time = LatencyStats()
+        self.flushed_rows = 0
+        self.failed_rows = 0
+
+    async def start(self) -> None:
+        self._stopping = False
+        # Fresh events so they bind to the loop that runs the writer
+        self._has_items = asyncio.Event()
+        self._full = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="notification-sink")
+
+    async def stop(self) -> None:
+        """Flush everything still queued and stop the writer task."""
+        if self._task is None:
+            return
+        self._stopping = True
+        self._has_items.set()
+        self._full.set()
+        await self._task
+        self._task = None
+
+    async def submit(self, **values) -> int:
+        """Queue one notification row; returns its id once committed."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((values, future))
+        if self._task is None:
+            # No writer running (e.g. a script outside the app lifespan): write now
+            await self.flush()
+        else:
+            self._has_items.set()
+            if len(self._pending) >= self.max_batch:
+                self._full.set()
+        return await future
+
+    async def _run(self) -> None:
+        while True:
+            await self._has_items.wait()
+            if not self._stopping and len(self._pending) < self.max_batch:
+                try:
+                    await asyncio.wait_for(self._full.wait(), timeout=self.max_delay)
+                except asyncio.TimeoutError:
+                    pass
+            self._has_items.clear()
+            self._full.clear()
+
+            while self._pending:
+                await self.flush()
+            if self._stopping:
+                return
+
+    async def flush(self) -> None:
+        """Write up to max_batch queued notifications in one transaction."""
+        batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+        if not batch:
+            return
+
+        start = time.perf_counter()
+        try:
+            async with AsyncSessionLocal() as db:
+                # One INSERT ... VALUES (...), (...) statement; executemany would
+                # split rows whose NULL columns differ into separate statements
+                stmt = (
+                    insert(Notification)
+                    .values([{**_EMPTY_ROW, **values} for values, _ in batch])
+                    .returning(Notification.id, Notification.created_at)
+                )
+                saved = (await db.execute(stmt)).all()
+                await db.commit()
+        except Exception as e:
+            self.failed_rows += len(batch)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self.flush_time.observe(time.perf_counter() - start)
+
+        self.flushed_rows += len(batch)
+        # Ids are handed out in VALUES order within one INSERT, whatever order RETURNING uses
+        saved = sorted(saved, key=lambda row: row.id)
+        for (values, future), row in zip(batch, saved):
+            unread_counters.published(user_id=values.get("user_id"), target_role=values.get("target_role"))
+            notification_hub.publish(
+                row.id, values["message"], row.created_at,
+                user_id=values.get("user_id"), target_role=values.get("target_role"),
+            )
+            if not future.done():
+                future.set_result(row.id)
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": len(self._pending),
+            "flushed_rows": self.flushed_rows,
+            "failed_rows": self.failed_rows,
+            "flush_latency": self.flush_time.snapshot(),
+        }
+
+
+# Global instance
+notification_sink = NotificationSink(
+    max_batch=settings.NOTIFICATION_FLUSH_MAX_BATCH,
+    max_delay=settings.NOTIFICATION_FLUSH_MAX_DELAY_MS / 1000,
+)
@@ -0,0 +1,112 @@
+import asyncio
+from typing import Optional
+
+from sqlalchemy import func, select
+
+from database import AsyncSessionLocal
+from app.core.config import settings
+from app.core.metrics import LatencyStats
+from app.features.notifications.hub import notification_hub
+from app.features.notifications.models import Notification
+
+
+class NotificationTail:
+    """
+    Feeds the hub the notifications other processes wrote.
+
+    The sink publishes what this process writes as soon as it commits; rows
+    written elsewhere (the standalone job worker, other API workers) only
+    exist in the database. Every `interval` seconds this reads the unread
+    notifications above the newest id it has seen and publishes them, so
+    those reach this process's streams within one interval. Each read starts
+    `lookback` ids below that newest id, because a transaction can commit
+    after one holding a higher id; the hub drops the ids it already
+    published. Started and stopped by the app lifespan.
+    """
+
+    def __init__(self, interval: float, lookback: int):
+        self.interval = interval
+        self.lookback = lookback
+        self._last_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+        self.read_time = LatencyStats()
+        self.reads = 0
+        self.read_rows = 0
+        self.failed_reads = 0
+
+    async def start(self) -> None:
+        if self.interval <= 0:
+            return
+        self._last_id = None
+        # Fresh event so it binds to the loop that runs the tail
+        self._stopping = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="notification-tail")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping.set()
+        await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await self.read_once()
+            except Exception:
+                # Keep tailing; the next read starts from the same id
+                self.failed_reads += 1
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def read_once(self) -> int:
+        """Publish the unread notifications in the window. Returns the number of rows read."""
+        with self.read_time.time():
+            async with AsyncSessionLocal() as db:
+                if self._last_id is None:
+                    # Streams replay what is already there when they connect
+                    self._last_id = (await db.execute(select(func.max(Notification.id)))).scalar() or 0
+                    return 0
+                after_id, read = self._last_id - self.lookback, 0
+                while True:
+                    rows = (await db.execute(
+                        select(
+                            Notification.id, Notification.message, Notification.created_at,
+                            Notification.user_id, Notification.target_role,
+                        )
+                        .where(Notification.id > after_id, Notification.is_read == False)
+                        .order_by(Notification.id)
+                        .limit(self.lookback)
+                    )).all()
+                    for row in rows:
+                        notification_hub.publish(
+                            row.id, row.message, row.created_at, user_id=row.user_id, target_role=row.target_role,
+                        )
+                    read += len(rows)
+                    if rows:
+                        after_id = rows[-1].id
+                        self._last_id = max(self._last_id, after_id)
+                    if len(rows) < self.lookback:
+                        break
+        self.reads += 1
+        self.read_rows += read
+        return read
+
+    def stats(self) -> dict:
+        return {
+            "last_id": self._last_id or 0,
+            "reads": self.reads,
+            "read_rows": self.read_rows,
+            "failed_reads": self.failed_reads,
+            "read_latency": self.read_time.snapshot(),
+        }
+
+
+# Global instance
+notification_tail = NotificationTail(
+    interval=settings.NOTIFICATION_STREAM_TAIL_SECONDS,
+    lookback=settings.NOTIFICATION_STREAM_TAIL_LOOKBACK,
+)
@@ -0,0 +1,146 @@
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import Select, exists, func, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.change_sequence import NOTIFICATIONS, change_sequences
+from app.core.config import settings
+from app.features.users.models import User, UserRole
+from app.features.notifications.models import Notification, NotificationReceipt
+
+
+def unread_ids_stmt(user: User, after_id: int = 0):
+    """
+    Ids of the user's unread notifications newer than after_id.
+
+    Direct and role-broadcast notifications are two separate index range
+    scans glued with UNION ALL, instead of one OR that no single index serves.
+    A broadcast is unread until it is resolved (is_read) or the user has a
+    receipt for it.
+    """
+    direct = select(Notification.id).where(
+        Notification.user_id == user.id,
+        Notification.is_read == False,
+        Notification.id > after_id,
+    )
+    broadcast = select(Notification.id).where(
+        Notification.target_role == user.role,
+        Notification.is_read == False,
+        Notification.id > after_id,
+        ~exists().where(
+            NotificationReceipt.user_id == user.id,
+            NotificationReceipt.notification_id == Notification.id,
+        ),
+    )
+    return union_all(direct, broadcast)
+
+
+def unread_notifications_stmt(user: User, after_id: int = 0) -> Select:
+    """The listed columns of the unread notifications, as rows rather than ORM objects."""
+    return select(Notification.id, Notification.message, Notification.created_at).where(
+        Notification.id.in_(unread_ids_stmt(user, after_id))
+    )
+
+
+def unread_count_stmt(user: User) -> Select:
+    return select(func.count()).select_from(unread_ids_stmt(user).subquery())
+
+
+class UnreadCounters:
+    """
+    Per-user unread counts kept in memory and adjusted as notifications are
+    published and read, so GET /notifications/unread/count rarely touches the
+    database. A missing or expired count is recomputed with one COUNT query.
+    Changes that can't be applied exactly (a broadcast resolved for the whole
+    role) drop the affected counts instead. At most `maxsize` users are
+    kept, least recently read first out, like the principal cache.
+
+    Every change also bumps the NOTIFICATIONS change sequence of the users it
+    touches, which is what GET /notifications/unread's ETag is made of.
+    """
+
+    def __init__(self, ttl: float, maxsize: int):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        # user_id -> (count, role, counted_at), least recently read first
+        self._counts: "OrderedDict[int, tuple[int, UserRole, float]]" = OrderedDict()
+        # Bumped on every change; a COUNT that raced with one is not cached
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def get(self, db: AsyncSession, user: User) -> int:
+        entry = self._counts.get(user.id)
+        if entry is not None:
+            if time.monotonic() - entry[2] <= self.ttl:
+                self._counts.move_to_end(user.id)
+                self.hits += 1
+                return entry[0]
+            del self._counts[user.id]
+
+        self.misses += 1
+        generation = self._generation
+        count = (await db.execute(unread_count_stmt(user))).scalar_one()
+        if generation == self._generation and self.maxsize > 0:
+            self._counts[user.id] = (count, user.role, time.monotonic())
+            self._counts.move_to_end(user.id)
+            while len(self._counts) > self.maxsize:
+                self._counts.popitem(last=False)
+                self.evictions += 1
+        return count
+
+    def _adjust(self, user_id: int, delta: int) -> None:
+        entry = self._counts.get(user_id)
+        if entry is not None:
+            count, role, counted_at = entry
+            self._counts[user_id] = (max(count + delta, 0), role, counted_at)
+
+    def published(self, user_id: Optional[int] = None, target_role: Optional[UserRole] = None) -> None:
+        """A new unread notification was committed."""
+        self._generation += 1
+        if user_id is not None:
+            change_sequences.user_changed(NOTIFICATIONS, user_id)
+            self._adjust(user_id, 1)
+        elif target_role is not None:
+            change_sequences.role_changed(NOTIFICATIONS, target_role)
+            for counted_user, (_, role, _) in list(self._counts.items()):
+                if role == target_role:
+                    self._adjust(counted_user, 1)
+
+    def read(self, user_id: int) -> None:
+        """The user marked one of their unread notifications read."""
+        self._generation += 1
+        change_sequences.user_changed(NOTIFICATIONS, user_id)
+        self._adjust(user_id, -1)
+
+    def forget_role(self, role: UserRole) -> None:
+        """Broadcasts of this role were resolved; recount its users on next access."""
+        self._generation += 1
+        change_sequences.role_changed(NOTIFICATIONS, role)
+        for counted_user, (_, counted_role, _) in list(self._counts.items()):
+            if counted_role == role:
+                del self._counts[counted_user]
+
+    def clear(self) -> None:
+        self._generation += 1
+        change_sequences.feed_changed(NOTIFICATIONS)
+        self._counts.clear()
+
+    def stats(self) -> dict:
+        return {
+            "users": len(self._counts),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+# Global instance
+unread_counters = UnreadCounters(
+    ttl=settings.NOTIFICATION_UNREAD_COUNT_TTL_SECONDS,
+    maxsize=settings.NOTIFICATION_UNREAD_COUNT_MAX_USERS,
+)
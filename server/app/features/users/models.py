@@ -14,7 +14,7 @@ class User(Base):
     id:Mapped[int]=mapped_column(primary_key=True,index=True)
     email:Mapped[str]=mapped_column(String(255),unique=True,nullable=False,index=True)
     name:Mapped[str]=mapped_column(String(255),nullable=False)
-    password:Mapped[str]=mapped_column(String(50),nullable=False)
+    password:Mapped[str]=mapped_column(String(255),nullable=False)
 
     role: Mapped[UserRole] = mapped_column(SQLAEnum(UserRole), default=UserRole.USER)
 
@@ -0,0 +1,133 @@
+"""
+Amortization engine: NumPy chunks vs a per-loan Python loop.
+
+1. Engine only: --loans synthetic (amount, rate) pairs are folded into a
+   portfolio projection --chunk-size rows at a time. A plain Python
+   month-by-month loop runs on a --sample of them and is extrapolated.
+2. End to end: --applications seeded rows are approved and projected
+   through project_portfolio(), which lets the database sum principal per
+   interest rate, against streaming every row into the same engine.
+
+Peak memory comes from tracemalloc and should track the chunk size (or the
+number of distinct rates), not the number of loans.
+
+    python -m benchmarks.amortization --loans 1000000 --applications 1000000
+"""
+import argparse
+import asyncio
+import tracemalloc
+
+from benchmarks.common import Timer, bootstrap_app, seed_applications
+
+
+def python_loop(amounts, rates, term_months: int) -> list:
+    """Reference: one schedule per loan, summed month by month."""
+    inflows = [0.0] * term_months
+    for amount, rate in zip(amounts, rates):
+        r = rate / 1200
+        payment = amount / term_months if r == 0 else amount * r / (1 - (1 + r) ** -term_months)
+        balance = amount
+        for month in range(term_months):
+            interest = balance * r
+            balance -= payment - interest
+            inflows[month] += payment
+    return inflows
+
+
+def engine_only(loans: int, term_months: int, chunk_size: int, sample: int):
+    import numpy as np
+    from app.features.loans.amortization import PortfolioAccumulator
+
+    rng = np.random.default_rng(0)
+
+    tracemalloc.start()
+    with Timer() as timer:
+        accumulator = PortfolioAccumulator(term_months)
+        for offset in range(0, loans, chunk_size):
+            size = min(chunk_size, loans - offset)
+            # Rates in quarter points between 5% and 15%, like real product sheets
+            accumulator.add(rng.uniform(1_000, 500_000, size), rng.integers(20, 61, size) / 4)
+        projection = accumulator.result()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"numpy, {loans:,} loans x {term_months} months: {timer.elapsed * 1000:8.0f} ms, "
+          f"peak {peak / 1024 / 1024:.1f} MiB (chunks of {chunk_size:,})")
+
+    amounts = rng.uniform(1_000, 500_000, sample)
+    rates = rng.integers(20, 61, sample) / 4
+    with Timer() as loop_timer:
+        expected = python_loop(amounts.tolist(), rates.tolist(), term_months)
+    check = PortfolioAccumulator(term_months)
+    check.add(amounts, rates)
+    assert np.allclose([month.inflow for month in check.result().months], expected, rtol=1e-6), "engines disagree"
+    estimate = loop_timer.elapsed / sample * loans
+    print(f"python loop, {sample:,} loans: {loop_timer.elapsed * 1000:8.0f} ms "
+          f"(~{estimate:.1f} s for {loans:,}, {estimate / timer.elapsed:.0f}x slower)")
+    print(f"first month inflow {projection.months[0].inflow:,.2f} on {projection.principal:,.2f} principal")
+
+
+async def stream_rows(db, term_months: int, chunk_size: int):
+    """The alternative to the GROUP BY: every approved row, chunk_size at a time."""
+    import numpy as np
+    from sqlalchemy import select
+    from app.features.loans.amortization import PortfolioAccumulator
+    from app.features.loans.enums import LoanStatus
+    from app.features.loans.models import BankLoan, UserLoanApplication
+
+    stmt = (
+        select(UserLoanApplication.amount, BankLoan.interest_rate)
+        .join(UserLoanApplication.loan)
+        .where(UserLoanApplication.status == LoanStatus.APPROVED)
+        .execution_options(yield_per=chunk_size)
+    )
+    accumulator = PortfolioAccumulator(term_months)
+    async for partition in (await db.stream(stmt)).partitions():
+        chunk = np.array(partition, dtype=np.float64)
+        accumulator.add(chunk[:, 0], chunk[:, 1])
+    return accumulator.result()
+
+
+async def end_to_end(applications: int, term_months: int, chunk_size: int):
+    from sqlalchemy import update
+    from database import AsyncSessionLocal, Base, engine
+    from app.features.loans.amortization import project_portfolio
+    from app.features.loans.enums import LoanStatus
+    from app.features.loans.models import UserLoanApplication
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await seed_applications(applications, loan_count=20)
+    async with engine.begin() as conn:
+        await conn.execute(update(UserLoanApplication).values(status=LoanStatus.APPROVED))
+
+    results = {}
+    for label, project in (
+        ("project_portfolio (GROUP BY)", lambda db: project_portfolio(db, term_months)),
+        (f"stream rows ({chunk_size:,}/chunk)", lambda db: stream_rows(db, term_months, chunk_size)),
+    ):
+        async with AsyncSessionLocal() as db:
+            with Timer() as timer:
+                results[label] = await project(db)
+        # Measured again under tracemalloc, which slows the row-by-row path a lot
+        async with AsyncSessionLocal() as db:
+            tracemalloc.start()
+            await project(db)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        print(f"{label:>30}, {results[label].applications:,} approved applications: "
+              f"{timer.elapsed * 1000:8.0f} ms, peak {peak / 1024 / 1024:.1f} MiB")
+    first, second = results.values()
+    assert abs(first.monthly_inflow - second.monthly_inflow) < 0.05, "projections disagree"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--loans", type=int, default=1_000_000)
+    parser.add_argument("--applications", type=int, default=100_000)
+    parser.add_argument("--term-months", type=int, default=60)
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    parser.add_argument("--sample", type=int, default=5_000, help="loans run through the Python loop")
+    args = parser.parse_args()
+    bootstrap_app()
+    engine_only(args.loans, args.term_months, args.chunk_size, args.sample)
+    asyncio.run(end_to_end(args.applications, args.term_months, args.chunk_size))
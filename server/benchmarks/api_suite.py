@@ -0,0 +1,245 @@
+"""
+End-to-end API benchmark: every main route of the real app, in-process.
+
+Seeds a synthetic database (users, loan products, applications, notifications),
+then drives main.app through an ASGI client with --concurrency workers per
+route and reports throughput and p50/p95/p99 latency. Results are written as
+JSON so two runs (e.g. two commits) can be compared:
+
+    python -m benchmarks.api_suite --output before.json
+    python -m benchmarks.api_suite --output after.json --compare before.json
+
+Full scale (takes a while to seed):
+
+    python -m benchmarks.api_suite --users 100000 --loans 1000 --applications 1000000
+
+--compare exits with status 1 when a route's p95 latency or throughput is
+worse than the baseline by more than --max-regression percent.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from benchmarks.common import (
+    BENCH_PASSWORD, SERVER_DIR, Timer, app_client, bootstrap_app, percentile,
+    seed_applications, seed_notifications, seed_users,
+)
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    # request number -> (path, extra httpx request kwargs)
+    build: Callable[[int], tuple]
+    requests: int
+    expected_status: int = 200
+
+
+def build_scenarios(args, users: list, managers: list, applicants: list) -> list:
+    """Read-only routes first, then the writes, so writes don't skew the read numbers."""
+    loans, per_route = args.loans, args.requests
+
+    def user(i):
+        return {"headers": users[i % len(users)]}
+
+    def manager(i):
+        return {"headers": managers[i % len(managers)]}
+
+    def applicant(i):
+        return {"headers": applicants[i % len(applicants)]}
+
+    def own_application(i):
+        # seed_applications gives applicant k the ids k*loans+1 .. (k+1)*loans
+        k = i % len(applicants)
+        return f"/loans/applications/{k * loans + 1 + i % loans}", applicant(i)
+
+    def apply(i):
+        # A fresh (user, loan) pair per request so none hits the duplicate check
+        return "/loans/apply", {**user(i), "json": {"loan_id": (i // len(users)) % loans + 1, "amount": 5000}}
+
+    def decide(i):
+        status = "approved" if i % 2 else "rejected"
+        return f"/manager/loans/applications/{i % args.applications + 1}", {**manager(i), "json": {"status": status}}
+
+    def decide_batch(i):
+        first = (i * 50) % args.applications
+        decisions = [
+            {"application_id": (first + k) % args.applications + 1, "status": "approved"} for k in range(50)
+        ]
+        return "/manager/loans/applications/decisions", {**manager(i), "json": {"decisions": decisions}}
+
+    def login(i):
+        email = f"user-{i % len(users)}@bench.example.com"
+        return "/auth/login", {"data": {"username": email, "password": BENCH_PASSWORD}}
+
+    return [
+        Scenario("GET /auth/public-key", "GET", lambda i: ("/auth/public-key", {}), per_route),
+        Scenario("GET /users/me", "GET", lambda i: ("/users/me", user(i)), per_route),
+        Scenario("GET /loans/", "GET", lambda i: ("/loans/", user(i)), per_route),
+        Scenario("GET /loans/applications", "GET",
+                 lambda i: ("/loans/applications", applicant(i)), per_route),
+        Scenario("GET /loans/applications/{id}", "GET", own_application, per_route),
+        Scenario("GET /manager/loans/", "GET", lambda i: ("/manager/loans/", manager(i)), per_route),
+        Scenario("GET /manager/loans/stats", "GET", lambda i: ("/manager/loans/stats", manager(i)), per_route),
+        Scenario("GET /manager/loans/projections", "GET",
+                 lambda i: ("/manager/loans/projections", manager(i)), per_route),
+        Scenario("GET /manager/loans/applications?limit=50", "GET",
+                 lambda i: ("/manager/loans/applications", {**manager(i), "params": {"limit": 50}}), per_route),
+        Scenario("GET /manager/loans/applications?status=pending&limit=50", "GET",
+                 lambda i: ("/manager/loans/applications", {**manager(i), "params": {"status": "pending", "limit": 50}}),
+                 per_route),
+        Scenario("GET /notifications/unread (user)", "GET", lambda i: ("/notifications/unread", user(i)), per_route),
+        Scenario("GET /notifications/unread (manager)", "GET",
+                 lambda i: ("/notifications/unread", manager(i)), per_route),
+        Scenario("GET /notifications/unread/count", "GET",
+                 lambda i: ("/notifications/unread/count", user(i)), per_route),
+        Scenario("POST /auth/login", "POST", login, args.login_requests),
+        Scenario("POST /loans/apply", "POST", apply, min(per_route, len(users) * loans), 201),
+        Scenario("PUT /manager/loans/applications/{id}", "PUT", decide, per_route),
+        Scenario("POST /manager/loans/applications/decisions (50)", "POST", decide_batch, max(per_route // 10, 1)),
+    ]
+
+
+async def run_scenario(client, scenario: Scenario, concurrency: int, warmup: int) -> dict:
+    async def send(i: int) -> tuple:
+        path, kwargs = scenario.build(i)
+        with Timer() as timer:
+            response = await client.request(scenario.method, path, **kwargs)
+        return timer.elapsed, response.status_code == scenario.expected_status
+
+    # Warm-up requests use numbers past the measured ones, so writes never collide
+    for i in range(scenario.requests, scenario.requests + warmup):
+        await send(i)
+
+    samples, errors = [], 0
+    next_request = 0
+
+    async def worker():
+        nonlocal next_request, errors
+        while next_request < scenario.requests:
+            i, next_request = next_request, next_request + 1
+            elapsed, ok = await send(i)
+            samples.append(elapsed)
+            errors += not ok
+
+    with Timer() as wall:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    return {
+        "requests": scenario.requests,
+        "errors": errors,
+        "throughput_rps": round(scenario.requests / wall.elapsed, 1),
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p95_ms": round(percentile(samples, 95) * 1000, 2),
+        "p99_ms": round(percentile(samples, 99) * 1000, 2),
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=SERVER_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> int:
+    """Print per-route changes against a baseline file; returns the number of regressions."""
+    regressions = 0
+    print(f"\ncompared with {baseline['meta'].get('commit', '?')} ({baseline['meta'].get('timestamp', '?')}):")
+    for name, current in results["routes"].items():
+        previous = baseline["routes"].get(name)
+        if previous is None:
+            print(f"  {name:<58} new route")
+            continue
+        p95_change = (current["p95_ms"] / previous["p95_ms"] - 1) * 100 if previous["p95_ms"] else 0.0
+        rps_change = (current["throughput_rps"] / previous["throughput_rps"] - 1) * 100 if previous["throughput_rps"] else 0.0
+        regressed = p95_change > max_regression or -rps_change > max_regression
+        regressions += regressed
+        print(f"  {name:<58} p95 {p95_change:+7.1f}%  rps {rps_change:+7.1f}%{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+async def run(args) -> int:
+    # Keep background maintenance from archiving the seeded notifications mid-run
+    os.environ.setdefault("NOTIFICATION_RETENTION_INTERVAL_SECONDS", "0")
+    output = os.path.abspath(args.output)
+    baseline_path = os.path.abspath(args.compare) if args.compare else None
+    app = bootstrap_app()
+    from database import AsyncSessionLocal, engine
+    from app.core.security import create_access_token
+    from app.features.loans.stats import rebuild
+
+    async with app_client(app) as client:
+        with Timer() as seeding:
+            users = await seed_users(args.users)
+            managers = await seed_users(args.managers, role="manager")
+            await seed_applications(args.applications, loan_count=args.loans)
+            await seed_notifications(args.notifications, unread_percent=1.0, user_count=args.users)
+            async with AsyncSessionLocal() as db:
+                await rebuild(db)
+        applicant_count = (args.applications - 1) // args.loans + 1
+        applicants = [
+            {"Authorization": f"Bearer {create_access_token({'sub': f'applicant-{k}@bench.example.com'})}"}
+            for k in range(min(applicant_count, args.requests))
+        ]
+        print(f"seeded in {seeding.elapsed:.1f}s; {args.concurrency} concurrent clients per route\n")
+
+        routes = {}
+        for scenario in build_scenarios(args, users, managers, applicants):
+            routes[scenario.name] = result = await run_scenario(client, scenario, args.concurrency, args.warmup)
+            print(
+                f"{scenario.name:<58} {result['throughput_rps']:8,.1f} req/s  p50={result['p50_ms']:.2f}ms "
+                f"p95={result['p95_ms']:.2f}ms p99={result['p99_ms']:.2f}ms"
+                + (f"  errors={result['errors']}" if result["errors"] else "")
+            )
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "database": engine.dialect.name,
+            "python": platform.python_version(),
+            "scale": {
+                "users": args.users, "managers": args.managers, "loans": args.loans,
+                "applications": args.applications, "notifications": args.notifications,
+            },
+            "concurrency": args.concurrency,
+        },
+        "routes": routes,
+    }
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nwrote {output}")
+
+    if baseline_path:
+        with open(baseline_path) as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--managers", type=int, default=5)
+    parser.add_argument("--loans", type=int, default=100)
+    parser.add_argument("--applications", type=int, default=100_000)
+    parser.add_argument("--notifications", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=500, help="measured requests per route")
+    parser.add_argument("--login-requests", type=int, default=100, help="logins are bcrypt-bound, so fewer")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--output", default="api_suite.json")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run")
+    parser.add_argument("--max-regression", type=float, default=20.0, help="percent")
+    sys.exit(asyncio.run(run(parser.parse_args())))
@@ -0,0 +1,62 @@
+"""
+Peak memory of the application listing routes: full JSON list vs keyset pages vs NDJSON stream.
+
+    python -m benchmarks.application_listing --sizes 10000 50000 100000
+"""
+import argparse
+import asyncio
+import tracemalloc
+
+from benchmarks.common import Timer, app_client, asgi_get_discarding_body, bootstrap_app, register_and_login, seed_applications
+
+
+async def measure(client, headers, label: str, fetch) -> None:
+    tracemalloc.start()
+    with Timer() as timer:
+        rows = await fetch(client, headers)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:>14}: {rows:>8} rows in {timer.elapsed:6.2f}s, peak {peak / 1024 / 1024:8.1f} MiB")
+
+
+async def fetch_list(client, headers) -> int:
+    response = await client.get("/manager/loans/applications", headers=headers)
+    return len(response.json())
+
+
+async def fetch_pages(client, headers) -> int:
+    rows, cursor = 0, None
+    while True:
+        params = {"limit": 500, **({"cursor": cursor} if cursor else {})}
+        response = await client.get("/manager/loans/applications", params=params, headers=headers)
+        rows += len(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return rows
+
+
+async def fetch_ndjson(client, headers) -> int:
+    from main import app
+
+    _, rows = await asgi_get_discarding_body(app, "/manager/loans/applications", {"format": "ndjson"}, headers)
+    return rows
+
+
+async def run(sizes: list):
+    app = bootstrap_app()
+    async with app_client(app) as client:
+        headers = await register_and_login(client, "bench-manager@example.com", role="manager")
+        seeded = 0
+        for size in sorted(sizes):
+            await seed_applications(size - seeded, start=seeded)
+            seeded = size
+            print(f"--- {size} applications")
+            await measure(client, headers, "json list", fetch_list)
+            await measure(client, headers, "keyset pages", fetch_pages)
+            await measure(client, headers, "ndjson stream", fetch_ndjson)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000, 100_000])
+    asyncio.run(run(parser.parse_args().sizes))
@@ -0,0 +1,52 @@
+"""
+Clearing the review queue: one PUT per application vs the batch decision endpoint.
+
+    python -m benchmarks.bulk_decisions --applications 5000
+"""
+import argparse
+import asyncio
+
+from benchmarks.common import QueryCounter, Timer, app_client, bootstrap_app, seed_applications, seed_users
+
+
+async def run(applications: int, single: int):
+    app = bootstrap_app()
+    from database import engine
+
+    async with app_client(app) as client:
+        manager_headers = (await seed_users(1, role="manager"))[0]
+        await seed_applications(applications, loan_count=5)
+
+        with QueryCounter(engine) as counter, Timer() as timer:
+            for application_id in range(1, single + 1):
+                response = await client.put(
+                    f"/manager/loans/applications/{application_id}", json={"status": "approved"}, headers=manager_headers
+                )
+                response.raise_for_status()
+            await asyncio.sleep(0)
+        print(
+            f"{'per-item PUT':>14}: {single / timer.elapsed:8,.0f} decisions/s, "
+            f"{counter.count / single:.1f} statements/decision"
+        )
+
+        decisions = [
+            {"application_id": application_id, "status": "approved" if application_id % 3 else "rejected"}
+            for application_id in range(single + 1, applications + 1)
+        ]
+        with QueryCounter(engine) as counter, Timer() as timer:
+            response = await client.post(
+                "/manager/loans/applications/decisions", json={"decisions": decisions}, headers=manager_headers
+            )
+            response.raise_for_status()
+        print(
+            f"{'batch':>14}: {len(decisions) / timer.elapsed:8,.0f} decisions/s, "
+            f"{counter.count} statements for {response.json()['updated']} decisions"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--applications", type=int, default=5000)
+    parser.add_argument("--single", type=int, default=200, help="how many to decide one PUT at a time")
+    args = parser.parse_args()
+    asyncio.run(run(args.applications, args.single))
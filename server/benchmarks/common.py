@@ -0,0 +1,263 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Run the scripts from the server/ directory, e.g. `python -m benchmarks.principal_cache`.
+Each one works against a throwaway SQLite database in a temp directory so the
+real bank_loan_db.db is never touched.
+"""
+import os
+import sys
+import tempfile
+import time
+import warnings
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SERVER_DIR not in sys.path:
+    sys.path.insert(0, SERVER_DIR)
+
+BENCH_PASSWORD = "benchmark-password"
+
+# Seeded applicants get names from these, and applications are submitted
+# SEED_INTERVAL apart from SEED_START, so search filters have something to select
+FIRST_NAMES = (
+    "Aarav", "Alice", "Amara", "Ben", "Carlos", "Chen", "Daniel", "Elena", "Fatima", "Grace",
+    "Hiro", "Ines", "Jonas", "Kavya", "Liam", "Maria", "Mohammed", "Nadia", "Olga", "Priya",
+    "Rahul", "Sofia", "Tomas", "Uma", "Victor", "Wei", "Yara", "Zoe",
+)
+LAST_NAMES = (
+    "Anderson", "Bauer", "Costa", "Dubois", "Evans", "Fischer", "Garcia", "Haddad", "Ivanova",
+    "Johnson", "Kim", "Lopez", "Martin", "Nakamura", "Okafor", "Patel", "Quinn", "Rossi",
+    "Schmidt", "Sharma", "Tanaka", "Usman", "Varga", "Williams", "Xu", "Yilmaz", "Zhang",
+)
+SEED_START = datetime(2025, 1, 1)
+SEED_INTERVAL = timedelta(seconds=30)
+
+
+def bootstrap_app():
+    """
+    Switch to a scratch directory and import the FastAPI app from main.py.
+
+    The default DATABASE_URL is relative, so it lands in the scratch directory;
+    set BENCH_DATABASE_URL to benchmark another database (e.g. PostgreSQL).
+    """
+    os.chdir(tempfile.mkdtemp(prefix="bank-loan-bench-"))
+    if os.environ.get("BENCH_DATABASE_URL"):
+        os.environ["DATABASE_URL"] = os.environ["BENCH_DATABASE_URL"]
+    # The demo SECRET_KEY trips PyJWT's key-length warning on every request
+    warnings.filterwarnings("ignore", module="jwt")
+    from main import app
+    from database import engine
+
+    engine.echo = False
+    return app
+
+
+@asynccontextmanager
+async def app_client(app):
+    """Run the app lifespan and yield an in-process ASGI client."""
+    import httpx
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            yield client
+
+
+async def register_and_login(client, email: str, role: str = "user") -> dict:
+    """Create an account through the API and return its Authorization header."""
+    await client.post("/auth/register", json={
+        "email": email, "name": email.split("@")[0], "password": BENCH_PASSWORD, "role": role,
+    })
+    response = await client.post("/auth/login", data={"username": email, "password": BENCH_PASSWORD})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def asgi_get_discarding_body(app, path: str, params: dict, headers: dict) -> tuple[int, int]:
+    """
+    Call the app directly and count body lines without keeping them.
+
+    httpx's ASGITransport buffers the whole response, which would hide whether
+    the server itself streams in constant memory. Returns (status, line count).
+    """
+    import asyncio
+    from urllib.parse import urlencode
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": urlencode(params).encode(),
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        "server": ("bench", 80), "client": ("127.0.0.1", 1),
+    }
+    sent_request = False
+    never = asyncio.Event()
+    status_code, lines = 0, 0
+
+    async def receive():
+        nonlocal sent_request
+        if not sent_request:
+            sent_request = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await never.wait()
+
+    async def send(message):
+        nonlocal status_code, lines
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+        elif message["type"] == "http.response.body":
+            lines += message.get("body", b"").count(b"\n")
+
+    await app(scope, receive, send)
+    return status_code, lines
+
+
+async def seed_users(count: int, role: str = "user", start: int = 0, batch_size: int = 10_000) -> list:
+    """
+    Bulk-insert users sharing one precomputed password hash; returns Authorization headers.
+
+    Registering through the API would spend most of the time in bcrypt.
+    """
+    from sqlalchemy import insert
+    from database import engine
+    from app.core.security import create_access_token, get_password_hash
+    from app.features.users.models import User, UserRole
+
+    password_hash = get_password_hash(BENCH_PASSWORD)
+    emails = [f"{role}-{i}@bench.example.com" for i in range(start, start + count)]
+    async with engine.begin() as conn:
+        for offset in range(0, count, batch_size):
+            await conn.execute(insert(User), [
+                {"email": email, "name": email.split("@")[0], "password": password_hash, "role": UserRole(role)}
+                for email in emails[offset:offset + batch_size]
+            ])
+    return [{"Authorization": f"Bearer {create_access_token({'sub': email})}"} for email in emails]
+
+
+class QueryCounter:
+    """Counts statements sent to the database while active."""
+
+    def __init__(self, engine):
+        self.engine = engine.sync_engine
+        self.count = 0
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+    def __enter__(self):
+        from sqlalchemy import event
+
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        from sqlalchemy import event
+
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+def percentile(samples: list, pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples: list) -> str:
+    """Format latency samples (seconds) as p50/p95/p99 in milliseconds."""
+    return "p50={:.2f}ms p95={:.2f}ms p99={:.2f}ms".format(
+        percentile(samples, 50) * 1000,
+        percentile(samples, 95) * 1000,
+        percentile(samples, 99) * 1000,
+    )
+
+
+class Timer:
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+
+
+async def seed_applications(application_count: int, loan_count: int = 10, start: int = 0, batch_size: int = 10_000):
+    """
+    Bulk-insert applications spread over synthetic applicants, bypassing the API.
+
+    Each applicant applies to every loan product once, which respects the
+    unique (userId, loanId) index. Loan products and applicants are created on
+    demand; `start` continues the numbering of an earlier call.
+    """
+    from sqlalchemy import func, insert, select
+    from database import engine
+    from app.core.security import get_password_hash
+    from app.features.loans.models import BankLoan, UserLoanApplication
+    from app.features.users.models import User
+
+    applicant = User.email.like("applicant-%")
+    async with engine.begin() as conn:
+        existing_loans = (await conn.execute(select(func.count()).select_from(BankLoan))).scalar()
+        if existing_loans < loan_count:
+            await conn.execute(insert(BankLoan), [
+                {"name": f"Loan product {i}", "interest_rate": 5 + i % 10, "is_active": True}
+                for i in range(existing_loans, loan_count)
+            ])
+        loan_ids = (await conn.execute(select(BankLoan.id).order_by(BankLoan.id))).scalars().all()[:loan_count]
+
+        existing_applicants = (await conn.execute(select(func.count()).select_from(User).where(applicant))).scalar()
+        needed_applicants = (start + application_count - 1) // loan_count + 1
+        password_hash = get_password_hash(BENCH_PASSWORD)
+        for offset in range(existing_applicants, needed_applicants, batch_size):
+            await conn.execute(insert(User), [
+                {
+                    "email": f"applicant-{k}@bench.example.com",
+                    "name": f"{FIRST_NAMES[k % len(FIRST_NAMES)]} {LAST_NAMES[k // len(FIRST_NAMES) % len(LAST_NAMES)]}",
+                    "password": password_hash,
+                }
+                for k in range(offset, min(offset + batch_size, needed_applicants))
+            ])
+        applicant_ids = (await conn.execute(select(User.id).where(applicant).order_by(User.id))).scalars().all()
+
+        end = start + application_count
+        for offset in range(start, end, batch_size):
+            await conn.execute(insert(UserLoanApplication), [
+                {
+                    "userId": applicant_ids[i // loan_count],
+                    "loanId": loan_ids[i % loan_count],
+                    "amount": 1000.0 + i % 50_000,
+                    "created_at": SEED_START + i * SEED_INTERVAL,
+                }
+                for i in range(offset, min(offset + batch_size, end))
+            ])
+
+
+async def seed_notifications(count: int, unread_percent: float, user_count: int, batch_size: int = 10_000):
+    """
+    Bulk-insert month-old notifications: every other one a manager broadcast, the
+    rest addressed to random users 1..user_count; about unread_percent% unread.
+    """
+    import random
+    from datetime import timedelta
+    from sqlalchemy import insert
+    from database import engine, utcnow
+    from app.features.notifications.models import Notification
+    from app.features.users.models import UserRole
+
+    old = utcnow() - timedelta(days=30)
+    rng = random.Random(0)
+    async with engine.begin() as conn:
+        for offset in range(0, count, batch_size):
+            await conn.execute(insert(Notification), [
+                {
+                    "user_id": None if i % 2 else rng.randint(1, user_count),
+                    "target_role": UserRole.MANAGER if i % 2 else None,
+                    "reference_id": f"loan_app_{i}" if i % 2 else None,
+                    "message": f"Benchmark notification {i}",
+                    "is_read": rng.random() * 100 >= unread_percent,
+                    "created_at": old,
+                }
+                for i in range(offset, min(offset + batch_size, count))
+            ])
@@ -0,0 +1,115 @@
+"""
+Polling clients with and without conditional GET (ETag / If-None-Match).
+
+--users applicants poll GET /notifications/unread and GET /loans/applications,
+and --managers poll GET /notifications/unread and the first page of
+GET /manager/loans/applications?status=pending, once per round for --rounds
+rounds. Between rounds --applies applicants apply for a loan and --decisions
+pending applications get decided, which publishes notifications through the
+job workers like production traffic does.
+
+Each run replays the same traffic, first with clients that ignore ETags and
+then with clients that send the last one back. Reports the fraction of polls
+answered 304 per endpoint, requests per second, and database queries per poll.
+
+    python -m benchmarks.conditional_get --users 200 --managers 10 --rounds 30
+"""
+import argparse
+import asyncio
+import os
+import random
+from collections import Counter
+
+from benchmarks.common import QueryCounter, Timer, app_client, bootstrap_app, seed_applications, seed_users
+
+USER_POLLS = ("/notifications/unread", "/loans/applications")
+MANAGER_POLLS = ("/notifications/unread", "/manager/loans/applications?status=pending&limit=100")
+
+
+async def poll(client, headers: dict, path: str, etags: dict, conditional: bool, results: Counter) -> list:
+    key = (headers["Authorization"], path)
+    request_headers = dict(headers)
+    if conditional and key in etags:
+        request_headers["If-None-Match"] = etags[key][0]
+    response = await client.get(path, headers=request_headers)
+    if response.status_code == 304:
+        results[path, 304] += 1
+        return etags[key][1]
+    response.raise_for_status()
+    results[path, 200] += 1
+    etags[key] = (response.headers["ETag"], response.json())
+    return etags[key][1]
+
+
+async def write_traffic(client, rng: random.Random, users: list, managers: list, next_loan: dict,
+                        pending: list, applies: int, decisions: int, loan_count: int) -> None:
+    for headers in rng.sample(users, applies):
+        index = next_loan.get(headers["Authorization"], 0)
+        if index < loan_count:
+            next_loan[headers["Authorization"]] = index + 1
+            await client.post("/loans/apply", json={"loan_id": index + 1, "amount": 5000}, headers=headers)
+    for application in rng.sample(pending, min(decisions, len(pending))):
+        status = rng.choice(["approved", "rejected"])
+        await client.put(f"/manager/loans/applications/{application['id']}", json={"status": status},
+                         headers=rng.choice(managers))
+
+
+async def run(users: int, managers: int, rounds: int, applies: int, decisions: int, applications: int):
+    # The scorer's writes don't change any polled list; keep it from competing for the writer
+    os.environ["RISK_SCORING_INTERVAL_SECONDS"] = "0"
+    app = bootstrap_app()
+    from database import engine
+    from app.core.change_sequence import change_sequences
+
+    loan_count = 20
+    async with app_client(app) as client:
+        await seed_applications(applications, loan_count=loan_count)
+        user_headers = await seed_users(users)
+        manager_headers = await seed_users(managers, role="manager")
+        next_loan: dict = {}
+
+        print(f"{users} applicants + {managers} managers polling, {rounds} rounds, "
+              f"{applies} applications and {decisions} decisions per round\n")
+        for conditional in (False, True):
+            rng = random.Random(42)
+            etags: dict = {}
+            results: Counter = Counter()
+            with QueryCounter(engine) as queries, Timer() as timer:
+                for _ in range(rounds):
+                    pending = []
+                    await asyncio.gather(*(
+                        poll(client, headers, path, etags, conditional, results)
+                        for headers in user_headers for path in USER_POLLS
+                    ))
+                    for headers in manager_headers:
+                        for path in MANAGER_POLLS:
+                            rows = await poll(client, headers, path, etags, conditional, results)
+                            if path.startswith("/manager"):
+                                pending = rows
+                    await write_traffic(client, rng, user_headers, manager_headers, next_loan,
+                                        pending, applies, decisions, loan_count)
+                    # Let the job workers publish the notifications those writes queued
+                    await asyncio.sleep(0.05)
+
+            polls = sum(results.values())
+            not_modified = sum(count for (_, code), count in results.items() if code == 304)
+            print(
+                f"conditional {'on ' if conditional else 'off'}: {not_modified / polls:6.1%} of {polls:,} polls 304, "
+                f"{polls / timer.elapsed:6.0f} polls/s, {queries.count / polls:5.2f} queries/poll"
+            )
+            for path in dict.fromkeys(USER_POLLS + MANAGER_POLLS):
+                served = results[path, 200] + results[path, 304]
+                print(f"    {path:<55} {results[path, 304] / served:6.1%} 304 of {served:,}")
+        print(f"\n{change_sequences.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--managers", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=30)
+    parser.add_argument("--applies", type=int, default=5, help="new applications between rounds")
+    parser.add_argument("--decisions", type=int, default=5, help="decided applications between rounds")
+    parser.add_argument("--applications", type=int, default=10_000, help="seeded applications")
+    args = parser.parse_args()
+    asyncio.run(run(args.users, args.managers, args.rounds, args.applies, args.decisions, args.applications))
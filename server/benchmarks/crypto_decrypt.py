@@ -0,0 +1,83 @@
+"""
+Micro-benchmarks for the /auth/login-encrypted and /auth/register-encrypted decrypt path.
+
+Builds payloads the same way the React client does (AES-256-ECB + PKCS7 body,
+RSA-wrapped key) and times EncryptionManager for each padding scheme, with and
+without the client's key_padding hint, plus the async executor path under
+concurrency.
+
+    python -m benchmarks.crypto_decrypt --iterations 200
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import time
+
+from benchmarks.common import SERVER_DIR, Timer, summarize  # noqa: F401  (puts server/ on sys.path)
+
+PAYLOADS = {
+    "login-encrypted": {"username": "bench-user@example.com", "password": "benchmark-password"},
+    "register-encrypted": {
+        "email": "bench-user@example.com", "name": "Bench", "password": "benchmark-password", "role": "user",
+    },
+}
+
+
+def encrypt_like_client(manager, data: dict, key_padding: str) -> tuple[str, str]:
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+    from app.core.encryption import KEY_PADDINGS
+
+    aes_key_str = base64.b64encode(os.urandom(32)).decode()
+    body = json.dumps(data).encode()
+    pad = 16 - len(body) % 16
+    body += bytes([pad]) * pad
+    encryptor = Cipher(algorithms.AES(base64.b64decode(aes_key_str)), modes.ECB()).encryptor()
+    encrypted_payload = base64.b64encode(encryptor.update(body) + encryptor.finalize()).decode()
+    encrypted_key = base64.b64encode(
+        manager.public_key.encrypt(aes_key_str.encode(), KEY_PADDINGS[key_padding])
+    ).decode()
+    return encrypted_key, encrypted_payload
+
+
+def bench_sync(manager, iterations: int):
+    for endpoint, data in PAYLOADS.items():
+        for key_padding in ("oaep", "pkcs1v15"):
+            for hinted in (False, True):
+                samples = []
+                for _ in range(iterations):
+                    encrypted_key, encrypted_payload = encrypt_like_client(manager, data, key_padding)
+                    start = time.perf_counter()
+                    manager.decrypt_request(encrypted_key, encrypted_payload, key_padding if hinted else None)
+                    samples.append(time.perf_counter() - start)
+                label = f"{endpoint} {key_padding} {'hinted' if hinted else 'probe'}"
+                print(f"{label:>40}: {summarize(samples)}")
+
+
+async def bench_async(manager, iterations: int, concurrency: int):
+    requests = [encrypt_like_client(manager, PAYLOADS["login-encrypted"], "pkcs1v15") for _ in range(iterations)]
+    with Timer() as timer:
+        for i in range(0, iterations, concurrency):
+            await asyncio.gather(*(
+                manager.decrypt_request_async(key, payload, "pkcs1v15")
+                for key, payload in requests[i:i + concurrency]
+            ))
+    print(f"{'async executor x' + str(concurrency):>40}: {iterations / timer.elapsed:,.0f} decrypts/s")
+
+
+def main(iterations: int, concurrency: int):
+    from app.core.encryption import encryption_manager
+
+    bench_sync(encryption_manager, iterations)
+    asyncio.run(bench_async(encryption_manager, iterations, concurrency))
+    encryption_manager.shutdown()
+    print(encryption_manager.stats())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    main(args.iterations, args.concurrency)
@@ -0,0 +1,83 @@
+"""
+Durable job queue: enqueue rate and drain throughput of the worker pool.
+
+Enqueues --jobs notify_user_of_update jobs (the real notification handler,
+writing through the notification sink), then drains them with each
+--workers setting and reports jobs per second.
+
+    python -m benchmarks.job_queue --jobs 20000 --workers 1 2 4 --batch-size 50
+"""
+import argparse
+import asyncio
+import os
+
+from benchmarks.common import Timer, bootstrap_app, seed_users
+
+
+async def enqueue_jobs(count: int, user_ids: list, per_transaction: int = 1000) -> float:
+    from database import AsyncSessionLocal
+    from app.features.jobs.queue import enqueue
+    from app.features.notifications.tasks import notify_user_of_update
+
+    with Timer() as timer:
+        for offset in range(0, count, per_transaction):
+            async with AsyncSessionLocal() as db:
+                for i in range(offset, min(offset + per_transaction, count)):
+                    enqueue(db, notify_user_of_update, user_id=user_ids[i % len(user_ids)], status="approved")
+                await db.commit()
+    return timer.elapsed
+
+
+async def drain(workers: int, batch_size: int) -> tuple:
+    from sqlalchemy import func, select
+    from database import AsyncSessionLocal
+    from app.core.config import settings
+    from app.features.jobs.models import Job
+    from app.features.jobs.queue import JobWorkerPool
+
+    pool = JobWorkerPool(
+        workers=workers, batch_size=batch_size, poll_interval=0.05, lease=settings.JOB_LEASE_SECONDS,
+        max_attempts=settings.JOB_MAX_ATTEMPTS, backoff=settings.JOB_RETRY_BACKOFF_SECONDS,
+        backoff_max=settings.JOB_RETRY_BACKOFF_MAX_SECONDS,
+    )
+    with Timer() as timer:
+        await pool.start()
+        while True:
+            async with AsyncSessionLocal() as db:
+                if not (await db.execute(select(func.count()).select_from(Job))).scalar():
+                    break
+            await asyncio.sleep(0.05)
+        await pool.stop()
+    return timer.elapsed, pool
+
+
+async def run(jobs: int, worker_counts: list[int], batch_size: int):
+    # Only the pools below should claim jobs
+    os.environ["JOB_WORKERS"] = "0"
+    os.environ["NOTIFICATION_RETENTION_INTERVAL_SECONDS"] = "0"
+    app = bootstrap_app()
+    from database import AsyncSessionLocal
+    from sqlalchemy import select
+    from app.features.users.models import User
+
+    async with app.router.lifespan_context(app):
+        await seed_users(1000)
+        async with AsyncSessionLocal() as db:
+            user_ids = (await db.execute(select(User.id))).scalars().all()
+
+        for workers in worker_counts:
+            enqueue_time = await enqueue_jobs(jobs, user_ids)
+            elapsed, pool = await drain(workers, batch_size)
+            print(
+                f"{workers} worker(s), batches of {batch_size}: enqueue {jobs / enqueue_time:8,.0f} jobs/s, "
+                f"drain {pool.completed / elapsed:8,.0f} jobs/s ({pool.completed:,} jobs in {elapsed:.1f}s)"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=20_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--batch-size", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.jobs, args.workers, args.batch_size))
@@ -0,0 +1,90 @@
+"""
+List endpoint serialization: ORM objects + response_model vs selected columns + RowSerializer.
+
+The "orm" path reproduces what the list routes did before: load
+UserLoanApplication objects with selectinload(loan), validate them against
+the response model with from_attributes, dump to Python and json.dumps.
+The "rows" path is the current application_rows_stmt() + RowSerializer.
+Both run against the same seeded rows; latency is the median of --repeat
+runs, peak allocated memory comes from tracemalloc.
+
+    python -m benchmarks.list_serialization --sizes 10000 50000
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import tracemalloc
+
+from benchmarks.common import Timer, bootstrap_app, seed_applications
+
+
+async def orm_path(db, limit: int) -> bytes:
+    from pydantic import TypeAdapter
+    from sqlalchemy import select
+    from sqlalchemy.orm import selectinload
+    from app.features.loans.models import UserLoanApplication
+    from app.features.loans.schema import UserLoanApplicationResponse
+
+    stmt = (
+        select(UserLoanApplication).options(selectinload(UserLoanApplication.loan))
+        .order_by(UserLoanApplication.id).limit(limit)
+    )
+    applications = (await db.execute(stmt)).scalars().all()
+    adapter = TypeAdapter(list[UserLoanApplicationResponse])
+    validated = adapter.validate_python(applications, from_attributes=True)
+    return json.dumps(adapter.dump_python(validated, mode="json")).encode()
+
+
+async def rows_path(db, limit: int) -> bytes:
+    from app.features.loans.models import UserLoanApplication
+    from app.features.loans.pagination import _application_rows, _as_dicts, application_rows_stmt
+
+    stmt = application_rows_stmt().order_by(UserLoanApplication.id).limit(limit)
+    rows = (await db.execute(stmt)).all()
+    return _application_rows.dump(_as_dicts(rows))
+
+
+async def measure(path, limit: int, repeat: int) -> tuple:
+    from database import AsyncSessionLocal
+
+    timings = []
+    for _ in range(repeat):
+        async with AsyncSessionLocal() as db:
+            with Timer() as timer:
+                body = await path(db, limit)
+        timings.append(timer.elapsed)
+
+    async with AsyncSessionLocal() as db:
+        tracemalloc.start()
+        await path(db, limit)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return statistics.median(timings), peak, body
+
+
+async def run(sizes: list[int], repeat: int):
+    bootstrap_app()
+    from database import Base, engine
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await seed_applications(max(sizes), loan_count=20)
+
+    for size in sizes:
+        results = {}
+        for label, path in (("orm", orm_path), ("rows", rows_path)):
+            results[label] = await measure(path, size, repeat)
+        assert json.loads(results["orm"][2]) == json.loads(results["rows"][2]), "paths disagree"
+        for label, (elapsed, peak, _) in results.items():
+            print(f"{size:>7} rows  {label:>4}: {elapsed * 1000:8.1f} ms, peak {peak / 1024 / 1024:6.1f} MiB")
+        print(f"{'':>13}speedup {results['orm'][0] / results['rows'][0]:.1f}x, "
+              f"peak memory {results['rows'][1] / results['orm'][1]:.0%} of before")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args.sizes, args.repeat))
@@ -0,0 +1,71 @@
+"""
+Load test: read-route latency while logins saturate bcrypt.
+
+Keeps `--login-concurrency` clients logging in continuously and measures
+`GET /loans/` latency alongside, first with hashing inline on the event
+loop and then on the worker pool.
+
+    python -m benchmarks.login_load --duration 5 --login-concurrency 16
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import BENCH_PASSWORD, app_client, bootstrap_app, register_and_login, summarize
+
+
+async def measure(client, headers, duration: float, login_concurrency: int) -> tuple[list, int]:
+    deadline = time.perf_counter() + duration
+    logins = 0
+
+    async def login_loop():
+        nonlocal logins
+        while time.perf_counter() < deadline:
+            response = await client.post(
+                "/auth/login", data={"username": "bench-user@example.com", "password": BENCH_PASSWORD}
+            )
+            if response.status_code == 200:
+                logins += 1
+
+    async def read_loop(samples: list):
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await client.get("/loans/", headers=headers)
+            response.raise_for_status()
+            samples.append(time.perf_counter() - start)
+            await asyncio.sleep(0.01)
+
+    samples: list = []
+    await asyncio.gather(read_loop(samples), *(login_loop() for _ in range(login_concurrency)))
+    return samples, logins
+
+
+async def run(duration: float, login_concurrency: int, workers: int):
+    app = bootstrap_app()
+    from app.core.hashing import password_hasher
+
+    async with app_client(app) as client:
+        headers = await register_and_login(client, "bench-user@example.com")
+
+        idle, _ = await measure(client, headers, duration / 2, 0)
+        print(f"{'idle':>24}: /loans/ {summarize(idle)}")
+
+        for label, pool_size in (("inline bcrypt", 0), (f"{workers}-worker pool", workers)):
+            password_hasher.shutdown()
+            password_hasher.workers = pool_size
+            password_hasher.max_pending = max(login_concurrency, password_hasher.max_pending)
+            samples, logins = await measure(client, headers, duration, login_concurrency)
+            print(
+                f"{label:>24}: /loans/ {summarize(samples)} "
+                f"({len(samples)} reads, {logins / duration:.1f} logins/s)"
+            )
+        print(password_hasher.stats())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--login-concurrency", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(run(args.duration, args.login_concurrency, args.workers))
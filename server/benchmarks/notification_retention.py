@@ -0,0 +1,64 @@
+"""
+Unread-notification latency on a bloated table, before and after one retention run.
+
+Seeds --notifications rows of which only --unread-percent are still unread
+(the rest read long ago), times GET /notifications/unread and /unread/count
+for a manager and a user, archives, and times them again.
+
+    python -m benchmarks.notification_retention --notifications 200000
+"""
+import argparse
+import asyncio
+
+from benchmarks.common import Timer, app_client, bootstrap_app, seed_notifications, seed_users, summarize
+
+
+async def time_reads(client, headers: dict, requests: int) -> dict:
+    samples = {"unread": [], "unread/count": []}
+    for _ in range(requests):
+        for path in samples:
+            with Timer() as timer:
+                response = await client.get(f"/notifications/{path}", headers=headers)
+            response.raise_for_status()
+            samples[path].append(timer.elapsed)
+    return samples
+
+
+async def run(notifications: int, unread_percent: float, requests: int):
+    app = bootstrap_app()
+    from sqlalchemy import func, select
+    from database import engine
+    from app.features.notifications.models import Notification
+    from app.features.notifications.retention import notification_retention
+    from app.features.notifications.unread import unread_counters
+
+    async with app_client(app) as client:
+        users = {
+            "user": (await seed_users(100))[0],
+            "manager": (await seed_users(1, role="manager"))[0],
+        }
+        await seed_notifications(notifications, unread_percent, user_count=100)
+
+        async def report(label: str):
+            async with engine.connect() as conn:
+                rows = (await conn.execute(select(func.count()).select_from(Notification))).scalar()
+            print(f"{label}: {rows:,} rows in notifications")
+            for name, headers in users.items():
+                unread_counters.clear()
+                for path, samples in (await time_reads(client, headers, requests)).items():
+                    print(f"  {name:>7} /{path:<13} {summarize(samples)}")
+
+        await report("before")
+        with Timer() as timer:
+            moved = await notification_retention.run_once()
+        print(f"retention run: moved {moved:,} rows in {timer.elapsed:.2f}s -> {notification_retention.stats()}")
+        await report("after")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--notifications", type=int, default=200_000)
+    parser.add_argument("--unread-percent", type=float, default=1.0)
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.notifications, args.unread_percent, args.requests))
@@ -0,0 +1,46 @@
+"""
+Notification burst: one transaction per event vs the coalescing sink.
+
+    python -m benchmarks.notification_sink --events 2000
+"""
+import argparse
+import asyncio
+
+from benchmarks.common import QueryCounter, Timer, bootstrap_app
+
+
+async def burst(events: int):
+    from app.features.notifications.tasks import notify_managers_of_new_loan, notify_user_of_update
+
+    await asyncio.gather(*(
+        notify_managers_of_new_loan(user_email="bench-user@example.com", application_id=i) if i % 2
+        else notify_user_of_update(user_id=1, status="approved")
+        for i in range(events)
+    ))
+
+
+async def run(events: int):
+    app = bootstrap_app()
+    from database import engine
+    from app.core.metrics import LatencyStats
+    from app.features.notifications.sink import notification_sink
+
+    async with app.router.lifespan_context(app):
+        await notification_sink.stop()
+        for label in ("per-event commit", "coalescing sink"):
+            if label == "coalescing sink":
+                notification_sink.flush_time = LatencyStats()
+                await notification_sink.start()
+            with QueryCounter(engine) as counter, Timer() as timer:
+                await burst(events)
+            print(
+                f"{label:>17}: {events / timer.elapsed:8,.0f} notifications/s, "
+                f"{counter.count} statements"
+            )
+        print(notification_sink.stats())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=2000)
+    asyncio.run(run(parser.parse_args().events))
@@ -0,0 +1,98 @@
+"""
+Cost of idle SSE connections and fan-out latency of the notification hub.
+
+Opens `--connections` streams on GET /notifications/stream (half users, half
+managers), then publishes manager broadcasts and measures how long it takes
+until every manager stream has written the event.
+
+    python -m benchmarks.notification_stream --connections 2000
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+from urllib.parse import urlencode
+
+from benchmarks.common import Timer, app_client, bootstrap_app, register_and_login
+
+
+def open_stream(app, token: str, on_event):
+    """Drive the SSE endpoint directly over ASGI; returns the running task."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/notifications/stream", "raw_path": b"/notifications/stream",
+        "root_path": "", "query_string": urlencode({"access_token": token}).encode(),
+        "headers": [], "server": ("bench", 80), "client": ("127.0.0.1", 1),
+    }
+    disconnect = asyncio.Event()
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and b"event: notification" in message.get("body", b""):
+            on_event()
+
+    task = asyncio.create_task(app(scope, receive, send))
+    task.disconnect = disconnect
+    return task
+
+
+async def run(connections: int, broadcasts: int):
+    app = bootstrap_app()
+    from app.features.notifications.hub import notification_hub
+    from app.features.notifications.tasks import notify_managers_of_new_loan
+
+    async with app_client(app) as client:
+        user_token = (await register_and_login(client, "bench-user@example.com"))["Authorization"][7:]
+        manager_token = (await register_and_login(client, "bench-manager@example.com", "manager"))["Authorization"][7:]
+
+        received = 0
+
+        def on_event():
+            nonlocal received
+            received += 1
+
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        with Timer() as timer:
+            streams = [
+                open_stream(app, manager_token if i % 2 else user_token, on_event)
+                for i in range(connections)
+            ]
+            while notification_hub.stats()["connections"] < connections:
+                await asyncio.sleep(0.01)
+        after, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(
+            f"opened {connections} streams in {timer.elapsed:.2f}s, "
+            f"~{(after - before) / connections / 1024:.1f} KiB per idle connection"
+        )
+
+        managers = connections // 2
+        for n in range(broadcasts):
+            target = received + managers
+            start = time.perf_counter()
+            await notify_managers_of_new_loan(user_email="bench-user@example.com", application_id=n)
+            while received < target:
+                await asyncio.sleep(0)
+            print(f"broadcast {n}: delivered to {managers} manager streams in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+        for stream in streams:
+            stream.disconnect.set()
+        await asyncio.gather(*streams, return_exceptions=True)
+        print(notification_hub.stats())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--connections", type=int, default=2000)
+    parser.add_argument("--broadcasts", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args.connections, args.broadcasts))
@@ -0,0 +1,51 @@
+"""
+Manager analytics: GET /manager/loans/stats vs pulling every application and aggregating.
+
+    python -m benchmarks.portfolio_stats --applications 100000
+"""
+import argparse
+import asyncio
+from collections import Counter
+
+from benchmarks.common import QueryCounter, Timer, app_client, bootstrap_app, seed_applications, seed_users, summarize
+
+
+async def run(applications: int, loans: int, requests: int):
+    app = bootstrap_app()
+    from database import AsyncSessionLocal, engine
+    from app.features.loans.stats import rebuild
+
+    async with app_client(app) as client:
+        headers = (await seed_users(1, role="manager"))[0]
+        await seed_applications(applications, loan_count=loans)
+        # Bulk seeding bypasses the API, so backfill the summary table once
+        async with AsyncSessionLocal() as db:
+            with Timer() as timer:
+                await rebuild(db)
+        print(f"rebuild (one GROUP BY over {applications:,} rows): {timer.elapsed * 1000:.0f} ms")
+
+        samples = []
+        for _ in range(3):
+            with Timer() as timer:
+                rows = (await client.get("/manager/loans/applications", headers=headers)).json()
+                Counter((row["loan"]["name"], row["status"]) for row in rows)
+            samples.append(timer.elapsed)
+        print(f"{'full list + client aggregate':>30}: {summarize(samples)}")
+
+        samples = []
+        with QueryCounter(engine) as counter:
+            for _ in range(requests):
+                with Timer() as timer:
+                    stats = (await client.get("/manager/loans/stats", headers=headers)).json()
+                samples.append(timer.elapsed)
+        print(f"{'/manager/loans/stats':>30}: {summarize(samples)}, {counter.count / requests:.1f} statements/request")
+        print(f"{stats['applications']:,} applications over {len(stats['loans'])} loan products")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--applications", type=int, default=100_000)
+    parser.add_argument("--loans", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.applications, args.loans, args.requests))
@@ -0,0 +1,46 @@
+"""
+Compare DB round trips per authenticated request with and without the principal cache.
+
+    python -m benchmarks.principal_cache --requests 2000
+"""
+import argparse
+import asyncio
+
+from benchmarks.common import QueryCounter, Timer, app_client, bootstrap_app, register_and_login
+
+
+async def run(requests: int):
+    app = bootstrap_app()
+    from database import engine
+    from app.core.principal_cache import principal_cache
+
+    async with app_client(app) as client:
+        user_headers = await register_and_login(client, "bench-user@example.com")
+        manager_headers = await register_and_login(client, "bench-manager@example.com", role="manager")
+        routes = [
+            ("/users/me", user_headers),
+            ("/notifications/unread", user_headers),
+            ("/manager/loans/", manager_headers),
+        ]
+
+        for label, maxsize in (("cache disabled", 0), ("cache enabled", principal_cache.maxsize or 10_000)):
+            principal_cache.clear()
+            principal_cache.maxsize = maxsize
+            principal_cache.hits = principal_cache.misses = 0
+
+            with QueryCounter(engine) as counter, Timer() as timer:
+                for i in range(requests):
+                    path, headers = routes[i % len(routes)]
+                    response = await client.get(path, headers=headers)
+                    response.raise_for_status()
+
+            print(
+                f"{label:>15}: {counter.count / requests:.2f} queries/request, "
+                f"{requests / timer.elapsed:,.0f} req/s, cache={principal_cache.stats()}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    asyncio.run(run(parser.parse_args().requests))
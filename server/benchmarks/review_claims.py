@@ -0,0 +1,139 @@
+"""
+Concurrent managers deciding pending applications: claims vs a shared list.
+
+--reviewers simulated managers, each with its own account, work through
+the pending applications over the real API until none are left:
+
+    shared list  every reviewer pages GET /manager/loans/applications?status=pending
+                 and decides what it sees, as before claims existed. Reviewers
+                 collide on the same rows; without a version the later decision
+                 silently replaces the earlier one and notifies the applicant again.
+    claims       every reviewer takes POST /manager/loans/applications/claim
+                 batches and decides them with the claimed version.
+
+The shared list run gets fewer applications (--shared-list-applications),
+since each one is decided many times over.
+
+Reports decisions per second, wasted requests (409s and decisions of rows
+someone else already decided) and duplicate applicant notifications.
+
+    python -m benchmarks.review_claims --reviewers 50 --applications 5000
+"""
+import argparse
+import asyncio
+import os
+import random
+
+from benchmarks.common import Timer, app_client, bootstrap_app, register_and_login, seed_applications
+
+
+async def reset(pending: int) -> None:
+    """The first `pending` applications pending again, the rest approved; nothing claimed or queued."""
+    from sqlalchemy import delete, func, select, update
+    from database import AsyncSessionLocal, engine
+    from app.features.jobs.models import Job
+    from app.features.loans.enums import LoanStatus
+    from app.features.loans.models import UserLoanApplication
+    from app.features.loans.stats import rebuild
+
+    async with engine.begin() as conn:
+        first_id = (await conn.execute(select(func.min(UserLoanApplication.id)))).scalar()
+        for status, condition in (
+            (LoanStatus.PENDING, UserLoanApplication.id < first_id + pending),
+            (LoanStatus.APPROVED, UserLoanApplication.id >= first_id + pending),
+        ):
+            await conn.execute(update(UserLoanApplication).where(condition).values(
+                status=status, version=0, claimed_by=None, claim_expires_at=None,
+            ))
+        await conn.execute(delete(Job))
+    async with AsyncSessionLocal() as db:
+        await rebuild(db)
+
+
+async def notifications_per_application() -> tuple[int, int]:
+    """(notification jobs queued, distinct applications decided since the reset)."""
+    from sqlalchemy import func, select
+    from database import engine
+    from app.features.jobs.models import Job
+    from app.features.loans.models import UserLoanApplication
+
+    async with engine.connect() as conn:
+        jobs = (await conn.execute(select(func.count()).select_from(Job))).scalar()
+        decided = (await conn.execute(
+            select(func.count()).select_from(UserLoanApplication).where(UserLoanApplication.version > 0)
+        )).scalar()
+    return jobs, decided
+
+
+async def shared_list_reviewer(client, headers: dict, page: int, counts: dict) -> None:
+    rng = random.Random(headers["Authorization"])
+    while True:
+        response = await client.get(
+            "/manager/loans/applications", params={"status": "pending", "limit": page}, headers=headers,
+        )
+        rows = response.json()
+        if not rows:
+            return
+        for row in rows:
+            status = rng.choice(["approved", "rejected"])
+            response = await client.put(f"/manager/loans/applications/{row['id']}", json={"status": status}, headers=headers)
+            counts[response.status_code] = counts.get(response.status_code, 0) + 1
+
+
+async def claiming_reviewer(client, headers: dict, page: int, counts: dict) -> None:
+    rng = random.Random(headers["Authorization"])
+    while True:
+        response = await client.post("/manager/loans/applications/claim", params={"count": page}, headers=headers)
+        rows = response.json()
+        if not rows:
+            return
+        for row in rows:
+            status = rng.choice(["approved", "rejected"])
+            response = await client.put(
+                f"/manager/loans/applications/{row['id']}", json={"status": status, "version": row["version"]}, headers=headers,
+            )
+            counts[response.status_code] = counts.get(response.status_code, 0) + 1
+
+
+async def run(reviewers: int, applications: int, shared_list_applications: int, page: int):
+    # Notifications stay queued so they can be counted; the scorer would compete for the writer
+    os.environ["JOB_WORKERS"] = "0"
+    os.environ["RISK_SCORING_INTERVAL_SECONDS"] = "0"
+    if "sqlite" in os.environ.get("BENCH_DATABASE_URL", "sqlite"):
+        # One writer: with more connections than a few, 50 reviewers' transactions starve
+        # in SQLite's busy handler ("database is locked") instead of queueing for the pool
+        os.environ.setdefault("DATABASE_POOL_SIZE", "4")
+        os.environ.setdefault("DATABASE_MAX_OVERFLOW", "0")
+    app = bootstrap_app()
+
+    async with app_client(app) as client:
+        await seed_applications(applications, loan_count=10)
+        managers = [await register_and_login(client, f"reviewer-{i}@bench.example.com", "manager") for i in range(reviewers)]
+
+        print(f"{reviewers} reviewers, {page} applications per page/claim\n")
+        for name, reviewer, pending in (
+            ("claims", claiming_reviewer, applications),
+            ("shared list", shared_list_reviewer, shared_list_applications),
+        ):
+            await reset(pending)
+            counts: dict = {}
+            with Timer() as timer:
+                await asyncio.gather(*(reviewer(client, headers, page, counts) for headers in managers))
+            jobs, decided = await notifications_per_application()
+            attempts = sum(counts.values())
+            print(
+                f"{name:>11}: {decided / timer.elapsed:7.1f} decisions/s ({decided:,} decided in {timer.elapsed:.1f}s); "
+                f"{attempts:,} PUTs, {counts.get(409, 0):,} conflicts (409), "
+                f"{jobs - decided:,} duplicate notifications"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reviewers", type=int, default=50)
+    parser.add_argument("--applications", type=int, default=5000)
+    parser.add_argument("--shared-list-applications", type=int, default=500,
+                        help="pending applications for the shared list run, which decides each one many times over")
+    parser.add_argument("--page", type=int, default=5, help="applications per listing page or claim")
+    args = parser.parse_args()
+    asyncio.run(run(args.reviewers, args.applications, args.shared_list_applications, args.page))
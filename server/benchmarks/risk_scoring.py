@@ -0,0 +1,130 @@
+"""
+Risk scoring: NumPy batches vs a per-application Python loop, and the
+database round trip.
+
+1. Engine only: --rows synthetic applications are scored by risk_scores()
+   --chunk-size at a time. A plain Python loop over the same formula runs
+   on a --sample of them and is extrapolated.
+2. End to end: --applications seeded rows (a fifth approved, a fifth
+   rejected, the rest pending) are re-scored with score_pending(), the
+   newest 1% are scored again as unscored arrivals, and review queue pages
+   are read at the top and deep into the queue.
+
+    python -m benchmarks.risk_scoring --rows 1000000 --applications 1000000
+"""
+import argparse
+import asyncio
+import math
+
+from benchmarks.common import Timer, bootstrap_app, percentile, seed_applications
+
+
+def python_loop(rows) -> list:
+    """Reference: the same formula, one application at a time."""
+    from app.features.loans.risk import WEIGHTS
+
+    scores = []
+    for amount, rate, avg_amount, product_rejected, user_rejected, user_pending in rows:
+        z = (
+            WEIGHTS["amount"] * math.log(max(amount, 1.0) / avg_amount)
+            + WEIGHTS["interest_rate"] * (rate - 10) / 10
+            + WEIGHTS["product_rejected"] * (product_rejected - 0.5)
+            + WEIGHTS["user_rejected"] * (user_rejected - 0.5)
+            + WEIGHTS["user_pending"] * math.log1p(user_pending)
+        )
+        scores.append(1 / (1 + math.exp(-z)))
+    return scores
+
+
+def synthetic(rng, size: int) -> tuple:
+    return (
+        rng.uniform(1_000, 500_000, size),
+        rng.integers(20, 61, size) / 4,
+        rng.uniform(50_000, 250_000, size),
+        rng.uniform(0.1, 0.6, size),
+        rng.uniform(0.05, 0.95, size),
+        rng.integers(0, 5, size).astype(float),
+    )
+
+
+def engine_only(rows: int, chunk_size: int, sample: int):
+    import numpy as np
+    from app.features.loans.risk import risk_scores
+
+    rng = np.random.default_rng(0)
+    chunks = [synthetic(rng, min(chunk_size, rows - offset)) for offset in range(0, rows, chunk_size)]
+    with Timer() as timer:
+        for chunk in chunks:
+            risk_scores(*chunk)
+    print(f"numpy, {rows:,} applications: {timer.elapsed * 1000:8.0f} ms "
+          f"({rows / timer.elapsed:,.0f} rows/s, chunks of {chunk_size:,})")
+
+    features = synthetic(rng, sample)
+    with Timer() as loop_timer:
+        expected = python_loop(zip(*(column.tolist() for column in features)))
+    assert np.allclose(risk_scores(*features), expected), "engines disagree"
+    estimate = loop_timer.elapsed / sample * rows
+    print(f"python loop, {sample:,} applications: {loop_timer.elapsed * 1000:8.0f} ms "
+          f"(~{estimate:.1f} s for {rows:,}, {estimate / timer.elapsed:.0f}x slower)")
+
+
+async def end_to_end(applications: int, chunk_size: int):
+    from sqlalchemy import func, select, update
+    from database import AsyncSessionLocal, Base, engine
+    from app.features.loans.enums import LoanStatus
+    from app.features.loans.models import UserLoanApplication
+    from app.features.loans.pagination import decode_score_cursor, list_review_queue
+    from app.features.loans.risk import score_pending
+    from app.features.loans.stats import rebuild
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await seed_applications(applications, loan_count=20)
+    async with engine.begin() as conn:
+        for remainder, status in ((0, LoanStatus.APPROVED), (1, LoanStatus.REJECTED)):
+            await conn.execute(
+                update(UserLoanApplication).where(UserLoanApplication.id % 5 == remainder).values(status=status)
+            )
+    async with AsyncSessionLocal() as db:
+        await rebuild(db)
+
+    async with AsyncSessionLocal() as db:
+        with Timer() as timer:
+            scored = await score_pending(db, chunk_size)
+    print(f"full re-score, {scored:,} pending of {applications:,}: {timer.elapsed * 1000:8.0f} ms "
+          f"({scored / timer.elapsed:,.0f} rows/s)")
+
+    async with engine.begin() as conn:
+        newest = (await conn.execute(select(func.max(UserLoanApplication.id)))).scalar() - applications // 100
+        await conn.execute(
+            update(UserLoanApplication)
+            .where(UserLoanApplication.id > newest, UserLoanApplication.status == LoanStatus.PENDING)
+            .values(risk_score=None)
+        )
+    async with AsyncSessionLocal() as db:
+        with Timer() as timer:
+            scored = await score_pending(db, chunk_size, unscored_only=True)
+    print(f"new arrivals, {scored:,} unscored: {timer.elapsed * 1000:8.0f} ms ({scored / timer.elapsed:,.0f} rows/s)")
+
+    async with AsyncSessionLocal() as db:
+        for label, pages in (("first page", 1), ("page 200", 200)):
+            cursor, samples = None, []
+            for _ in range(pages):
+                with Timer() as timer:
+                    response = await list_review_queue(db, 50, cursor, riskiest_first=True)
+                samples.append(timer.elapsed * 1000)
+                cursor = response.headers["X-Next-Cursor"]
+            print(f"review queue {label} (50 rows, riskiest first): {samples[-1]:6.2f} ms "
+                  f"(p50 over the walk {percentile(samples, 50):.2f} ms); last score {decode_score_cursor(cursor)[0]:.4f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--applications", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--sample", type=int, default=50_000, help="applications run through the Python loop")
+    args = parser.parse_args()
+    bootstrap_app()
+    engine_only(args.rows, args.chunk_size, args.sample)
+    asyncio.run(end_to_end(args.applications, args.chunk_size))
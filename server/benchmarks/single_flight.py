@@ -0,0 +1,66 @@
+"""
+Manager dashboards polling the same reads at once, with and without
+single-flight coalescing.
+
+--dashboards managers poll GET /manager/loans/applications?status=pending
+(first page) and GET /manager/loans/ together, --rounds times, the way a
+room full of dashboards on the same refresh interval does. Reports
+requests per second, p50/p95 latency of a poll and how many queries the
+database actually ran.
+
+    python -m benchmarks.single_flight --dashboards 50 --applications 100000
+"""
+import argparse
+import asyncio
+
+from benchmarks.common import (
+    QueryCounter, Timer, app_client, bootstrap_app, percentile, register_and_login, seed_applications,
+)
+
+POLLS = (
+    ("/manager/loans/applications", {"status": "pending", "limit": 100}),
+    ("/manager/loans/", {}),
+)
+
+
+async def poll(client, headers: dict, samples: list) -> None:
+    for path, params in POLLS:
+        with Timer() as timer:
+            response = await client.get(path, params=params, headers=headers)
+        response.raise_for_status()
+        samples.append(timer.elapsed * 1000)
+
+
+async def run(dashboards: int, applications: int, rounds: int):
+    app = bootstrap_app()
+    from database import engine
+    from app.core.singleflight import single_flight
+
+    async with app_client(app) as client:
+        await seed_applications(applications, loan_count=50)
+        managers = [await register_and_login(client, f"dashboard-{i}@bench.example.com", "manager") for i in range(dashboards)]
+        user = await register_and_login(client, "not-a-manager@bench.example.com")
+        assert (await client.get("/manager/loans/", headers=user)).status_code == 403
+
+        print(f"{dashboards} dashboards x {rounds} rounds, {applications:,} applications\n")
+        for enabled in (False, True):
+            single_flight.enabled = enabled
+            samples: list = []
+            with QueryCounter(engine) as queries, Timer() as timer:
+                for _ in range(rounds):
+                    await asyncio.gather(*(poll(client, headers, samples) for headers in managers))
+            print(
+                f"single-flight {'on ' if enabled else 'off'}: {len(samples) / timer.elapsed:7.0f} req/s, "
+                f"p50 {percentile(samples, 50):6.1f} ms, p95 {percentile(samples, 95):6.1f} ms, "
+                f"{queries.count:,} queries for {len(samples):,} requests"
+            )
+        print(f"\n{single_flight.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dashboards", type=int, default=50)
+    parser.add_argument("--applications", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.dashboards, args.applications, args.rounds))
@@ -0,0 +1,145 @@
+"""
+Cold start of N worker processes booting at once, like uvicorn --workers N.
+
+Each worker imports main.py, runs the app startup (lifespan) and fetches
+the RSA public key, reporting how long each step took. Scenarios:
+
+    cold    empty database and key directory (first deploy)
+    warm    same again (every restart after that)
+    legacy  warm, but with the DDL every worker ran at startup before
+            schema bootstrapping (create_all + index check + stats backfill check)
+    preload warm, importing main.py once and forking the workers from it
+            (what gunicorn --preload does), so import time is paid once
+
+Every scenario must end with all workers serving the same public key.
+
+    python -m benchmarks.startup --workers 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import SERVER_DIR, percentile
+
+
+def import_app() -> float:
+    import warnings
+
+    started = time.perf_counter()
+    warnings.filterwarnings("ignore", module="jwt")
+    import main  # noqa: F401
+    return started
+
+
+async def child(legacy: bool, started: float) -> dict:
+    import hashlib
+    from main import app
+    from bootstrap import schema_bootstrap
+    from app.core.encryption import encryption_manager
+    imported = time.perf_counter()
+
+    if legacy:
+        from database import AsyncSessionLocal, Base, create_missing_indexes, engine
+        from app.features.loans.stats import rebuild_if_empty
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(create_missing_indexes)
+        async with AsyncSessionLocal() as db:
+            await rebuild_if_empty(db)
+
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+        public_key = await encryption_manager.get_public_key_pem_async()
+        keyed = time.perf_counter()
+
+    return {
+        "import_ms": (imported - started) * 1000,
+        "startup_ms": (ready - imported) * 1000,
+        "first_key_ms": (keyed - ready) * 1000,
+        "total_ms": (keyed - started) * 1000,
+        "ran_ddl": schema_bootstrap.ran_ddl,
+        "generated_keys": encryption_manager.keys_generated,
+        "public_key": hashlib.sha256(public_key.encode()).hexdigest()[:12],
+    }
+
+
+def preloaded_children(workers: int) -> None:
+    """Import once, then fork the workers; each prints its own result line."""
+    import_app()
+    pids = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            result = asyncio.run(child(legacy=False, started=time.perf_counter()))
+            print(json.dumps(result), flush=True)
+            os._exit(0)
+        pids.append(pid)
+    for pid in pids:
+        os.waitpid(pid, 0)
+
+
+def launch(workers: int, env: dict, mode: str) -> tuple:
+    args = [sys.executable, "-m", "benchmarks.startup", "--child", mode]
+    if mode == "preload":
+        args += ["--workers", str(workers)]
+    started = time.perf_counter()
+    processes = [
+        subprocess.Popen(args, cwd=SERVER_DIR, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        for _ in range(1 if mode == "preload" else workers)
+    ]
+    results = []
+    for process in processes:
+        out, err = process.communicate()
+        if process.returncode:
+            raise SystemExit(f"worker failed:\n{err}")
+        results.extend(json.loads(line) for line in out.splitlines() if line.startswith("{"))
+    return time.perf_counter() - started, results
+
+
+def report(name: str, wall: float, results: list):
+    totals = [result["total_ms"] for result in results]
+    keys = {result["public_key"] for result in results}
+    print(
+        f"{name:>7}: all ready in {wall * 1000:6.0f} ms; per worker total p50 {percentile(totals, 50):6.0f} ms "
+        f"max {max(totals):6.0f} ms (import {percentile([r['import_ms'] for r in results], 50):4.0f}, "
+        f"startup {percentile([r['startup_ms'] for r in results], 50):4.0f}, "
+        f"first key {percentile([r['first_key_ms'] for r in results], 50):4.0f}); "
+        f"DDL by {sum(r['ran_ddl'] for r in results)}, keys generated by {sum(r['generated_keys'] for r in results)}, "
+        f"{len(keys)} distinct public key{'s' if len(keys) != 1 else ''}"
+    )
+    if len(keys) != 1:
+        raise SystemExit("workers disagree on the key pair")
+
+
+def run(workers: int):
+    scratch = tempfile.mkdtemp(prefix="bank-loan-startup-")
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite+aiosqlite:///{scratch}/startup.db",
+        "ENCRYPTION_KEY_DIR": os.path.join(scratch, "keys"),
+        "JOB_WORKERS": "0",
+        "NOTIFICATION_RETENTION_INTERVAL_SECONDS": "0",
+        "METRICS_LOOP_LAG_INTERVAL_SECONDS": "0",
+    }
+    print(f"{workers} workers starting together\n")
+    for mode in ("cold", "warm", "legacy", "preload"):
+        report(mode, *launch(workers, env, mode))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--child", choices=["cold", "warm", "legacy", "preload"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child == "preload":
+        preloaded_children(args.workers)
+    elif args.child:
+        started = import_app()
+        print(json.dumps(asyncio.run(child(args.child == "legacy", started))))
+    else:
+        run(args.workers)
@@ -0,0 +1,115 @@
+"""
+One-time startup work for multi-process deployments (uvicorn --workers N,
+gunicorn).
+
+Every worker's lifespan calls schema_bootstrap.run(). The schema DDL (new
+tables, columns added to existing tables, indexes, the SQLite search index,
+plus the one-off stats and notification read_at backfills) only runs when the models changed since the last bootstrap, which
+is recorded as a fingerprint in schema_versions; the first worker to notice
+does it under a file lock while the rest wait, and every later boot costs
+one SELECT. The RSA key pair is generated lazily by
+app.core.encryption under its own lock.
+
+Deployments with several hosts, or a database user without DDL rights, can
+run this once as a preload step and set BOOTSTRAP_SCHEMA_ON_STARTUP=false:
+
+    python -m bootstrap
+
+Importing the app is most of a worker's start time. gunicorn can import it
+once and fork the workers from there; nothing at import time opens a
+connection, a thread or the key files, so that is safe:
+
+    gunicorn main:app -k uvicorn.workers.UvicornWorker -w 4 --preload
+"""
+import asyncio
+import hashlib
+import time
+
+from sqlalchemy import inspect, insert, select
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from database import AsyncSessionLocal, Base, add_missing_columns, create_missing_indexes, engine, schema_versions
+from app.core.encryption import KEY_DIR, encryption_manager
+from app.core.filelock import FileLock
+from app.features.loans.search import SEARCH_TABLE_DDL, SEARCH_TRIGGERS, create_search_index
+from app.features.loans.stats import rebuild_if_empty
+from app.features.notifications.retention import backfill_read_at
+
+
+def schema_fingerprint(dialect) -> str:
+    """Hash of the CREATE TABLE / CREATE INDEX statements for every model, plus the search index DDL."""
+    digest = hashlib.sha256()
+    for table in Base.metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=dialect)).encode())
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            digest.update(str(CreateIndex(index).compile(dialect=dialect)).encode())
+    for statement in (SEARCH_TABLE_DDL, *SEARCH_TRIGGERS.values()):
+        digest.update(statement.encode())
+    return digest.hexdigest()
+
+
+class SchemaBootstrap:
+    def __init__(self):
+        self.lock = FileLock(KEY_DIR / ".schema.lock")
+        self.ran_ddl = False
+        self.lock_wait_seconds = 0.0
+        self.seconds = 0.0
+
+    async def _is_current(self, fingerprint: str) -> bool:
+        async with engine.connect() as conn:
+            if not await conn.run_sync(lambda sync_conn: inspect(sync_conn).has_table(schema_versions.name)):
+                return False
+            stmt = select(schema_versions.c.fingerprint).where(schema_versions.c.fingerprint == fingerprint)
+            return (await conn.execute(stmt)).first() is not None
+
+    async def run(self) -> bool:
+        """Bring the schema up to date if no process has yet; returns whether this one ran the DDL."""
+        start = time.perf_counter()
+        fingerprint = schema_fingerprint(engine.dialect)
+        try:
+            if await self._is_current(fingerprint):
+                return False
+            lock_start = time.perf_counter()
+            async with self.lock:
+                self.lock_wait_seconds = time.perf_counter() - lock_start
+                # Another worker may have finished while we waited
+                if await self._is_current(fingerprint):
+                    return False
+                async with engine.begin() as conn:
+                    await conn.run_sync(Base.metadata.create_all)
+                    await conn.run_sync(add_missing_columns)
+                    await conn.run_sync(create_missing_indexes)
+                    await conn.run_sync(create_search_index)
+                    await conn.run_sync(backfill_read_at)
+                async with AsyncSessionLocal() as db:
+                    await rebuild_if_empty(db)
+                # Recorded last, so an interrupted bootstrap is redone on the next start
+                async with engine.begin() as conn:
+                    await conn.execute(insert(schema_versions).values(fingerprint=fingerprint))
+                self.ran_ddl = True
+                return True
+        finally:
+            self.seconds = time.perf_counter() - start
+
+    def stats(self) -> dict:
+        return {
+            "ran_ddl": self.ran_ddl,
+            "lock_wait_seconds": self.lock_wait_seconds,
+            "seconds": self.seconds,
+        }
+
+
+# Global instance
+schema_bootstrap = SchemaBootstrap()
+
+
+async def _main() -> None:
+    ran_ddl = await schema_bootstrap.run()
+    print("schema: " + ("created/updated" if ran_ddl else "already current"))
+    await asyncio.to_thread(encryption_manager.load_keys)
+    print("keys: " + ("generated" if encryption_manager.keys_generated else "already present") + f" in {KEY_DIR}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -1,12 +1,51 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, String, Table, event, inspect
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import declarative_base
 
-DATABASE_URL = "sqlite+aiosqlite:///./bank_loan_db.db"
+from app.core.config import settings
 
-engine = create_async_engine(
-    DATABASE_URL,
-    echo=True
-)
+DATABASE_URL = settings.DATABASE_URL
+
+SQLITE_PRAGMAS = {
+    "journal_mode": settings.SQLITE_JOURNAL_MODE,
+    "synchronous": settings.SQLITE_SYNCHRONOUS,
+    "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+    "mmap_size": settings.SQLITE_MMAP_SIZE,
+    "cache_size": settings.SQLITE_CACHE_SIZE,
+}
+
+def _engine_options(url: str) -> dict:
+    """Engine keyword arguments for the configured backend."""
+    options = {"echo": settings.DATABASE_ECHO}
+    parsed = make_url(url)
+    in_memory_sqlite = parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")
+    if not in_memory_sqlite:
+        options.update(
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=settings.DATABASE_MAX_OVERFLOW,
+            pool_timeout=settings.DATABASE_POOL_TIMEOUT_SECONDS,
+        )
+    if parsed.get_backend_name() == "postgresql":
+        options.update(
+            pool_recycle=settings.DATABASE_POOL_RECYCLE_SECONDS,
+            pool_pre_ping=True,
+        )
+    return options
+
+engine = create_async_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
+
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine.sync_engine, "connect")
+    def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+        """WAL lets readers run alongside the single writer; the rest trades durability of the last few ms for fewer fsyncs."""
+        cursor = dbapi_connection.cursor()
+        for pragma, value in SQLITE_PRAGMAS.items():
+            if value:
+                cursor.execute(f"PRAGMA {pragma}={value}")
+        cursor.close()
 
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -18,6 +57,40 @@ AsyncSessionLocal = async_sessionmaker(
 
 Base = declarative_base()
 
+def utcnow() -> datetime:
+    """Current time as naive UTC, the form every DateTime column stores."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+# One row per schema version (fingerprint of the models' DDL) that bootstrap.py has applied
+schema_versions = Table(
+    "schema_versions",
+    Base.metadata,
+    Column("fingerprint", String(64), primary_key=True),
+    Column("applied_at", DateTime, default=utcnow),
+)
+
+def add_missing_columns(sync_conn):
+    """create_all() doesn't alter existing tables; add columns added to a model later (nullable or server-defaulted)."""
+    inspector = inspect(sync_conn)
+    ddl_compiler = sync_conn.dialect.ddl_compiler(sync_conn.dialect, None)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                table_name = ddl_compiler.preparer.format_table(table)
+                sync_conn.exec_driver_sql(
+                    f"ALTER TABLE {table_name} ADD COLUMN {ddl_compiler.get_column_specification(column)}"
+                )
+
+def create_missing_indexes(sync_conn):
+    """create_all() skips tables that already exist, so indexes added to a model later are created here."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+
 from app.features.users.models import User
 from app.features.loans.models import BankLoan, UserLoanApplication
-from app.features.notifications.models import Notification
\ No newline at end of file
+from app.features.notifications.models import Notification
+from app.features.jobs.models import Job
\ No newline at end of file
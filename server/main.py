@@ -1,21 +1,55 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
-from database import engine,Base
+from database import engine
+from bootstrap import schema_bootstrap
+from app.core.config import settings
+from app.core.hashing import password_hasher
+from app.core.metrics import registry
+from app.core.instrumentation import MetricsMiddleware, instrument_engine, loop_lag_monitor, register_pool_gauges
+from app.core.principal_cache import principal_cache
+from app.core.encryption import encryption_manager
+from app.core.singleflight import single_flight
+from app.core.change_sequence import change_sequences
+from app.features.notifications.sink import notification_sink
+from app.features.notifications.retention import notification_retention
+from app.features.notifications.hub import notification_hub
+from app.features.notifications.tail import notification_tail
+from app.features.notifications.unread import unread_counters
+from app.features.jobs.queue import job_workers
+from app.features.loans.risk import risk_scoring
+from app.features.loans.catalog import loan_catalog
 from app.features.auth.router import router as auth_router
 from app.features.users.router import router as users_router
 from app.features.loans.routes_user import router as user_loans_router
 from app.features.loans.routes_manager import router as manager_loans_router
 from app.features.notifications.router import router as notifications_router
+from app.features.jobs.router import router as jobs_router
 
 @asynccontextmanager
 async def lifespan(app:FastAPI):
 
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    if settings.BOOTSTRAP_SCHEMA_ON_STARTUP:
+        await schema_bootstrap.run()
+    await notification_sink.start()
+    await notification_tail.start()
+    await notification_retention.start()
+    await job_workers.start()
+    await risk_scoring.start()
+    await loop_lag_monitor.start()
     yield
 
+    await loop_lag_monitor.stop()
+    await risk_scoring.stop()
+    # Before the sink, so jobs still running can write their notifications
+    await job_workers.stop()
+    await notification_retention.stop()
+    await notification_tail.stop()
+    await notification_sink.stop()
+    password_hasher.shutdown()
+    encryption_manager.shutdown()
+
 app = FastAPI(
     title="Bank Loan API",
     description="API for managing bank loans",
@@ -23,12 +57,40 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+if settings.METRICS_ENABLED:
+    instrument_engine(engine.sync_engine)
+    register_pool_gauges(engine)
+    for component, stats in {
+        "principal_cache": principal_cache.stats,
+        "password_hasher": password_hasher.stats,
+        "encryption": encryption_manager.stats,
+        "loan_catalog": loan_catalog.stats,
+        "notification_hub": notification_hub.stats,
+        "notification_sink": notification_sink.stats,
+        "notification_tail": notification_tail.stats,
+        "notification_retention": notification_retention.stats,
+        "unread_counters": unread_counters.stats,
+        "job_workers": job_workers.stats,
+        "risk_scoring": risk_scoring.stats,
+        "single_flight": single_flight.stats,
+        "conditional_get": change_sequences.stats,
+        "event_loop": loop_lag_monitor.stats,
+        "schema_bootstrap": schema_bootstrap.stats,
+    }.items():
+        registry.register_stats(component, stats)
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return Response(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000", "http://localhost:5173"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Content-Disposition", "ETag"],
 )
 
 app.include_router(auth_router)
@@ -39,6 +101,8 @@ app.include_router(manager_loans_router)
 
 app.include_router(notifications_router)
 
+app.include_router(jobs_router)
+
 @app.get("/")
 async def index():
     return {"message": "Hello World"}
@@ -0,0 +1,106 @@
+"""
+Shared fixtures. Run from the server/ directory:
+
+    python -m pytest
+
+The suite runs against an in-memory SQLite database, or the database in
+TEST_DATABASE_URL (e.g. postgresql+asyncpg://user@host/bank_loan_test, which it
+empties). Each test starts from an empty schema with the app lifespan running and the in-process caches reset.
+Background loops (risk scoring, retention, the notification stream tail, job
+workers) are off; tests that need them drive them directly.
+"""
+import os
+import tempfile
+
+os.environ["DATABASE_URL"] = os.environ.get("TEST_DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("ENCRYPTION_KEY_DIR", tempfile.mkdtemp(prefix="bank-loan-test-keys-"))
+os.environ["RISK_SCORING_INTERVAL_SECONDS"] = "0"
+os.environ["NOTIFICATION_RETENTION_INTERVAL_SECONDS"] = "0"
+os.environ["NOTIFICATION_STREAM_TAIL_SECONDS"] = "0"
+os.environ["METRICS_LOOP_LAG_INTERVAL_SECONDS"] = "0"
+os.environ["JOB_WORKERS"] = "0"
+
+import httpx
+import pytest
+from sqlalchemy import insert
+
+from main import app as asgi_app
+from database import AsyncSessionLocal, Base, engine
+from app.core.principal_cache import principal_cache
+from app.core.security import create_access_token
+from app.features.loans.catalog import loan_catalog
+from app.features.loans.models import BankLoan
+from app.features.loans.search import SEARCH_TABLE
+from app.features.notifications.hub import notification_hub
+from app.features.notifications.unread import unread_counters
+from app.features.users.models import User, UserRole
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+async def _reset_database() -> None:
+    async with engine.begin() as conn:
+        if conn.dialect.name == "sqlite":
+            await conn.exec_driver_sql(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+        await conn.run_sync(Base.metadata.drop_all)
+
+
+@pytest.fixture
+async def app():
+    """The app with its lifespan running (which bootstraps the schema) on a fresh database."""
+    await _reset_database()
+    principal_cache.clear()
+    unread_counters.clear()
+    notification_hub.clear()
+    async with asgi_app.router.lifespan_context(asgi_app):
+        await loan_catalog.reload()
+        yield asgi_app
+    # The in-memory database goes with its connection
+    await engine.dispose()
+
+
+@pytest.fixture
+async def client(app):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+def make_user(app):
+    """async make_user(email, role="user") -> (user id, Authorization header). Skips bcrypt."""
+    async def make_user(email: str, role: UserRole = UserRole.USER) -> tuple[int, dict]:
+        async with AsyncSessionLocal() as db:
+            user_id = (await db.execute(
+                insert(User).values(email=email, name=email.split("@")[0], password="unused", role=role)
+                .returning(User.id)
+            )).scalar_one()
+            await db.commit()
+        return user_id, {"Authorization": f"Bearer {create_access_token({'sub': email})}"}
+    return make_user
+
+
+@pytest.fixture
+def make_loan(app):
+    """async make_loan(name, interest_rate=8.0) -> loan id, already in the catalog."""
+    async def make_loan(name: str, interest_rate: float = 8.0) -> int:
+        async with AsyncSessionLocal() as db:
+            loan_id = (await db.execute(
+                insert(BankLoan).values(name=name, interest_rate=interest_rate, is_active=True).returning(BankLoan.id)
+            )).scalar_one()
+            await db.commit()
+        await loan_catalog.reload()
+        return loan_id
+    return make_loan
+
+
+@pytest.fixture
+def apply(client):
+    """async apply(headers, loan_id, amount=1000) -> application id, through POST /loans/apply."""
+    async def apply(headers: dict, loan_id: int, amount: float = 1000) -> int:
+        response = await client.post("/loans/apply", json={"loan_id": loan_id, "amount": amount}, headers=headers)
+        assert response.status_code == 201, response.text
+        return response.json()["id"]
+    return apply
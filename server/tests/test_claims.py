@@ -0,0 +1,146 @@
+"""Review claims and compare-and-swap decisions between concurrent managers."""
+import asyncio
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import event, update
+
+from database import AsyncSessionLocal, engine, utcnow
+from app.features.loans.claims import claimable_stmt
+from app.features.loans.models import UserLoanApplication
+from app.features.users.models import UserRole
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def managers(make_user):
+    """Headers of two managers."""
+    return [(await make_user(email, role=UserRole.MANAGER))[1] for email in ("ann@example.com", "bob@example.com")]
+
+
+@pytest.fixture
+async def application(make_user, make_loan, apply):
+    _, headers = await make_user("applicant@example.com")
+    return await apply(headers, await make_loan("Home loan"))
+
+
+@pytest.fixture
+def concurrent_decision():
+    """
+    concurrent_decision(application_id): another manager's decision lands on
+    the row between the next decision's read and its compare-and-swap UPDATE.
+    """
+    armed = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if armed and statement.startswith("UPDATE user_loan_applications SET status"):
+            cursor.execute(f"UPDATE user_loan_applications SET version = version + 1 WHERE id = {int(armed.pop())}")
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    yield armed.append
+    event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+async def _claim(client, headers, count=10) -> list[dict]:
+    response = await client.post("/manager/loans/applications/claim", params={"count": count}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def _decide(client, headers, application_id, status="approved", version=None):
+    body = {"status": status} if version is None else {"status": status, "version": version}
+    return await client.put(f"/manager/loans/applications/{application_id}", json=body, headers=headers)
+
+
+async def _batch(client, headers, application_id, status="approved") -> str:
+    response = await client.post(
+        "/manager/loans/applications/decisions",
+        json={"decisions": [{"application_id": application_id, "status": status}]}, headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["results"][0]["result"]
+
+
+async def test_decision_on_a_stale_version_conflicts(client, managers, application):
+    ann, bob = managers
+    version = (await _claim(client, ann))[0]["version"]
+    assert (await _decide(client, ann, application, "rejected", version=version)).status_code == 200
+
+    response = await _decide(client, bob, application, "approved", version=version)
+
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Loan application was changed by someone else"
+
+
+async def test_decision_racing_another_conflicts(client, managers, application, concurrent_decision):
+    ann, _ = managers
+    concurrent_decision(application)
+
+    response = await _decide(client, ann, application)
+
+    assert response.status_code == 409
+    listed = (await client.get("/manager/loans/applications", headers=ann)).json()
+    assert [row["status"] for row in listed] == ["pending"]
+
+
+async def test_batch_decision_racing_another_conflicts(client, managers, application, concurrent_decision):
+    ann, _ = managers
+    concurrent_decision(application)
+
+    assert await _batch(client, ann, application) == "conflict"
+    stats = (await client.get("/manager/loans/stats", headers=ann)).json()
+    assert stats["by_status"]["approved"]["count"] == 0
+
+
+async def test_claimed_application_is_left_to_its_claimer(client, managers, application):
+    ann, bob = managers
+    assert [row["id"] for row in await _claim(client, ann)] == [application]
+
+    assert await _claim(client, bob) == []
+    assert (await _decide(client, bob, application)).status_code == 409
+    assert await _batch(client, bob, application) == "claimed"
+    assert (await _decide(client, ann, application)).status_code == 200
+
+
+async def test_expired_claim_goes_back_to_the_pool(client, managers, application):
+    ann, bob = managers
+    await _claim(client, ann)
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(UserLoanApplication).where(UserLoanApplication.id == application)
+            .values(claim_expires_at=utcnow() - timedelta(seconds=1))
+        )
+        await db.commit()
+
+    assert [row["id"] for row in await _claim(client, bob)] == [application]
+    assert await _batch(client, ann, application) == "claimed"
+    assert await _batch(client, bob, application) == "updated"
+
+
+async def test_released_claims_can_be_taken(client, managers, application):
+    ann, bob = managers
+    await _claim(client, ann)
+
+    response = await client.delete("/manager/loans/applications/claim", headers=ann)
+
+    assert response.json() == {"released": 1}
+    assert [row["id"] for row in await _claim(client, bob)] == [application]
+
+
+async def test_claim_skips_rows_another_claim_has_locked(client, managers, make_user, make_loan, apply):
+    if engine.dialect.name == "sqlite":
+        pytest.skip("SQLite has no row locks; its single writer serializes claims")
+    _, bob = managers
+    loan_id = await make_loan("Home loan")
+    for i in range(6):
+        await apply((await make_user(f"applicant{i}@example.com"))[1], loan_id)
+
+    async with AsyncSessionLocal() as other_claim:
+        # Another manager's claim, between its SELECT ... FOR UPDATE and its commit
+        locked = (await other_claim.execute(claimable_stmt(4, utcnow()))).scalars().all()
+        claimed = await asyncio.wait_for(_claim(client, bob, count=4), timeout=5)
+        await other_claim.rollback()
+
+    assert len(locked) == 4
+    assert len(claimed) == 2 and not {row["id"] for row in claimed} & set(locked)
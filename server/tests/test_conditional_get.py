@@ -0,0 +1,44 @@
+"""ETags of polled lists (app/core/change_sequence.py)."""
+import pytest
+from sqlalchemy import insert
+
+from database import AsyncSessionLocal
+from app.core.change_sequence import NOTIFICATIONS, change_sequences
+from app.features.notifications.models import Notification
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def sequences(app, monkeypatch):
+    monkeypatch.setattr(change_sequences, "max_age", 0)
+    return change_sequences
+
+
+async def test_unchanged_list_is_not_modified(client, make_user, sequences):
+    _, headers = await make_user("applicant@example.com")
+
+    first = await client.get("/notifications/unread", headers=headers)
+    again = await client.get("/notifications/unread", headers={**headers, "If-None-Match": first.headers["ETag"]})
+
+    assert first.status_code == 200
+    assert again.status_code == 304
+
+
+async def test_evicted_scope_never_revalidates_a_stale_tag(client, make_user, sequences, monkeypatch):
+    monkeypatch.setattr(sequences, "maxsize", 1)
+    user_id, headers = await make_user("applicant@example.com")
+    other_id, _ = await make_user("other@example.com")
+    before = (await client.get("/notifications/unread", headers=headers)).headers["ETag"]
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(insert(Notification).values(user_id=user_id, message="Application approved"))
+        await db.commit()
+    sequences.user_changed(NOTIFICATIONS, user_id)
+    # Pushes the user's counter out, so it would read as it did before the change
+    sequences.user_changed(NOTIFICATIONS, other_id)
+
+    response = await client.get("/notifications/unread", headers={**headers, "If-None-Match": before})
+    assert response.status_code == 200
+    assert [notification["message"] for notification in response.json()] == ["Application approved"]
+    assert sequences.stats()["evictions"] >= 1
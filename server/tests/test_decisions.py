@@ -0,0 +1,74 @@
+"""POST /manager/loans/applications/decisions: one result per submitted decision."""
+import pytest
+
+from app.features.users.models import UserRole
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def manager(make_user):
+    _, headers = await make_user("manager@example.com", role=UserRole.MANAGER)
+    return headers
+
+
+@pytest.fixture
+async def applications(make_user, make_loan, apply):
+    """Two applications of two applicants; returns ({id: applicant headers})."""
+    loan_id = await make_loan("Home loan")
+    applicants = {}
+    for email in ("first@example.com", "second@example.com"):
+        _, headers = await make_user(email)
+        applicants[await apply(headers, loan_id, amount=1000)] = headers
+    return applicants
+
+
+async def _decide(client, manager, *decisions):
+    response = await client.post(
+        "/manager/loans/applications/decisions",
+        json={"decisions": [{"application_id": id, "status": status} for id, status in decisions]},
+        headers=manager,
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def test_batch_reports_each_outcome(client, manager, applications):
+    first, second = applications
+
+    body = await _decide(
+        client, manager,
+        (first, "approved"), (second, "pending"), (9999, "approved"), (first, "rejected"),
+    )
+
+    assert [(result["application_id"], result["result"]) for result in body["results"]] == [
+        (first, "updated"), (second, "unchanged"), (9999, "not_found"), (first, "duplicate"),
+    ]
+    assert body["updated"] == 1
+    assert body["skipped"] == [second]
+    # The first decision for an application wins
+    listed = (await client.get("/loans/applications", headers=applications[first])).json()
+    assert [application["status"] for application in listed] == ["approved"]
+
+
+async def test_repeated_batch_is_unchanged_and_counted_once(client, manager, applications):
+    first, second = applications
+    await _decide(client, manager, (first, "approved"), (second, "rejected"))
+
+    body = await _decide(client, manager, (first, "approved"), (second, "rejected"))
+
+    assert [result["result"] for result in body["results"]] == ["unchanged", "unchanged"]
+    assert body["updated"] == 0
+    stats = (await client.get("/manager/loans/stats", headers=manager)).json()
+    assert {status: bucket["count"] for status, bucket in stats["by_status"].items()} == {
+        "pending": 0, "approved": 1, "rejected": 1,
+    }
+
+
+async def test_applicant_is_notified_once_per_change(client, manager, applications):
+    first, _ = applications
+    await _decide(client, manager, (first, "approved"), (first, "approved"))
+    await _decide(client, manager, (first, "approved"))
+
+    unread = (await client.get("/notifications/unread", headers=applications[first])).json()
+    assert len(unread) == 1
@@ -0,0 +1,139 @@
+"""The durable job queue: claims, retries with backoff, and lease expiry."""
+import asyncio
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import select, update
+
+from database import AsyncSessionLocal, engine, utcnow
+from app.features.jobs.models import Job, JobStatus
+from app.features.jobs.queue import JobWorkerPool, enqueue, job_handler
+from app.features.notifications.models import Notification
+from app.features.users.models import UserRole
+
+pytestmark = pytest.mark.anyio
+
+ran = []
+
+
+@job_handler
+async def record_test_job(value: int):
+    ran.append(value)
+
+
+@job_handler
+async def failing_test_job():
+    raise RuntimeError("downstream unavailable")
+
+
+def _pool(**overrides) -> JobWorkerPool:
+    options = dict(workers=1, batch_size=10, poll_interval=0.05, lease=60,
+                   max_attempts=3, backoff=10, backoff_max=15)
+    return JobWorkerPool(**{**options, **overrides})
+
+
+async def _enqueue(handler, count=1, **payload) -> None:
+    async with AsyncSessionLocal() as db:
+        for _ in range(count):
+            enqueue(db, handler, **payload)
+        await db.commit()
+
+
+async def _jobs() -> list:
+    async with AsyncSessionLocal() as db:
+        return list((await db.execute(select(Job).order_by(Job.id))).scalars())
+
+
+async def _make_due(**values) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(update(Job).values(run_after=utcnow() - timedelta(seconds=1), **values))
+        await db.commit()
+
+
+async def test_application_notifies_managers_through_a_job(make_user, make_loan, apply):
+    _, headers = await make_user("applicant@example.com")
+    await apply(headers, await make_loan("Home loan"))
+    pool = _pool()
+
+    await pool.run_batch(await pool.claim())
+
+    assert await _jobs() == []
+    async with AsyncSessionLocal() as db:
+        broadcasts = (await db.execute(select(Notification.target_role))).scalars().all()
+    assert broadcasts == [UserRole.MANAGER]
+
+
+async def test_failed_job_retries_with_backoff_then_fails(app):
+    await _enqueue(failing_test_job)
+    pool = _pool()
+
+    delays = []
+    for _ in range(3):
+        before = utcnow()
+        jobs = await pool.claim()
+        assert len(jobs) == 1
+        await pool.run_batch(jobs)
+        [job] = await _jobs()
+        if job.status == JobStatus.QUEUED:
+            delays.append(round((job.run_after - before).total_seconds()))
+            # Not due again before its backoff
+            assert await pool.claim() == []
+            await _make_due()
+
+    assert delays == [10, 15]  # backoff, then doubled and capped at backoff_max
+    assert (job.status, job.attempts, job.last_error) == (JobStatus.FAILED, 3, "RuntimeError: downstream unavailable")
+    assert await pool.claim() == []
+    assert (pool.retried, pool.failed) == (2, 1)
+
+
+async def test_expired_lease_is_claimed_again(app):
+    ran.clear()
+    await _enqueue(record_test_job, value=1)
+    crashed, other = _pool(), _pool()
+    assert len(await crashed.claim()) == 1
+    # The claimer died without recording an outcome
+    assert await other.claim() == []
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(update(Job).values(locked_until=utcnow() - timedelta(seconds=1)))
+        await db.commit()
+    other._next_lease_check = 0
+    jobs = await other.claim()
+    await other.run_batch(jobs)
+
+    assert [job.attempts for job in jobs] == [2]
+    assert ran == [1]
+    assert await _jobs() == []
+
+
+async def test_claim_skips_jobs_another_worker_has_locked(app):
+    if engine.dialect.name == "sqlite":
+        pytest.skip("SQLite has no row locks; its single writer serializes claims")
+    await _enqueue(record_test_job, count=6, value=1)
+
+    async with AsyncSessionLocal() as other_worker:
+        # Another worker's claim, between its SELECT ... FOR UPDATE and its commit
+        locked = (await other_worker.execute(
+            select(Job.id).order_by(Job.run_after).limit(4).with_for_update(skip_locked=True)
+        )).scalars().all()
+        claimed = await asyncio.wait_for(_pool().claim(), timeout=5)
+        await other_worker.rollback()
+
+    assert len(locked) == 4
+    assert len(claimed) == 2 and not {job.id for job in claimed} & set(locked)
+
+
+async def test_running_pool_drains_the_queue(app):
+    ran.clear()
+    await _enqueue(record_test_job, count=5, value=1)
+    pool = _pool(workers=2)
+    await pool.start()
+    pool.wake()
+    for _ in range(50):
+        if len(ran) == 5:
+            break
+        await asyncio.sleep(0.02)
+    await pool.stop()
+
+    assert ran == [1] * 5
+    assert pool.stats()["completed"] == 5
@@ -0,0 +1,78 @@
+"""Retention archives notifications by when they were read, not when they were created."""
+import asyncio
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import insert, select, update
+
+from database import AsyncSessionLocal, utcnow
+from app.features.notifications.models import Notification, NotificationArchive
+from app.features.notifications.retention import NotificationRetention, notification_retention
+
+pytestmark = pytest.mark.anyio
+
+
+async def _notify(user_id: int, created_at) -> int:
+    async with AsyncSessionLocal() as db:
+        notification_id = (await db.execute(
+            insert(Notification).values(user_id=user_id, message="Application updated", created_at=created_at)
+            .returning(Notification.id)
+        )).scalar_one()
+        await db.commit()
+    return notification_id
+
+
+async def _ids(model) -> set[int]:
+    async with AsyncSessionLocal() as db:
+        return set((await db.execute(select(model.id))).scalars())
+
+
+async def test_old_notification_read_just_now_is_kept(client, make_user):
+    user_id, headers = await make_user("applicant@example.com")
+    notification_id = await _notify(user_id, utcnow() - timedelta(days=3))
+
+    response = await client.patch(f"/notifications/{notification_id}/read", headers=headers)
+    assert response.status_code == 200
+    assert await notification_retention.run_once() == 0
+    assert await _ids(Notification) == {notification_id}
+
+
+async def test_notification_read_past_the_grace_period_is_archived(client, make_user):
+    user_id, _ = await make_user("applicant@example.com")
+    read_long_ago = utcnow() - notification_retention.read_after - timedelta(minutes=1)
+    kept = await _notify(user_id, utcnow())
+    archived = await _notify(user_id, utcnow() - timedelta(days=3))
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(Notification).where(Notification.id == archived)
+            .values(is_read=True, read_at=read_long_ago)
+        )
+        await db.commit()
+
+    assert await notification_retention.run_once() == 1
+    assert await _ids(Notification) == {kept}
+    assert await _ids(NotificationArchive) == {archived}
+    async with AsyncSessionLocal() as db:
+        assert (await db.get(NotificationArchive, archived)).read_at == read_long_ago
+
+
+async def test_only_one_worker_runs_retention(app):
+    """Two workers' jobs on the same lock file: one runs, the other takes over when it stops."""
+    def worker():
+        return NotificationRetention(
+            interval=0.05, read_after=timedelta(hours=24), max_age=timedelta(days=90), batch_size=100,
+        )
+    first, second = worker(), worker()
+
+    await first.start()
+    await asyncio.sleep(0.1)
+    await second.start()
+    await asyncio.sleep(0.2)
+    assert first.stats()["leader"] and first.runs > 0
+    assert not second.stats()["leader"] and second.runs == 0
+
+    await first.stop()
+    await asyncio.sleep(0.2)
+    assert second.stats()["leader"] and second.runs > 0
+    await second.stop()
+    assert not second.stats()["leader"]
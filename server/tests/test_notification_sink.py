@@ -0,0 +1,104 @@
+"""NotificationSink: coalesced notification inserts."""
+import asyncio
+
+import pytest
+from sqlalchemy import event, func, select
+from sqlalchemy.exc import IntegrityError
+
+from database import AsyncSessionLocal, engine
+from app.features.notifications.models import Notification
+from app.features.notifications.sink import NotificationSink
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def inserts(app):
+    """The INSERT INTO notifications statements run during the test, as their row counts."""
+    batches = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO notifications "):
+            batches.append(statement.count("), (") + 1)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    yield batches
+    event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture
+async def sink():
+    """sink(max_batch, max_delay): a started sink, stopped after the test."""
+    started = []
+
+    async def make(max_batch: int, max_delay: float) -> NotificationSink:
+        sink = NotificationSink(max_batch=max_batch, max_delay=max_delay)
+        await sink.start()
+        started.append(sink)
+        return sink
+
+    yield make
+    for sink in started:
+        await sink.stop()
+
+
+async def _submit_all(sink: NotificationSink, user_id: int, count: int, **values) -> list:
+    return await asyncio.gather(
+        *(sink.submit(user_id=user_id, message=f"Update {i}", **values) for i in range(count)),
+        return_exceptions=True,
+    )
+
+
+async def _count() -> int:
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(select(func.count()).select_from(Notification))).scalar_one()
+
+
+async def test_burst_is_written_in_max_batch_inserts(make_user, sink, inserts):
+    user_id, _ = await make_user("applicant@example.com")
+    writer = await sink(max_batch=3, max_delay=0.05)
+
+    ids = await _submit_all(writer, user_id, 7)
+
+    assert inserts == [3, 3, 1]
+    assert ids == sorted(ids) and len(set(ids)) == 7
+    assert writer.stats()["flushed_rows"] == 7
+
+
+async def test_full_batch_does_not_wait_for_the_delay(make_user, sink, inserts):
+    user_id, _ = await make_user("applicant@example.com")
+    writer = await sink(max_batch=3, max_delay=30)
+
+    await asyncio.wait_for(_submit_all(writer, user_id, 3), timeout=5)
+
+    assert inserts == [3]
+
+
+async def test_failed_batch_fails_every_submitter_and_the_sink_keeps_going(make_user, sink):
+    user_id, _ = await make_user("applicant@example.com")
+    writer = await sink(max_batch=10, max_delay=0.05)
+
+    results = await asyncio.gather(
+        writer.submit(user_id=user_id, message="Application approved"),
+        writer.submit(user_id=user_id, message=None),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, IntegrityError) for result in results)
+    assert writer.stats()["failed_rows"] == 2
+    assert await _count() == 0
+    assert isinstance(await writer.submit(user_id=user_id, message="Application approved"), int)
+    assert await _count() == 1
+
+
+async def test_stop_flushes_what_is_queued(make_user):
+    user_id, _ = await make_user("applicant@example.com")
+    writer = NotificationSink(max_batch=100, max_delay=30)
+    await writer.start()
+    pending = asyncio.gather(*(writer.submit(user_id=user_id, message="Update") for _ in range(5)))
+    await asyncio.sleep(0)
+
+    await writer.stop()
+
+    assert len(await pending) == 5
+    assert await _count() == 5
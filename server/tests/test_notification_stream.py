@@ -0,0 +1,106 @@
+"""GET /notifications/stream: live events, including ones other processes wrote."""
+import asyncio
+import contextlib
+
+import pytest
+from sqlalchemy import insert
+
+from database import AsyncSessionLocal
+from app.features.notifications.hub import notification_hub
+from app.features.notifications.models import Notification
+from app.features.notifications.router import _notification_events
+from app.features.notifications.sink import notification_sink
+from app.features.notifications.tail import NotificationTail
+from app.features.users.models import User
+
+pytestmark = pytest.mark.anyio
+
+
+async def _written_elsewhere(user_id: int, message: str, notification_id=None) -> None:
+    """A row committed without this process's sink, as the standalone job worker would."""
+    values = {"user_id": user_id, "message": message}
+    if notification_id is not None:
+        values["id"] = notification_id
+    async with AsyncSessionLocal() as db:
+        await db.execute(insert(Notification).values(**values))
+        await db.commit()
+
+
+@pytest.fixture
+async def stream(app, make_user):
+    """(user id, async next_event()) for a stream that has connected and replayed nothing."""
+    user_id, _ = await make_user("applicant@example.com")
+    async with AsyncSessionLocal() as db:
+        user = await db.get(User, user_id)
+    with notification_hub.subscribe(user.id, user.role) as subscription:
+        events = _notification_events(user, subscription, last_seen_id=0)
+        assert await anext(events) == "retry: 3000\n\n"
+        pending = asyncio.create_task(anext(events))
+        # Let it replay (nothing) and start waiting on the hub
+        await asyncio.sleep(0.05)
+
+        async def next_event() -> str:
+            nonlocal pending
+            event = await asyncio.wait_for(pending, timeout=1)
+            pending = asyncio.create_task(anext(events))
+            return event
+
+        yield user_id, next_event
+        pending.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await pending
+        await events.aclose()
+
+
+async def test_notification_written_by_another_process_reaches_the_stream(stream):
+    user_id, next_event = stream
+    tail = NotificationTail(interval=1, lookback=100)
+    await tail.read_once()
+
+    await _written_elsewhere(user_id, "Application approved")
+    assert await tail.read_once() == 1
+
+    event = await next_event()
+    assert event.startswith("id: 1\nevent: notification\n")
+    assert "Application approved" in event
+
+
+async def test_tail_loop_delivers_within_its_interval(stream):
+    user_id, next_event = stream
+    tail = NotificationTail(interval=0.05, lookback=100)
+    await tail.start()
+    try:
+        await asyncio.sleep(0.1)
+        await _written_elsewhere(user_id, "Application approved")
+        assert "Application approved" in await next_event()
+    finally:
+        await tail.stop()
+
+
+async def test_late_commit_below_the_newest_id_is_still_delivered(stream):
+    user_id, next_event = stream
+    tail = NotificationTail(interval=1, lookback=100)
+    await tail.read_once()
+
+    await _written_elsewhere(user_id, "second", notification_id=2)
+    await tail.read_once()
+    assert "second" in await next_event()
+    # Id 1 commits after id 2 was streamed; the lookback finds it, the hub drops 2
+    await _written_elsewhere(user_id, "first", notification_id=1)
+    await tail.read_once()
+
+    assert (await next_event()).startswith("id: 1\n")
+    assert notification_hub.stats()["repeats"] >= 1
+
+
+async def test_own_notifications_are_published_once(stream):
+    user_id, next_event = stream
+    tail = NotificationTail(interval=1, lookback=100)
+    await tail.read_once()
+
+    await notification_sink.submit(user_id=user_id, message="Application approved")
+    await tail.read_once()
+
+    assert "Application approved" in await next_event()
+    with pytest.raises(asyncio.TimeoutError):
+        await next_event()
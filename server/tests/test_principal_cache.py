@@ -0,0 +1,67 @@
+"""The cached principals behind get_current_user follow committed user changes."""
+import pytest
+from sqlalchemy import select
+
+from database import AsyncSessionLocal
+from app.core.principal_cache import principal_cache
+from app.features.users.models import User, UserRole
+
+pytestmark = pytest.mark.anyio
+
+EMAIL = "applicant@example.com"
+
+
+async def _role(client, headers) -> str:
+    response = await client.get("/users/me", headers=headers)
+    assert response.status_code == 200
+    return response.json()["role"]
+
+
+async def _load(db) -> User:
+    return (await db.execute(select(User).where(User.email == EMAIL))).scalar_one()
+
+
+async def test_role_change_is_seen_once_committed(client, make_user):
+    _, headers = await make_user(EMAIL)
+    assert await _role(client, headers) == "user"
+
+    async with AsyncSessionLocal() as writer:
+        user = await _load(writer)
+        user.role = UserRole.MANAGER
+        await writer.flush()
+        # Another request, on its own connection, still reads and caches the committed row
+        stale = User(id=user.id, email=EMAIL, name=user.name, role=UserRole.USER)
+        principal_cache.put(EMAIL, stale, principal_cache.generation)
+        await writer.commit()
+
+    assert principal_cache.get(EMAIL) is None
+    assert await _role(client, headers) == "manager"
+
+
+async def test_rolled_back_change_keeps_the_cached_principal(client, make_user):
+    _, headers = await make_user(EMAIL)
+
+    async with AsyncSessionLocal() as writer:
+        user = await _load(writer)
+        user.role = UserRole.MANAGER
+        await writer.flush()
+        await writer.rollback()
+        assert await _role(client, headers) == "user"
+        # The rolled-back change is forgotten, not invalidated again on the next commit
+        await writer.commit()
+
+    hits = principal_cache.hits
+    assert await _role(client, headers) == "user"
+    assert principal_cache.hits == hits + 1
+
+
+async def test_fill_racing_an_invalidation_is_dropped(app, make_user):
+    await make_user(EMAIL)
+    generation = principal_cache.generation
+    async with AsyncSessionLocal() as db:
+        loaded = await _load(db)
+
+    principal_cache.invalidate(EMAIL)
+    principal_cache.put(EMAIL, loaded, generation)
+
+    assert principal_cache.get(EMAIL) is None
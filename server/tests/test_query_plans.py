@@ -0,0 +1,158 @@
+"""
+Query-plan guard for the hot loan-application, notification and job queue
+queries (SQLite EXPLAIN QUERY PLAN), plus the duplicate-apply guard.
+
+No hot query may scan user_loan_applications, notifications or jobs instead
+of searching an index, and the paginated listings must come out of an index
+in page order: a temp B-tree sort reads every matching row before the first
+page can be returned.
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+from database import AsyncSessionLocal, engine
+from app.features.jobs.models import Job, JobStatus
+from app.features.loans.claims import claimable_stmt
+from app.features.loans.enums import LoanStatus
+from app.features.loans.models import UserLoanApplication
+from app.features.loans.pagination import application_rows_stmt, review_queue_stmt
+from app.features.loans.search import search_stmt
+from app.features.notifications.models import Notification
+from app.features.notifications.unread import unread_count_stmt, unread_notifications_stmt
+from app.features.users.models import User, UserRole
+
+pytestmark = pytest.mark.anyio
+
+TABLES = ("user_loan_applications", "notifications", "jobs")
+
+
+def _page(stmt, after_id=None):
+    """A page the way list_applications() builds it."""
+    stmt = stmt.order_by(UserLoanApplication.id)
+    if after_id is not None:
+        stmt = stmt.where(UserLoanApplication.id > after_id)
+    return stmt.limit(51)
+
+
+LISTINGS = {
+    "user listing": _page(application_rows_stmt().where(UserLoanApplication.userId == 1)),
+    "user listing, next page": _page(application_rows_stmt().where(UserLoanApplication.userId == 1), after_id=100),
+    "user listing by status": _page(application_rows_stmt().where(
+        UserLoanApplication.userId == 1, UserLoanApplication.status == LoanStatus.PENDING)),
+    "manager listing": _page(application_rows_stmt()),
+    "manager listing, next page": _page(application_rows_stmt(), after_id=100),
+    "manager listing by status": _page(application_rows_stmt().where(UserLoanApplication.status == LoanStatus.PENDING)),
+    "manager listing by status, next page": _page(
+        application_rows_stmt().where(UserLoanApplication.status == LoanStatus.PENDING), after_id=100),
+    "review queue": review_queue_stmt(riskiest_first=True).limit(51),
+    "review queue, next page": review_queue_stmt(riskiest_first=True, after=(0.5, 100)).limit(51),
+    "review queue, lowest risk first": review_queue_stmt(riskiest_first=False, after=(0.5, 100)).limit(51),
+    "review claim": claimable_stmt(10, datetime(2026, 1, 1)),
+}
+
+# Listings whose first page may walk the table itself: every row matches, so it is
+# read in id (rowid) order and stops at the LIMIT
+UNFILTERED = {"manager listing"}
+
+_manager = User(id=1, role=UserRole.MANAGER)
+
+OTHER_QUERIES = {
+    "duplicate apply check": select(UserLoanApplication.id)
+        .where(UserLoanApplication.userId == 1, UserLoanApplication.loanId == 1),
+    "single application": select(UserLoanApplication)
+        .where(UserLoanApplication.id == 1, UserLoanApplication.userId == 1),
+    "applications of a loan": select(UserLoanApplication.id).where(UserLoanApplication.loanId == 1),
+    "risk scoring: unscored": select(UserLoanApplication.id)
+        .where(UserLoanApplication.status == LoanStatus.PENDING, UserLoanApplication.risk_score.is_(None),
+               UserLoanApplication.id > 0)
+        .order_by(UserLoanApplication.id).limit(5000),
+    "claims of a manager": select(UserLoanApplication.id).where(UserLoanApplication.claimed_by == 1),
+    "search: text": search_stmt("sqlite", q="maria pat").limit(51),
+    "search: text, next page": search_stmt("sqlite", q="maria pat", before_id=1000).limit(51),
+    "search: status and product": search_stmt("sqlite", status=LoanStatus.PENDING, loan_id=1).limit(51),
+    "search: amount range": search_stmt("sqlite", min_amount=1000, max_amount=2000).limit(51),
+    "search: submitted between": search_stmt(
+        "sqlite", created_from=datetime(2026, 1, 1), created_to=datetime(2026, 1, 2)).limit(51),
+    "search: everything": search_stmt(
+        "sqlite", q="maria", status=LoanStatus.PENDING, loan_id=1, min_amount=1000,
+        created_from=datetime(2026, 1, 1), before_id=1000).limit(51),
+    "unread notifications": unread_notifications_stmt(_manager),
+    "unread replay after id": unread_notifications_stmt(_manager, after_id=100),
+    "unread count": unread_count_stmt(_manager),
+    "stream tail": select(Notification.id, Notification.message)
+        .where(Notification.id > 100, Notification.is_read == False)
+        .order_by(Notification.id).limit(1000),
+    "retention: read and due": select(Notification.id)
+        .where(Notification.is_read == True, Notification.read_at < datetime(2026, 1, 1))
+        .limit(1000),
+    "retention: expired": select(Notification.id)
+        .where(Notification.created_at < datetime(2026, 1, 1)).limit(1000),
+    "job claim": select(Job.id)
+        .where(Job.status == JobStatus.QUEUED, Job.run_after <= datetime(2026, 1, 1))
+        .order_by(Job.run_after).limit(50),
+    "job lease expiry": select(Job.id)
+        .where(Job.status == JobStatus.RUNNING, Job.locked_until < datetime(2026, 1, 1)),
+}
+
+
+async def query_plan(stmt) -> list[str]:
+    async with engine.connect() as conn:
+        sql = str(stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+        return [row[-1] for row in await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+def full_scans(plan: list[str]) -> list[str]:
+    """Plan lines that read a guarded table without an index (SQLite prints 'SCAN <table>')."""
+    return [
+        detail for detail in plan
+        if any(detail.startswith(f"SCAN {table}") for table in TABLES) and "USING" not in detail
+    ]
+
+
+@pytest.fixture
+def sqlite_only(app):
+    if engine.dialect.name != "sqlite":
+        pytest.skip("EXPLAIN QUERY PLAN is SQLite's")
+
+
+@pytest.mark.parametrize("name", list(LISTINGS) + list(OTHER_QUERIES))
+async def test_hot_query_uses_an_index(sqlite_only, name):
+    plan = await query_plan({**LISTINGS, **OTHER_QUERIES}[name])
+    if name in UNFILTERED:
+        assert plan[0] == "SCAN user_loan_applications", plan
+    else:
+        assert not full_scans(plan), plan
+
+
+@pytest.mark.parametrize("name", list(LISTINGS))
+async def test_listing_pages_come_out_of_an_index_in_order(sqlite_only, name):
+    plan = await query_plan(LISTINGS[name])
+    assert not [detail for detail in plan if "TEMP B-TREE" in detail], plan
+
+
+async def test_second_application_for_the_same_loan_is_rejected(client, make_user, make_loan):
+    _, headers = await make_user("applicant@example.com")
+    loan_id = await make_loan("Home loan")
+
+    first = await client.post("/loans/apply", json={"loan_id": loan_id, "amount": 1000}, headers=headers)
+    again = await client.post("/loans/apply", json={"loan_id": loan_id, "amount": 2000}, headers=headers)
+
+    assert first.status_code == 201
+    assert again.status_code == 400
+    listed = (await client.get("/loans/applications", headers=headers)).json()
+    assert [application["amount"] for application in listed] == [1000]
+
+
+async def test_unique_index_rejects_duplicate_rows(make_user, make_loan):
+    user_id, _ = await make_user("applicant@example.com")
+    loan_id = await make_loan("Home loan")
+    row = {"userId": user_id, "loanId": loan_id, "amount": 1000.0}
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(insert(UserLoanApplication).values(**row))
+        await db.commit()
+        with pytest.raises(IntegrityError):
+            await db.execute(insert(UserLoanApplication).values(**row))
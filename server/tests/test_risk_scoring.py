@@ -0,0 +1,40 @@
+"""The background scorer runs in one API worker at a time."""
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+from database import AsyncSessionLocal
+from app.features.loans.models import UserLoanApplication
+from app.features.loans.risk import RiskScoring
+
+pytestmark = pytest.mark.anyio
+
+
+async def _scores() -> list:
+    async with AsyncSessionLocal() as db:
+        return list((await db.execute(select(UserLoanApplication.risk_score))).scalars())
+
+
+async def test_only_the_leader_scores(client, make_user, make_loan):
+    leader = RiskScoring(interval=0.05, rescore_interval=0, chunk_size=100)
+    follower = RiskScoring(interval=0.05, rescore_interval=0, chunk_size=100)
+    await leader.start()
+    await asyncio.sleep(0.1)
+    await follower.start()
+
+    _, headers = await make_user("applicant@example.com")
+    loan_id = await make_loan("Home loan")
+    response = await client.post("/loans/apply", json={"loan_id": loan_id, "amount": 1000}, headers=headers)
+    assert response.status_code == 201
+    follower.wake()
+    await asyncio.sleep(0.2)
+
+    assert [score is not None for score in await _scores()] == [True]
+    assert leader.stats()["leader"] and leader.scored_new == 1
+    assert not follower.stats()["leader"] and follower.scored_new == 0
+
+    await leader.stop()
+    await asyncio.sleep(0.2)
+    assert follower.stats()["leader"]
+    await follower.stop()
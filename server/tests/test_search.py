@@ -0,0 +1,53 @@
+"""GET /manager/loans/applications/search: FTS5 on SQLite, ILIKE on other databases."""
+import pytest
+
+from app.features.users.models import UserRole
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def book(make_user, make_loan, apply):
+    """Applications of Maria (home loan, then car loan) and Mario (car loan); returns manager headers and ids."""
+    _, manager = await make_user("manager@example.com", role=UserRole.MANAGER)
+    home, car = await make_loan("Home loan"), await make_loan("Car loan")
+    _, maria = await make_user("maria.patel@example.com")
+    _, mario = await make_user("mario.rossi@example.com")
+    ids = {
+        "maria home": await apply(maria, home, amount=250_000),
+        "maria car": await apply(maria, car, amount=20_000),
+        "mario car": await apply(mario, car, amount=15_000),
+    }
+    return manager, ids
+
+
+async def _search(client, headers, **params):
+    response = await client.get("/manager/loans/applications/search", params=params, headers=headers)
+    assert response.status_code == 200, response.text
+    return [row["id"] for row in response.json()], response.headers.get("X-Next-Cursor")
+
+
+async def test_every_word_must_match_and_the_last_may_be_unfinished(client, book):
+    manager, ids = book
+
+    assert (await _search(client, manager, q="maria pat"))[0] == [ids["maria car"], ids["maria home"]]
+    assert (await _search(client, manager, q="mari"))[0] == [ids["mario car"], ids["maria car"], ids["maria home"]]
+    assert (await _search(client, manager, q="rossi car"))[0] == [ids["mario car"]]
+    assert (await _search(client, manager, q="home"))[0] == [ids["maria home"]]
+
+
+async def test_text_combines_with_filters_and_pages(client, book):
+    manager, ids = book
+
+    first, cursor = await _search(client, manager, q="car", limit=1)
+    second, last = await _search(client, manager, q="car", limit=1, cursor=cursor)
+
+    assert (first, second, last) == ([ids["mario car"]], [ids["maria car"]], None)
+    assert (await _search(client, manager, q="maria", max_amount=100_000))[0] == [ids["maria car"]]
+
+
+async def test_wildcards_are_plain_text(client, book):
+    manager, _ = book
+
+    assert (await _search(client, manager, q="%"))[0] == []
+    assert (await _search(client, manager, q="_"))[0] == []